@@ -1,9 +1,52 @@
-from flask import Flask, request, render_template
-from cnnClassifier.pipeline.prediction_pipeline import PredictionPipeline
+from flask import Flask, Response, request, render_template, jsonify, url_for, g
+from cnnClassifier.config.configuration import ConfigurationManager
+from cnnClassifier.constants import UPLOAD_DIR, IMAGE_SUFFIXES
+from cnnClassifier.pipeline import metrics
+from cnnClassifier.pipeline.batching import QueueFullError
+from cnnClassifier.pipeline.model_loader import ModelLoader, ModelUnavailableError
+from cnnClassifier.utils.common import save_content_addressed
+from cnnClassifier.utils.preprocessing import ImageDecodeError
 import os
+import time
 
 app = Flask(__name__)
-pipeline = PredictionPipeline()  # load model once
+
+serving_config = ConfigurationManager(create_dirs=False).get_serving_config()
+
+
+def build_pipeline():
+    # TensorFlow is imported here, not when the app module is imported
+    from cnnClassifier.pipeline.prediction_pipeline import PredictionPipeline
+
+    pipeline = PredictionPipeline()
+    if serving_config.params_micro_batching:
+        pipeline.enable_micro_batching(
+            max_batch_size=serving_config.params_max_batch_size,
+            max_wait_ms=serving_config.params_max_wait_ms,
+            max_queue_size=serving_config.params_max_queue_size,
+        )
+    return pipeline
+
+
+# model is loaded once, in the background or on the first request
+loader = ModelLoader(build_pipeline, warm_up=serving_config.params_warm_up)
+if serving_config.params_warm_up:
+    loader.start()
+metrics.MODEL_READY.set_function(lambda: loader.ready)
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    # route template, not the raw path, so label values stay bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else "other"
+    metrics.HTTP_REQUESTS.labels(endpoint, response.status_code).inc()
+    metrics.HTTP_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - g.request_start)
+    return response
 
 
 @app.route("/", methods=["GET"])
@@ -21,16 +64,61 @@ def predict():
     if file.filename == "":
         return "Empty file!"
 
-    # Save uploaded image temporarily
-    upload_path = os.path.join("static", "uploaded.jpg")
-    file.save(upload_path)
+    # Decode straight from the request, no temp file
+    data = file.read()
+    metrics.UPLOAD_BYTES.observe(len(data))
 
     # Run prediction
-    result = pipeline.predict(image_path=upload_path)
+    try:
+        result = loader.get_nowait().predict(image_path=data)
+    except QueueFullError:
+        return "Server busy, please retry.", 429, {"Retry-After": "1"}
+    except ModelUnavailableError:
+        return "Model is loading, please retry.", 503, {"Retry-After": "5"}
+    except ImageDecodeError:
+        return "Could not read the image, please upload a JPEG or PNG.", 422
+
+    # Persist only for the preview, under a content-addressed name
+    suffix = os.path.splitext(file.filename)[1].lower()
+    if suffix not in IMAGE_SUFFIXES:
+        suffix = ".jpg"
+    upload_path = save_content_addressed(data, UPLOAD_DIR, suffix)
+    image_url = url_for("static", filename=f"uploads/{upload_path.name}")
 
     # Pass results to UI
-    return render_template("index.html", image_path=upload_path, result=result)
+    return render_template("index.html", image_path=image_url, result=result)
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify({"status": "ok", "pid": os.getpid(), "model": loader.state})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    return jsonify(loader.status()), 200 if loader.ready else 503
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.REGISTRY.CONTENT_TYPE)
+
+
+@app.route("/stats/batching", methods=["GET"])
+def batching_stats():
+    pipeline = loader.pipeline
+    if pipeline is None or pipeline.scheduler is None:
+        return jsonify({"micro_batching": False})
+    return jsonify({"micro_batching": True, **pipeline.scheduler.stats()})
+
+
+@app.route("/stats/cache", methods=["GET"])
+def cache_stats():
+    pipeline = loader.pipeline
+    if pipeline is None or pipeline.cache is None:
+        return jsonify({"prediction_cache": False})
+    return jsonify({"prediction_cache": True, **pipeline.cache.stats()})
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    app.run(debug=True, threaded=True)
@@ -0,0 +1,226 @@
+import os
+import time
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+from cnnClassifier.config.configuration import ConfigurationManager
+from cnnClassifier.constants import UPLOAD_DIR, IMAGE_SUFFIXES
+from cnnClassifier.pipeline import metrics
+from cnnClassifier.pipeline.batching import QueueFullError
+from cnnClassifier.pipeline.model_loader import ModelLoader, ModelUnavailableError
+from cnnClassifier.pipeline.worker_pool import BoundedWorkerPool, PoolFullError
+from cnnClassifier.utils.common import save_content_addressed
+from cnnClassifier.utils.preprocessing import ImageDecodeError
+
+# Run with: uvicorn asgi_app:app --host 0.0.0.0 --port 8000
+
+templates = Jinja2Templates(directory="templates")
+
+serving_config = ConfigurationManager(create_dirs=False).get_serving_config()
+
+
+def build_pipeline():
+    # TensorFlow is imported here, not when the app module is imported
+    from cnnClassifier.pipeline.prediction_pipeline import PredictionPipeline
+
+    pipeline = PredictionPipeline()
+    if serving_config.params_micro_batching:
+        pipeline.enable_micro_batching(
+            max_batch_size=serving_config.params_max_batch_size,
+            max_wait_ms=serving_config.params_max_wait_ms,
+            max_queue_size=serving_config.params_max_queue_size,
+        )
+    return pipeline
+
+
+# model is loaded once, in the background (see lifespan) or on the first request
+loader = ModelLoader(build_pipeline, warm_up=serving_config.params_warm_up)
+
+# decode + inference run here, never on the event loop
+pool = BoundedWorkerPool(
+    max_workers=serving_config.params_workers,
+    max_pending=serving_config.params_max_pending,
+)
+
+metrics.MODEL_READY.set_function(lambda: loader.ready)
+metrics.POOL_PENDING.set_function(lambda: pool.pending)
+
+
+class RequestMetricsMiddleware:
+    """
+    Counts HTTP requests and their latency per route. Plain ASGI so it
+    adds no work beyond two clock reads to the request.
+    """
+
+    def __init__(self, app, endpoints=()):
+        self.app = app
+        self.endpoints = set(endpoints)
+
+    def _endpoint(self, path: str) -> str:
+        # known routes only, so label values stay bounded
+        if path in self.endpoints:
+            return path
+        if path.startswith("/static/"):
+            return "/static"
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            endpoint = self._endpoint(scope["path"])
+            metrics.HTTP_REQUESTS.labels(endpoint, status).inc()
+            metrics.HTTP_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+
+
+async def _read_upload(request):
+    """
+    Returns (bytes, filename) of the "file" form field, or an error response.
+    """
+    form = await request.form()
+    file = form.get("file")
+    if file is None or isinstance(file, str):
+        return None, PlainTextResponse("No file uploaded!", status_code=400)
+    if not file.filename:
+        return None, PlainTextResponse("Empty file!", status_code=400)
+    data = await file.read()
+    metrics.UPLOAD_BYTES.observe(len(data))
+    return (data, file.filename), None
+
+
+def _preview_path(data: bytes, filename: str) -> str:
+    suffix = os.path.splitext(filename)[1].lower()
+    if suffix not in IMAGE_SUFFIXES:
+        suffix = ".jpg"
+    path = save_content_addressed(data, UPLOAD_DIR, suffix)
+    return f"/static/uploads/{path.name}"
+
+
+def _predict(data: bytes, threshold: float = 0.5) -> dict:
+    return loader.get_nowait().predict(data, threshold)
+
+
+async def home(request):
+    return templates.TemplateResponse(request, "index.html")
+
+
+async def predict(request):
+    upload, error = await _read_upload(request)
+    if error is not None:
+        return error
+    data, filename = upload
+
+    try:
+        result = await pool.run(_predict, data)
+        # Persist only for the preview, under a content-addressed name
+        image_path = await pool.run(_preview_path, data, filename)
+    except (PoolFullError, QueueFullError):
+        return PlainTextResponse("Server busy, please retry.", status_code=429)
+    except ModelUnavailableError:
+        return PlainTextResponse("Model is loading, please retry.", status_code=503, headers={"Retry-After": "5"})
+    except ImageDecodeError:
+        return PlainTextResponse("Could not read the image, please upload a JPEG or PNG.", status_code=422)
+
+    return templates.TemplateResponse(
+        request, "index.html", {"image_path": image_path, "result": result}
+    )
+
+
+async def predict_v1(request):
+    """
+    JSON API: multipart "file" field, optional ?threshold=0.5
+    """
+    try:
+        threshold = float(request.query_params.get("threshold", 0.5))
+    except ValueError:
+        return JSONResponse({"error": "threshold must be a number"}, status_code=400)
+
+    upload, error = await _read_upload(request)
+    if error is not None:
+        return JSONResponse({"error": error.body.decode()}, status_code=error.status_code)
+    data, _ = upload
+
+    try:
+        result = await pool.run(_predict, data, threshold)
+    except (PoolFullError, QueueFullError):
+        return JSONResponse(
+            {"error": "server busy"}, status_code=429, headers={"Retry-After": "1"}
+        )
+    except ModelUnavailableError as e:
+        return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "5"})
+    except ImageDecodeError:
+        return JSONResponse({"error": "could not decode the image"}, status_code=422)
+
+    return JSONResponse({"threshold": threshold, "result": result})
+
+
+async def healthz(request):
+    return JSONResponse({"status": "ok", "pid": os.getpid(), "model": loader.state})
+
+
+async def readyz(request):
+    return JSONResponse(loader.status(), status_code=200 if loader.ready else 503)
+
+
+async def stats(request):
+    pipeline = loader.pipeline
+    if pipeline is None:
+        return JSONResponse({"worker_pool": pool.stats(), "model": loader.state})
+    return JSONResponse({
+        "worker_pool": pool.stats(),
+        "batching": pipeline.scheduler.stats() if pipeline.scheduler is not None else None,
+        "cache": pipeline.cache.stats() if pipeline.cache is not None else None,
+    })
+
+
+async def prometheus_metrics(request):
+    return Response(metrics.REGISTRY.render(), media_type=metrics.REGISTRY.CONTENT_TYPE)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if serving_config.params_warm_up:
+        loader.start()
+    yield
+    pool.shutdown()
+
+
+routes = [
+    Route("/", home, methods=["GET"]),
+    Route("/predict", predict, methods=["POST"]),
+    Route("/v1/predict", predict_v1, methods=["POST"]),
+    Route("/healthz", healthz, methods=["GET"]),
+    Route("/readyz", readyz, methods=["GET"]),
+    Route("/stats", stats, methods=["GET"]),
+    Route("/metrics", prometheus_metrics, methods=["GET"]),
+    Mount("/static", app=StaticFiles(directory="static"), name="static"),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(
+            RequestMetricsMiddleware,
+            endpoints=[r.path for r in routes if isinstance(r, Route)],
+        )
+    ],
+    lifespan=lifespan,
+)
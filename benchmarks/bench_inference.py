@@ -0,0 +1,75 @@
+"""
+In-process inference: PredictionPipeline load time, forward-pass latency per
+batch size, single-image predict() latency (decode included) and batched
+predict_proba_batch throughput.
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.measure import latency_summary, peak_rss_mb
+
+
+def _test_images() -> list:
+    from cnnClassifier.utils.dataset import DATASET_SUBDIR
+
+    return sorted(str(p) for p in (Path("artifacts/data_ingestion") / DATASET_SUBDIR / "test").glob("*.jpg"))
+
+
+def run(args) -> dict:
+    start = time.perf_counter()
+    from cnnClassifier.pipeline.prediction_pipeline import PredictionPipeline
+    from cnnClassifier.utils.preprocessing import load_batch
+
+    pipeline = PredictionPipeline()
+    load_seconds = time.perf_counter() - start
+    warm_up_seconds = pipeline.warm_up()
+
+    images = _test_images()
+    result = {
+        "runtime": pipeline.runtime.name,
+        "startup_seconds": round(load_seconds, 3),
+        "warm_up_seconds": round(warm_up_seconds, 3),
+        "forward_pass": {},
+    }
+
+    # forward pass only, on already preprocessed batches
+    for batch_size in args.batch_sizes:
+        rows = [images[i % len(images)] for i in range(batch_size)]
+        batch = load_batch(rows, pipeline.image_size, pipeline.preprocessing)
+        pipeline.predict_on_batch(batch)  # first call at this shape traces
+
+        times = []
+        for _ in range(args.repeats):
+            t = time.perf_counter()
+            pipeline.predict_on_batch(batch)
+            times.append(time.perf_counter() - t)
+        result["forward_pass"][str(batch_size)] = {
+            "images_per_sec": round(batch_size / float(np.mean(times)), 1),
+            "latency": latency_summary(times),
+        }
+
+    # one request end to end: read + decode + resize + forward pass
+    times = []
+    for i in range(args.repeats):
+        t = time.perf_counter()
+        pipeline.predict(images[i % len(images)])
+        times.append(time.perf_counter() - t)
+    result["predict_single"] = {
+        "images_per_sec": round(1.0 / float(np.mean(times)), 1),
+        "latency": latency_summary(times),
+    }
+
+    # offline batch scoring with overlapped decode
+    batch_size = max(args.batch_sizes)
+    t = time.perf_counter()
+    pipeline.predict_proba_batch(images * max(1, args.repeats // 4), batch_size=batch_size)
+    elapsed = time.perf_counter() - t
+    result["predict_proba_batch"] = {
+        "batch_size": batch_size,
+        "images_per_sec": round(len(images) * max(1, args.repeats // 4) / elapsed, 1),
+    }
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
@@ -0,0 +1,106 @@
+"""
+Training input pipeline: images/sec of ModelTraining._df_to_tfdata, per epoch
+(the second epoch shows what DATASET.CACHE buys) and the time the training
+loop would wait for each batch. Also compares the pipeline with
+AUGMENTATION off and on, and times augment_batch on its own.
+"""
+import time
+from pathlib import Path
+
+from benchmarks.measure import latency_summary, peak_rss_mb
+
+
+def run(args) -> dict:
+    start = time.perf_counter()
+
+    from cnnClassifier.components.model_training import ModelTraining
+    from cnnClassifier.config.configuration import ConfigurationManager
+    from cnnClassifier.entity.artifact_entity import DataIngestionArtifact, PrepareBaseModelArtifact
+    from cnnClassifier.utils.common import load_json
+
+    config = ConfigurationManager()
+    prepare_base_model_config = config.get_prepare_base_model_config()
+    trainer = ModelTraining(
+        config=config.get_training_config(),
+        params=config.params,
+        data_ingestion_artifact=DataIngestionArtifact(
+            zip_file_path=Path("artifacts/data_ingestion/data.zip"),
+            unzip_dir=Path("artifacts/data_ingestion"),
+        ),
+        prepare_base_model_artifact=PrepareBaseModelArtifact(
+            base_model_path=prepare_base_model_config.base_model_path,
+            updated_base_model_path=prepare_base_model_config.updated_base_model_path,
+            backbone=prepare_base_model_config.params_backbone,
+            head_architecture=dict(load_json(prepare_base_model_config.head_architecture_path)),
+        ),
+    )
+    df = trainer._load_split_df("train")
+    ds = trainer._df_to_tfdata(df, shuffle=True, split="train")
+    startup_seconds = time.perf_counter() - start
+
+    epochs = _measure_epochs(ds, args.input_epochs)
+
+    # same pipeline without / with the batched augmentation (last epoch, caches warm)
+    augmentation_params = trainer.params.AUGMENTATION
+    enabled = augmentation_params.ENABLED
+    augmentation = {}
+    for name, value in (("off", False), ("on", True)):
+        augmentation_params.ENABLED = value
+        ds = trainer._df_to_tfdata(df, shuffle=True, split="train")
+        augmentation[f"{name}_images_per_sec"] = _measure_epochs(ds, args.input_epochs)[-1]["images_per_sec"]
+    augmentation_params.ENABLED = enabled
+    augmentation["overhead_fraction"] = round(
+        1 - augmentation["on_images_per_sec"] / augmentation["off_images_per_sec"], 3
+    )
+    augmentation["augment_batch"] = _measure_augment_batch(trainer, args.repeats)
+
+    return {
+        "batch_size": trainer.batch_size,
+        "dataset_cache": trainer.dataset_params.CACHE,
+        "startup_seconds": round(startup_seconds, 3),
+        "epochs": epochs,
+        "augmentation": augmentation,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _measure_epochs(ds, num_epochs: int) -> list:
+    epochs = []
+    for epoch in range(num_epochs):
+        waits = []
+        images = 0
+        epoch_start = last = time.perf_counter()
+        for batch, _ in ds:
+            now = time.perf_counter()
+            waits.append(now - last)
+            images += int(batch.shape[0])
+            last = now
+        elapsed = time.perf_counter() - epoch_start
+        epochs.append({
+            "epoch": epoch + 1,
+            "images": images,
+            "seconds": round(elapsed, 3),
+            "images_per_sec": round(images / elapsed, 1),
+            "batch_wait": latency_summary(waits),
+        })
+    return epochs
+
+
+def _measure_augment_batch(trainer, repeats: int) -> dict:
+    """augment_batch alone, on one in-memory batch of the training size"""
+    import tensorflow as tf
+    from cnnClassifier.utils.augmentation import augment_batch
+
+    params = trainer.params.AUGMENTATION
+    images = tf.random.uniform((trainer.batch_size, *trainer.image_size, 3), 0.0, 255.0)
+    augment = tf.function(lambda x: augment_batch(x, params))
+    augment(images).numpy()  # trace
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        augment(images).numpy()
+        timings.append(time.perf_counter() - start)
+    summary = latency_summary(timings)
+    summary["images_per_sec"] = round(trainer.batch_size / (summary["p50_ms"] / 1000), 1)
+    return summary
@@ -0,0 +1,126 @@
+"""
+HTTP serving: starts asgi_app.py under uvicorn in its own process, measures
+time until /healthz and /readyz answer, then requests/sec and latency of
+POST /predict at each client concurrency.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.bench_inference import _test_images
+from benchmarks.fixtures import REPO_ROOT
+from benchmarks.measure import latency_summary, process_peak_rss_mb
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _multipart(field: str, filename: str, data: bytes):
+    """(body, content type) of a one-file multipart/form-data upload"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def _wait_for(url: str, process, timeout: float) -> float:
+    """seconds until `url` answers 200"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        if _status(url) == 200:
+            return time.perf_counter() - start
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def run(args) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(REPO_ROOT / "src"), os.environ.get("PYTHONPATH", "")]))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "asgi_app:app", "--app-dir", str(REPO_ROOT),
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        healthy_seconds = _wait_for(f"{base_url}/healthz", server, timeout=120)
+        ready_seconds = _wait_for(f"{base_url}/readyz", server, timeout=600)
+        startup = {
+            "healthz_seconds": round(healthy_seconds, 3),
+            "readyz_seconds": round(healthy_seconds + ready_seconds, 3),
+        }
+
+        uploads = [
+            _multipart("file", Path(path).name, Path(path).read_bytes())
+            for path in _test_images()
+        ]
+
+        def _request(i):
+            body, content_type = uploads[i % len(uploads)]
+            request = urllib.request.Request(
+                f"{base_url}/predict", data=body, headers={"Content-Type": content_type}
+            )
+            t = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=120) as response:
+                    response.read()
+                    ok = response.status == 200
+            except OSError:
+                ok = False
+            return time.perf_counter() - t, ok
+
+        levels = {}
+        for concurrency in args.concurrency:
+            total = max(args.requests, concurrency)
+            with ThreadPoolExecutor(max_workers=concurrency) as clients:
+                list(clients.map(_request, range(concurrency)))  # warm connections / batch shapes
+                t = time.perf_counter()
+                results = list(clients.map(_request, range(total)))
+                elapsed = time.perf_counter() - t
+
+            latencies = [seconds for seconds, ok in results if ok]
+            levels[str(concurrency)] = {
+                "requests": total,
+                "errors": total - len(latencies),
+                "requests_per_sec": round(len(latencies) / elapsed, 1),
+                "latency": latency_summary(latencies),
+            }
+
+        return {
+            "startup_seconds": startup["readyz_seconds"],
+            "startup": startup,
+            "concurrency": levels,
+            "server_peak_rss_mb": process_peak_rss_mb(server.pid),
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
@@ -0,0 +1,137 @@
+"""
+Offline benchmark environment: a throw-away working directory holding the
+repo's config.yaml, a params.yaml with benchmark overrides, a synthetic
+dataset in the skin_problems_dataset_multilabel CSV layout and a randomly
+initialised model of the configured architecture (no download needed).
+"""
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import yaml
+from PIL import Image
+
+from cnnClassifier.utils.dataset import LABEL_COLUMNS, DATASET_SUBDIR, CLASSES_CSV_NAME
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# params.yaml values every benchmark run uses
+BENCHMARK_PARAMS = {
+    "WEIGHTS": None,  # random init: offline and identical cost
+    "PREDICTION_CACHE.ENABLED": False,  # measure the model, not the cache
+    "PREDICTION_CACHE.PERSIST": False,
+}
+
+
+def set_param(params: dict, dotted_key: str, value):
+    """sets a nested params.yaml value, e.g. 'SERVING.RUNTIME'"""
+    *parents, key = dotted_key.split(".")
+    node = params
+    for parent in parents:
+        node = node[parent]
+    if key not in node:
+        raise KeyError(f"Unknown params.yaml key: {dotted_key}")
+    node[key] = value
+
+
+def write_synthetic_dataset(dataset_root: Path, num_images: int, source_size: int, seed: int = 0):
+    """writes train / valid / test splits of smooth random JPEGs plus their _classes.csv
+
+    Smooth images compress and decode like photos; pure noise would not.
+    """
+    rng = np.random.default_rng(seed)
+    split_sizes = {
+        "train": num_images,
+        "valid": max(1, num_images // 4),
+        "test": max(1, num_images // 4),
+    }
+
+    for split, n in split_sizes.items():
+        split_dir = Path(dataset_root) / split
+        split_dir.mkdir(parents=True, exist_ok=True)
+        rows = []
+        for i in range(n):
+            low_res = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+            img = Image.fromarray(low_res).resize((source_size, source_size), Image.BICUBIC)
+            noisy = np.asarray(img, dtype=np.int16) + rng.integers(-8, 9, (source_size, source_size, 3))
+            filename = f"synthetic_{i:05d}.jpg"
+            Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)).save(split_dir / filename, quality=90)
+            labels = rng.integers(0, 2, len(LABEL_COLUMNS))
+            rows.append(", ".join([filename, *map(str, labels)]))
+
+        with open(split_dir / CLASSES_CSV_NAME, "w") as f:
+            f.write(", ".join(["filename", *LABEL_COLUMNS]) + "\n")
+            f.write("\n".join(rows) + "\n")
+
+
+def prepare_workdir(workdir: Path, overrides: dict, num_images: int, source_size: int) -> dict:
+    """builds the benchmark working directory and chdirs into it
+
+    Args:
+        workdir (Path): directory to (re)create
+        overrides (dict): dotted params.yaml keys -> values, applied after BENCHMARK_PARAMS
+        num_images (int): training images (valid / test get a quarter each)
+        source_size (int): side of the synthetic JPEGs
+
+    Returns:
+        dict: the params actually used
+    """
+    workdir = Path(workdir).resolve()
+    if workdir.exists():
+        shutil.rmtree(workdir)
+    workdir.mkdir(parents=True)
+
+    shutil.copy(REPO_ROOT / "config.yaml", workdir / "config.yaml")
+    with open(REPO_ROOT / "params.yaml") as f:
+        params = yaml.safe_load(f)
+    for key, value in {**BENCHMARK_PARAMS, **overrides}.items():
+        set_param(params, key, value)
+    with open(workdir / "params.yaml", "w") as f:
+        yaml.safe_dump(params, f, sort_keys=False)
+
+    # what asgi_app.py expects next to it
+    os.symlink(REPO_ROOT / "templates", workdir / "templates")
+    (workdir / "static").mkdir()
+
+    os.chdir(workdir)
+    write_synthetic_dataset(
+        Path("artifacts") / "data_ingestion" / DATASET_SUBDIR, num_images, source_size
+    )
+    build_random_model(params)
+    return params
+
+
+def build_random_model(params: dict):
+    """stages 02 + 04 with random weights, plus the metadata stage 03 would write"""
+    from cnnClassifier.components.model_export import ModelExport
+    from cnnClassifier.components.prepare_base_model import PrepareBaseModel
+    from cnnClassifier.config.configuration import ConfigurationManager
+    from cnnClassifier.entity.artifact_entity import ModelTrainingArtifact
+    from cnnClassifier.utils.backbones import get_preprocessing
+    from cnnClassifier.utils.common import save_json
+
+    config = ConfigurationManager()
+    prepare_base_model_artifact = PrepareBaseModel(
+        config=config.get_prepare_base_model_config()
+    ).initiate_prepare_base_model()
+
+    training_config = config.get_training_config()
+    shutil.copy(prepare_base_model_artifact.updated_base_model_path, training_config.trained_model_path)
+    save_json(training_config.model_meta_path, {
+        "backbone": prepare_base_model_artifact.backbone,
+        "preprocessing": get_preprocessing(prepare_base_model_artifact.backbone),
+        "image_size": list(params["IMAGE_SIZE"][:2]),
+        "labels": list(LABEL_COLUMNS),
+        "head_architecture": prepare_base_model_artifact.head_architecture,
+    })
+
+    if params["SERVING"]["RUNTIME"] != "keras":
+        ModelExport(
+            config=config.get_model_export_config(),
+            model_training_artifact=ModelTrainingArtifact(
+                trained_model_path=training_config.trained_model_path,
+                model_meta_path=training_config.model_meta_path,
+            ),
+        ).initiate_model_export()
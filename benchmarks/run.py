@@ -0,0 +1,188 @@
+"""
+Benchmark suite, runs offline on synthetic data:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --suites inference serving --set SERVING.RUNTIME=tflite
+    python -m benchmarks.run --compare benchmarks/results/<earlier run>.json
+
+Every suite runs in a fresh process, so its startup time and peak RSS are
+its own. Results are written to benchmarks/results/<timestamp>.json.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import queue as queue_module
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+from benchmarks.fixtures import REPO_ROOT, prepare_workdir
+
+
+SUITES = {
+    "input": "benchmarks.bench_input",
+    "inference": "benchmarks.bench_inference",
+    "serving": "benchmarks.bench_serving",
+}
+
+# metric name suffix -> True when bigger is better
+TRACKED_METRICS = {
+    "images_per_sec": True,
+    "requests_per_sec": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "startup_seconds": False,
+    "peak_rss_mb": False,
+}
+
+
+def _run_suite(module_name: str, args, queue):
+    import importlib
+
+    try:
+        queue.put(("ok", importlib.import_module(module_name).run(args)))
+    except Exception as e:
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def run_suite(name: str, args) -> dict:
+    """runs one suite in a spawned process"""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_suite, args=(SUITES[name], args, queue))
+
+    start = time.perf_counter()
+    process.start()
+    # a crashed or OOM-killed child never posts its result
+    while True:
+        try:
+            status, result = queue.get(timeout=1.0)
+            break
+        except queue_module.Empty:
+            if not process.is_alive():
+                try:
+                    status, result = queue.get_nowait()  # posted just before exiting
+                except queue_module.Empty:
+                    status, result = "error", f"suite process died with exit code {process.exitcode}"
+                break
+    process.join()
+
+    if status != "ok":
+        return {"error": result}
+    result["wall_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _flatten(result: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in result.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """tracked metrics that got worse than `baseline` by more than `tolerance` (relative)"""
+    now = _flatten(current["results"])
+    before = _flatten(baseline["results"])
+
+    regressions = []
+    for path, old in before.items():
+        suffix = path.rsplit(".", 1)[-1]
+        if suffix not in TRACKED_METRICS or path not in now or not old:
+            continue
+        change = (now[path] - old) / abs(old)
+        worse = -change if TRACKED_METRICS[suffix] else change
+        if worse > tolerance:
+            regressions.append({"metric": path, "baseline": old, "current": now[path], "change": round(change, 3)})
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _parse_override(text: str):
+    key, _, value = text.partition("=")
+    return key, yaml.safe_load(value)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--set", dest="overrides", action="append", type=_parse_override, default=[],
+                        metavar="KEY=VALUE", help="params.yaml override, e.g. SERVING.RUNTIME=tflite")
+    parser.add_argument("--images", type=int, default=128, help="synthetic training images")
+    parser.add_argument("--source-size", type=int, default=640, help="side of the synthetic JPEGs")
+    parser.add_argument("--input-epochs", type=int, default=2)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--repeats", type=int, default=50, help="timed runs per measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--workdir", type=Path, default=REPO_ROOT / "benchmarks" / ".work")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="earlier results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    output = (args.output or REPO_ROOT / "benchmarks" / "results" /
+              f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json").resolve()
+    baseline = args.compare.resolve() if args.compare else None
+
+    params = prepare_workdir(args.workdir, dict(args.overrides), args.images, args.source_size)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpu_count": multiprocessing.cpu_count()},
+        "settings": {
+            "overrides": dict(args.overrides),
+            "backbone": params["BACKBONE"],
+            "image_size": params["IMAGE_SIZE"],
+            "runtime": params["SERVING"]["RUNTIME"],
+            "images": args.images,
+            "source_size": args.source_size,
+        },
+        "results": {},
+    }
+    for name in args.suites:
+        print(f"Running {name} benchmark ...", flush=True)
+        report["results"][name] = run_suite(name, args)
+        print(json.dumps(report["results"][name], indent=2), flush=True)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results saved to: {output}")
+
+    if baseline is not None:
+        with open(baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']} -> {r['current']} ({r['change']:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# Pre-fork multi-process serving:
+#   gunicorn -c gunicorn.conf.py asgi_app:app
+#   gunicorn -c gunicorn.conf.py -k gthread app:app   (Flask)
+#
+# The master maps the model weights once; workers load the model after the
+# fork. TensorFlow is not fork-safe, so the app is deliberately not preloaded
+# in the master. Use SERVING.RUNTIME: tflite (or tflite_quantized) with
+# SERVING.SHARE_WEIGHTS: True so workers share the weight pages instead of
+# holding one copy each.
+#
+# Graceful restart: `kill -HUP <master pid>` replaces workers one by one;
+# MAX_REQUESTS recycles long-lived workers.
+
+import multiprocessing
+
+from cnnClassifier.config.configuration import ConfigurationManager
+from cnnClassifier.pipeline.prediction_pipeline import PredictionPipeline
+from cnnClassifier.pipeline.shared_weights import map_read_only
+from cnnClassifier.logger.logging import logger
+
+_config = ConfigurationManager(create_dirs=False)
+_prefork = _config.get_prefork_config()
+
+bind = _prefork.bind
+workers = _prefork.params_workers or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = False
+timeout = _prefork.params_timeout
+graceful_timeout = _prefork.params_graceful_timeout
+max_requests = _prefork.params_max_requests
+max_requests_jitter = _prefork.params_max_requests_jitter
+
+
+def on_starting(server):
+    runtime_name, model_path, runtime_kwargs = PredictionPipeline.resolve_runtime(_config)
+    map_read_only(model_path)
+    if runtime_name != "tflite" or not runtime_kwargs.get("share_weights"):
+        logger.info(
+            f"Runtime '{runtime_name}' keeps private weights per worker; "
+            "use tflite with SERVING.SHARE_WEIGHTS to share them"
+        )
+
+
+def post_fork(server, worker):
+    logger.info(f"Worker spawned (pid: {worker.pid})")
+
+
+def worker_exit(server, worker):
+    logger.info(f"Worker exited (pid: {worker.pid})")
@@ -1,37 +1,152 @@
-import gdown
+import hashlib
+import http.client
+import json
+import os
+import time
 import zipfile
 from pathlib import Path
+from cnnClassifier.components.data_sources import get_source
 from cnnClassifier.entity.config_entity import DataIngestionConfig
 from cnnClassifier.entity.artifact_entity import DataIngestionArtifact
+from cnnClassifier.utils.archive import extract_zip
 from cnnClassifier.utils.common import create_directories
+from cnnClassifier.utils import profiling
 from cnnClassifier.logger.logging import logger
 
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig):
         self.config = data_ingestion_config
 
-    def download_from_gdrive(self) -> Path:
+        self.zip_path = Path(self.config.local_data_file)
+        # download in progress, renamed to zip_path once complete and verified
+        self.part_path = self.zip_path.with_name(self.zip_path.name + ".part")
+        # {"sha256", "size", "mtime_ns"} of the verified zip
+        self.checksum_path = self.zip_path.with_name(self.zip_path.name + ".sha256")
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _record_checksum(self, digest: str):
+        stat = self.zip_path.stat()
+        with open(self.checksum_path, "w") as f:
+            json.dump({"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+
+    def verify_local_zip(self) -> bool:
         """
-        Download ZIP from Google Drive based on file ID.
+        True if data.zip exists, is a zip and matches the expected checksum
+        (config `sha256`, else the one recorded after its download).
         """
+        if not self.zip_path.exists():
+            return False
+
+        recorded = None
+        if self.checksum_path.exists():
+            with open(self.checksum_path) as f:
+                recorded = json.load(f)
+
+        stat = self.zip_path.stat()
+        unchanged = recorded and recorded["size"] == stat.st_size and recorded["mtime_ns"] == stat.st_mtime_ns
+        if unchanged:
+            digest = recorded["sha256"]  # not modified since it was hashed
+        else:
+            if not zipfile.is_zipfile(self.zip_path):
+                logger.info(f"{self.zip_path} is not a complete zip")
+                return False
+            digest = self._sha256(self.zip_path)
+
+        expected = self.config.sha256 or (recorded or {}).get("sha256") or digest
+        if digest != expected:
+            logger.info(f"{self.zip_path} checksum {digest} != expected {expected}")
+            return False
+
+        if not unchanged:
+            self._record_checksum(digest)
+        return True
+
+    def _download_part(self, source, total: int) -> bool:
+        """appends to data.zip.part from where it stopped; False if the connection dropped"""
+        offset = self.part_path.stat().st_size if self.part_path.exists() else 0
+        if total is not None and offset == total:
+            return True
+        if total is not None and offset > total:
+            offset = 0  # not a prefix of this file, start over
+
+        chunk_size = int(self.config.params_chunk_size_mb * 1024 * 1024)
+        written = offset
         try:
-            url = f"https://drive.google.com/uc?id={self.config.gdrive_file_id}"
-            output_path = str(self.config.local_data_file)
-
-            logger.info(f"Downloading dataset from Google Drive: {url}")
-            logger.info(f"Saving to: {output_path}")
-
-            gdown.download(url, output_path, quiet=False)
-
-            logger.info("Download completed successfully.")
-            return self.config.local_data_file
-
-        except Exception as e:
-            raise e
+            start, chunks = source.open(offset, chunk_size)
+            if offset:
+                logger.info(
+                    f"Resuming download at {start / 1024 / 1024:.1f} MB"
+                    if start else "Source cannot resume, downloading from the start"
+                )
+
+            written, last_log = start, time.perf_counter()
+            with open(self.part_path, "r+b" if self.part_path.exists() else "wb") as f:
+                f.seek(start)
+                f.truncate()
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+                    if time.perf_counter() - last_log > 5:
+                        last_log = time.perf_counter()
+                        logger.info(f"Downloaded {written / 1024 / 1024:.1f} MB" + (
+                            f" of {total / 1024 / 1024:.1f} MB" if total else ""
+                        ))
+        except (OSError, http.client.HTTPException) as e:
+            # HTTPException: a truncated body (IncompleteRead) is a dropped connection too
+            logger.info(f"Download interrupted at {written / 1024 / 1024:.1f} MB: {e}")
+            return False
+        return total is None or written >= total
+
+    def download_dataset(self) -> Path:
+        """
+        Downloads the dataset zip from the configured source in chunks,
+        resuming an interrupted download, and verifies it before use.
+        A verified data.zip is not downloaded again.
+        """
+        if self.verify_local_zip():
+            logger.info(f"Dataset zip is up to date: {self.zip_path}")
+            return self.zip_path
+
+        source = get_source(self.config.source_url)
+        total = source.size()
+        logger.info(f"Downloading dataset from {source} to: {self.part_path}")
+
+        for attempt in range(self.config.params_retries + 1):
+            if self._download_part(source, total):
+                break
+            logger.info(f"Retrying download ({attempt + 1}/{self.config.params_retries})")
+        else:
+            raise IOError(f"Download from {source} failed after {self.config.params_retries} retries")
+
+        size = self.part_path.stat().st_size
+        if total is not None and size != total:
+            raise IOError(f"Downloaded {size} bytes, expected {total}")
+
+        digest = self._sha256(self.part_path)
+        if self.config.sha256 and digest != self.config.sha256:
+            # a corrupt partial download must not be resumed
+            self.part_path.unlink()
+            raise ValueError(f"Checksum mismatch for {source}: got {digest}, expected {self.config.sha256}")
+        if not zipfile.is_zipfile(self.part_path):
+            self.part_path.unlink()
+            raise ValueError(f"Downloaded file from {source} is not a zip")
+
+        os.replace(self.part_path, self.zip_path)
+        self._record_checksum(digest)
+        logger.info(f"Download completed and verified (sha256 {digest})")
+        return self.zip_path
 
     def extract_zip_file(self, zip_path: Path = None) -> Path:
         """
-        Extract the downloaded ZIP.
+        Extract the downloaded ZIP, skipping files already extracted
+        with the same size and CRC.
         """
         try:
             if zip_path is None:
@@ -42,8 +157,9 @@ class DataIngestion:
 
             logger.info(f"Extracting: {zip_path}")
 
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(unzip_dir)
+            counts = extract_zip(zip_path, unzip_dir, workers=self.config.params_extract_workers)
+            profiling.record("members_extracted", counts["extracted"])
+            profiling.record("members_skipped", counts["skipped"])
 
             logger.info(f"Extraction completed: {unzip_dir}")
             return unzip_dir
@@ -53,16 +169,28 @@ class DataIngestion:
 
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
         """
-        Run download + extraction.
+        Run download + extraction (or only the download, INGESTION.MODE zip).
         """
         logger.info("=== Starting Data Ingestion ===")
 
-        zip_path = self.download_from_gdrive()
-        unzip_path = self.extract_zip_file(zip_path)
+        mode = self.config.params_mode
+        if mode not in ("extract", "zip"):
+            raise ValueError(f"Unknown INGESTION.MODE '{mode}', expected 'extract' or 'zip'")
+
+        with profiling.stage("download"):
+            zip_path = self.download_dataset()
+
+        if mode == "zip":
+            logger.info(f"Reading images straight from: {zip_path}")
+            unzip_path = None
+        else:
+            with profiling.stage("extract"):
+                unzip_path = self.extract_zip_file(zip_path)
 
         artifact = DataIngestionArtifact(
             zip_file_path=zip_path,
-            unzip_dir=unzip_path
+            unzip_dir=unzip_path,
+            read_from_zip=mode == "zip",
         )
 
         logger.info("Data Ingestion Artifact created successfully.")
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from cnnClassifier.entity.config_entity import DataPreprocessingConfig
+from cnnClassifier.entity.artifact_entity import (
+    DataIngestionArtifact,
+    DataPreprocessingArtifact,
+)
+from cnnClassifier.utils.archive import open_binary, read_bytes, signature
+from cnnClassifier.utils.common import create_directories
+from cnnClassifier.utils.preprocessing import DECODE_VERSION
+from cnnClassifier.utils import profiling
+from cnnClassifier.utils.dataset import (
+    LABEL_COLUMNS,
+    CLASSES_CSV_NAME,
+    SPLITS,
+    load_split_df,
+    dataset_root,
+    decode_and_resize,
+)
+from cnnClassifier.logger.logging import logger
+
+
+class DataPreprocessing:
+    """
+    Stage 01b: decode + resize every split once into uint8 TFRecord shards
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(
+        self,
+        config: DataPreprocessingConfig,
+        data_ingestion_artifact: DataIngestionArtifact,
+    ):
+        self.config = config
+        self.data_ingestion_artifact = data_ingestion_artifact
+
+        self.image_size = tuple(self.config.params_image_size[:2])
+        self.dataset_root = dataset_root(self.data_ingestion_artifact)
+
+    def _fingerprint(self, split: str, df) -> str:
+        """
+        Changes whenever the CSV, any image (name, size, mtime or CRC), the
+        image size or the decode method (DECODE_VERSION) changes.
+        """
+        h = hashlib.sha256(f"{self.image_size}:decode{DECODE_VERSION}".encode())
+        with open_binary(self.dataset_root / split / CLASSES_CSV_NAME) as f:
+            h.update(f.read())
+        for path in df["filepath"]:
+            h.update(f"{os.path.basename(path)}:{signature(path)};".encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def _serialize(image: np.ndarray, label: np.ndarray) -> bytes:
+        example = tf.train.Example(
+            features=tf.train.Features(
+                feature={
+                    "image": tf.train.Feature(bytes_list=tf.train.BytesList(value=[image.tobytes()])),
+                    "label": tf.train.Feature(float_list=tf.train.FloatList(value=label.tolist())),
+                }
+            )
+        )
+        return example.SerializeToString()
+
+    def _write_split(self, split: str, df, split_dir: Path) -> list:
+        """
+        Decodes the split in parallel and writes it into `SHARD_SIZE`-image shards.
+        """
+        labels = df[LABEL_COLUMNS].values.astype("float32")
+
+        ds = tf.data.Dataset.from_tensor_slices((df["filepath"].tolist(), labels))
+        ds = ds.map(
+            lambda path, label: (
+                tf.cast(tf.round(decode_and_resize(path, self.image_size)), tf.uint8),
+                label,
+            ),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        ).prefetch(tf.data.AUTOTUNE)
+
+        shard_size = self.config.params_shard_size
+        num_shards = max(1, -(-len(df) // shard_size))
+        shard_names = [f"{split}-{i:05d}-of-{num_shards:05d}.tfrecord" for i in range(num_shards)]
+
+        writer = None
+        for i, (image, label) in enumerate(ds.as_numpy_iterator()):
+            if i % shard_size == 0:
+                if writer is not None:
+                    writer.close()
+                writer = tf.io.TFRecordWriter(str(split_dir / shard_names[i // shard_size]))
+            writer.write(self._serialize(image, label))
+        if writer is not None:
+            writer.close()
+
+        return shard_names
+
+    def _prepare_split(self, split: str) -> Path:
+        df = load_split_df(self.dataset_root, split)
+        split_dir = Path(self.config.shards_dir) / split
+        manifest_path = split_dir / self.MANIFEST_NAME
+        fingerprint = self._fingerprint(split, df)
+
+        if manifest_path.exists():
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("fingerprint") == fingerprint and all(
+                (split_dir / name).exists() for name in manifest["shards"]
+            ):
+                logger.info(f"{split} shards are up to date: {split_dir}")
+                return split_dir
+
+        logger.info(f"Writing {split} shards ({len(df)} images) to: {split_dir}")
+        if split_dir.exists():
+            shutil.rmtree(split_dir)
+        create_directories([split_dir])
+
+        shard_names = self._write_split(split, df, split_dir)
+        (split_dir / CLASSES_CSV_NAME).write_bytes(read_bytes(self.dataset_root / split / CLASSES_CSV_NAME))
+
+        # manifest is written last, so an interrupted run is rebuilt next time
+        with open(manifest_path, "w") as f:
+            json.dump(
+                {
+                    "fingerprint": fingerprint,
+                    "num_examples": len(df),
+                    "image_size": list(self.image_size),
+                    "shards": shard_names,
+                },
+                f,
+                indent=4,
+            )
+        return split_dir
+
+    def initiate_data_preprocessing(self) -> DataPreprocessingArtifact:
+        """
+        Writes (or reuses) the shards of every split.
+        """
+        logger.info("=== Stage 01b: Data Preprocessing started ===")
+
+        for split in SPLITS:
+            with profiling.stage(split):
+                self._prepare_split(split)
+
+        logger.info("=== Stage 01b: Data Preprocessing completed ===")
+
+        return DataPreprocessingArtifact(
+            shards_dir=self.config.shards_dir,
+        )
@@ -0,0 +1,117 @@
+import abc
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlparse
+
+from cnnClassifier.logger.logging import logger
+
+
+class DataSource(abc.ABC):
+    """
+    Where the dataset zip is downloaded from.
+
+    `open(offset)` returns (start, chunks): the byte offset the chunks
+    actually start at (0 when the source cannot seek, so the download
+    restarts) and an iterator over the remaining bytes.
+    """
+
+    def size(self) -> int:
+        """total size in bytes, None when unknown"""
+        return None
+
+    @abc.abstractmethod
+    def open(self, offset: int, chunk_size: int):
+        """(start offset, iterator of byte chunks from there)"""
+
+
+class LocalFileSource(DataSource):
+    """A zip on a local or mounted filesystem (file:// URL or plain path)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def __repr__(self):
+        return f"LocalFileSource({self.path})"
+
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def open(self, offset: int, chunk_size: int):
+        def _chunks():
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                yield from iter(lambda: f.read(chunk_size), b"")
+
+        return offset, _chunks()
+
+
+class HttpSource(DataSource):
+    """Plain HTTP(S) download; resumes with a Range request when the server supports it."""
+
+    def __init__(self, url: str, timeout: float = 60):
+        self.url = url
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"HttpSource({self.url})"
+
+    def size(self) -> int:
+        request = urllib.request.Request(self.url, method="HEAD")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                length = response.headers.get("Content-Length")
+        except (urllib.error.URLError, OSError) as e:
+            logger.info(f"HEAD {self.url} failed ({e}), size unknown")
+            return None
+        return int(length) if length else None
+
+    def open(self, offset: int, chunk_size: int):
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        response = urllib.request.urlopen(
+            urllib.request.Request(self.url, headers=headers), timeout=self.timeout
+        )
+        # 200 to a Range request: the server sends the whole file again
+        start = offset if response.status == 206 else 0
+
+        def _chunks():
+            with response:
+                yield from iter(lambda: response.read(chunk_size), b"")
+
+        return start, _chunks()
+
+
+class GDriveSource(HttpSource):
+    """A publicly shared Google Drive file, by file id."""
+
+    URL = "https://drive.usercontent.google.com/download?id={file_id}&export=download&confirm=t"
+
+    def __init__(self, file_id: str, timeout: float = 60):
+        super().__init__(self.URL.format(file_id=file_id), timeout)
+        self.file_id = file_id
+
+    def __repr__(self):
+        return f"GDriveSource({self.file_id})"
+
+
+# URL scheme -> factory taking the URL
+SOURCES = {
+    "http": HttpSource,
+    "https": HttpSource,
+    "file": lambda url: LocalFileSource(urlparse(url).path),
+    "gdrive": lambda url: GDriveSource(urlparse(url).netloc),
+}
+
+
+def get_source(url: str) -> DataSource:
+    """
+    Source for a dataset URL: http(s)://..., file://..., gdrive://<file id>
+    or a plain local path.
+    """
+    scheme = urlparse(url).scheme
+    if scheme not in SOURCES:
+        if scheme and len(scheme) > 1:  # a one-letter scheme is a Windows drive
+            raise ValueError(f"Unsupported dataset source '{url}', expected one of {list(SOURCES)}")
+        return LocalFileSource(url)
+    return SOURCES[scheme](url)
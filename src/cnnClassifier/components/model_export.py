@@ -0,0 +1,97 @@
+from pathlib import Path
+import shutil
+
+import tensorflow as tf
+from tensorflow import keras
+
+from cnnClassifier.entity.config_entity import ModelExportConfig
+from cnnClassifier.entity.artifact_entity import (
+    ModelTrainingArtifact,
+    ModelExportArtifact,
+)
+from cnnClassifier.utils.common import create_directories, get_size
+from cnnClassifier.utils import profiling
+from cnnClassifier.logger.logging import logger
+
+
+class ModelExport:
+    """
+    Stage 04: export the trained model for serving (SavedModel / TFLite)
+    """
+
+    SIGNATURE_NAME = "serving_default"
+    INPUT_NAME = "image"
+    OUTPUT_NAME = "probabilities"
+
+    def __init__(
+        self,
+        config: ModelExportConfig,
+        model_training_artifact: ModelTrainingArtifact,
+    ):
+        self.config = config
+        self.model_training_artifact = model_training_artifact
+
+    def _serving_function(self, model: keras.Model):
+        """
+        Concrete inference function; the batch dimension is fixed when
+        `FIXED_BATCH_SIZE` > 0 and dynamic otherwise.
+        """
+        batch_size = self.config.params_fixed_batch_size or None
+        input_shape = (batch_size, *self.config.params_image_size)
+
+        @tf.function(input_signature=[tf.TensorSpec(input_shape, tf.float32, name=self.INPUT_NAME)])
+        def serve(image):
+            return {self.OUTPUT_NAME: model(image, training=False)}
+
+        return serve
+
+    def export_saved_model(self, model: keras.Model, serve) -> Path:
+        export_dir = self.config.saved_model_dir
+        if export_dir.exists():
+            shutil.rmtree(export_dir)
+
+        logger.info(f"Exporting SavedModel to: {export_dir}")
+        tf.saved_model.save(model, str(export_dir), signatures={self.SIGNATURE_NAME: serve})
+        return export_dir
+
+    def export_tflite(self, model: keras.Model, serve) -> Path:
+        tflite_path = self.config.tflite_model_path
+        create_directories([tflite_path.parent])
+
+        logger.info(f"Exporting TFLite model to: {tflite_path}")
+        converter = tf.lite.TFLiteConverter.from_concrete_functions(
+            [serve.get_concrete_function()], model
+        )
+        with open(tflite_path, "wb") as f:
+            f.write(converter.convert())
+
+        logger.info(f"TFLite model size: {get_size(tflite_path)}")
+        return tflite_path
+
+    def initiate_model_export(self) -> ModelExportArtifact:
+        """
+        Loads the trained Keras model and writes the configured formats.
+        """
+        logger.info("=== Stage 04: Model Export started ===")
+
+        model_path = self.model_training_artifact.trained_model_path
+        logger.info(f"Loading trained model from: {model_path}")
+        model = keras.models.load_model(model_path, compile=False)
+        serve = self._serving_function(model)
+
+        formats = self.config.params_formats
+        saved_model_dir = tflite_model_path = None
+        if "saved_model" in formats:
+            with profiling.stage("saved_model"):
+                saved_model_dir = self.export_saved_model(model, serve)
+        if "tflite" in formats:
+            with profiling.stage("tflite"):
+                tflite_model_path = self.export_tflite(model, serve)
+
+        logger.info("=== Stage 04: Model Export completed ===")
+
+        return ModelExportArtifact(
+            saved_model_dir=saved_model_dir,
+            tflite_model_path=tflite_model_path,
+            fixed_batch_size=self.config.params_fixed_batch_size,
+        )
@@ -0,0 +1,171 @@
+from pathlib import Path
+import json
+import os
+import shutil
+
+import tensorflow as tf
+from tensorflow import keras
+
+from cnnClassifier.entity.config_entity import ModelQuantizationConfig
+from cnnClassifier.entity.artifact_entity import (
+    DataIngestionArtifact,
+    ModelTrainingArtifact,
+    ModelQuantizationArtifact,
+)
+from cnnClassifier.pipeline.runtimes import TFLiteRuntime
+from cnnClassifier.utils.common import create_directories, load_json
+from cnnClassifier.utils import profiling
+from cnnClassifier.utils.dataset import (
+    load_split_df,
+    dataset_root,
+    make_image_dataset,
+)
+from cnnClassifier.logger.logging import logger
+
+
+class ModelQuantization:
+    """
+    Stage 05: post-training quantization with an accuracy gate
+    """
+
+    VARIANTS = ("dynamic_range", "float16", "int8")
+
+    def __init__(
+        self,
+        config: ModelQuantizationConfig,
+        data_ingestion_artifact: DataIngestionArtifact,
+        model_training_artifact: ModelTrainingArtifact,
+    ):
+        self.config = config
+        self.data_ingestion_artifact = data_ingestion_artifact
+        self.model_training_artifact = model_training_artifact
+
+        self.image_size = tuple(self.config.params_image_size[:2])
+        self.dataset_root = dataset_root(self.data_ingestion_artifact)
+
+        # calibrate and evaluate with the preprocessing the model was trained with
+        self.preprocessing = load_json(self.model_training_artifact.model_meta_path).preprocessing
+
+    def _representative_dataset(self):
+        """
+        A few preprocessed training images, used to calibrate int8 ranges.
+        """
+        df = load_split_df(self.dataset_root, "train")
+        n = min(self.config.params_representative_samples, len(df))
+        df = df.sample(n=n, random_state=42)
+        ds = make_image_dataset(df, self.image_size, batch_size=1, preprocessing=self.preprocessing)
+
+        def _gen():
+            for images, _ in ds:
+                yield [tf.cast(images, tf.float32)]
+
+        return _gen
+
+    def _convert(self, model: keras.Model, variant: str) -> bytes:
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+        if variant == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        elif variant == "int8":
+            # every op in int8; inputs/outputs stay float so serving is unchanged
+            converter.representative_dataset = self._representative_dataset()
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+        return converter.convert()
+
+    @staticmethod
+    def _binary_accuracy(predict_fn, ds: tf.data.Dataset) -> float:
+        """
+        Same metric as training (`binary_accuracy`, threshold 0.5).
+        """
+        metric = keras.metrics.BinaryAccuracy()
+        for images, labels in ds:
+            metric.update_state(labels, predict_fn(images.numpy()))
+        return float(metric.result().numpy())
+
+    def initiate_model_quantization(self) -> ModelQuantizationArtifact:
+        """
+        Builds every variant, scores it on the test split and promotes the
+        smallest one whose accuracy drop is within tolerance.
+        """
+        logger.info("=== Stage 05: Model Quantization started ===")
+        create_directories([self.config.root_dir])
+
+        model_path = self.model_training_artifact.trained_model_path
+        logger.info(f"Loading trained model from: {model_path}")
+        model = keras.models.load_model(model_path, compile=False)
+
+        test_ds = make_image_dataset(
+            load_split_df(self.dataset_root, "test"),
+            self.image_size,
+            batch_size=self.config.params_batch_size,
+            preprocessing=self.preprocessing,
+        )
+
+        baseline = self._binary_accuracy(lambda x: model(x, training=False).numpy(), test_ds)
+        logger.info(f"Baseline test binary_accuracy: {baseline:.4f}")
+
+        report = {
+            "baseline": {
+                "binary_accuracy": baseline,
+                "size_bytes": os.path.getsize(model_path),
+            },
+            "tolerance": self.config.params_tolerance,
+            "variants": {},
+        }
+        variant_paths = {}
+
+        for variant in self.config.params_variants:
+            if variant not in self.VARIANTS:
+                raise ValueError(f"Unknown quantization variant '{variant}', expected one of {self.VARIANTS}")
+
+            logger.info(f"Converting {variant} variant")
+            path = Path(self.config.root_dir) / f"model_{variant}.tflite"
+            with profiling.stage(f"convert_{variant}"):
+                with open(path, "wb") as f:
+                    f.write(self._convert(model, variant))
+            variant_paths[variant] = path
+
+            with profiling.stage(f"evaluate_{variant}"):
+                runtime = TFLiteRuntime(path)
+                accuracy = self._binary_accuracy(runtime.predict, test_ds)
+            drop = baseline - accuracy
+            report["variants"][variant] = {
+                "path": str(path),
+                "size_bytes": os.path.getsize(path),
+                "binary_accuracy": accuracy,
+                "accuracy_drop": drop,
+                "accepted": drop <= self.config.params_tolerance,
+            }
+            logger.info(
+                f"{variant}: binary_accuracy {accuracy:.4f} (drop {drop:+.4f}), "
+                f"{os.path.getsize(path) / 1024 / 1024:.1f} MB"
+            )
+
+        accepted = [v for v, r in report["variants"].items() if r["accepted"]]
+        promoted_variant = min(accepted, key=lambda v: report["variants"][v]["size_bytes"]) if accepted else None
+        promoted_model_path = None
+
+        if promoted_variant is not None:
+            promoted_model_path = self.config.promoted_model_path
+            shutil.copy(variant_paths[promoted_variant], promoted_model_path)
+            logger.info(f"Promoted {promoted_variant} variant to: {promoted_model_path}")
+        else:
+            # a promoted model of an earlier run is a quantized copy of an older model
+            Path(self.config.promoted_model_path).unlink(missing_ok=True)
+            logger.info("No quantized variant is within tolerance; nothing promoted.")
+
+        report["promoted"] = promoted_variant
+        with open(self.config.report_path, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.info(f"Quantization report saved at: {self.config.report_path}")
+
+        logger.info("=== Stage 05: Model Quantization completed ===")
+
+        return ModelQuantizationArtifact(
+            variant_paths=variant_paths,
+            report_path=self.config.report_path,
+            promoted_variant=promoted_variant,
+            promoted_model_path=promoted_model_path,
+        )
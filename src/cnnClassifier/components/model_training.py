@@ -1,6 +1,11 @@
 from pathlib import Path
+import hashlib
+import json
 import os
+import shutil
+import time
 
+import numpy as np
 import pandas as pd
 import tensorflow as tf
 from tensorflow import keras
@@ -9,10 +14,33 @@ from cnnClassifier.entity.config_entity import TrainingConfig
 
 from cnnClassifier.entity.artifact_entity import (
     DataIngestionArtifact,
+    DataPreprocessingArtifact,
     PrepareBaseModelArtifact,
     ModelTrainingArtifact,
 )
+from cnnClassifier.components.training_callbacks import (
+    ThroughputLogger,
+    StepProfiler,
+    ProfilerTrace,
+    TrainingCheckpoint,
+    BestModelSelector,
+)
 from cnnClassifier.logger.logging import logger
+from cnnClassifier.utils.backbones import get_preprocessing, layer_blocks
+from cnnClassifier.utils.archive import signature
+from cnnClassifier.utils.augmentation import augment_batch
+from cnnClassifier.utils.common import save_json
+from cnnClassifier.utils import distribute, profiling
+from cnnClassifier.utils.dataset import (
+    LABEL_COLUMNS,
+    DATASET_SUBDIR,
+    CLASSES_CSV_NAME,
+    load_split_df,
+    dataset_root,
+    decode_and_resize,
+    normalize_image,
+)
+from cnnClassifier.utils.preprocessing import DECODE_VERSION
 
 
 class ModelTraining:
@@ -21,23 +49,29 @@ class ModelTraining:
     """
 
     # label column names from your CSV header (exactly as you sent)
-    LABEL_COLUMNS = [
-        "Acne",
-        "Blackheads",
-        "Dark Spots",
-        "Dry Skin",
-        "Eye bags",
-        "Normal Skin",
-        "Oily Skin",
-        "Pores",
-        "Skin Redness",
-        "Wrinkles",
-    ]
-
-    DATASET_SUBDIR = "skin_problems_dataset_multilabel" # folder created after unzip
-    TRAIN_CSV_NAME = "_classes.csv"
-    VALID_CSV_NAME = "_classes.csv"
-    TEST_CSV_NAME =  "_classes.csv"
+    LABEL_COLUMNS = LABEL_COLUMNS
+
+    DATASET_SUBDIR = DATASET_SUBDIR # folder created after unzip
+    TRAIN_CSV_NAME = CLASSES_CSV_NAME
+    VALID_CSV_NAME = CLASSES_CSV_NAME
+    TEST_CSV_NAME =  CLASSES_CSV_NAME
+
+    # output of this layer is what the frozen base feeds into the ANN head
+    # (default for models prepared before the head was configurable)
+    FEATURE_LAYER_NAME = "flatten"
+
+    # params that do not change what a checkpoint contains
+    CHECKPOINT_KEY_IGNORED = (
+        "PIPELINE",
+        "PROFILING",
+        "EXPORT",
+        "QUANTIZATION",
+        "SERVING",
+        "PREDICTION_CACHE",
+        "CHECKPOINT",
+        "EARLY_STOPPING",
+        "SWEEP",
+    )
 
 
      
@@ -48,19 +82,52 @@ class ModelTraining:
         params,
         data_ingestion_artifact: DataIngestionArtifact,
         prepare_base_model_artifact: PrepareBaseModelArtifact,
+        data_preprocessing_artifact: DataPreprocessingArtifact = None,
     ):
         self.config = config
         self.params = params
         self.data_ingestion_artifact = data_ingestion_artifact
         self.prepare_base_model_artifact = prepare_base_model_artifact
+        self.data_preprocessing_artifact = data_preprocessing_artifact
 
         # params
         self.image_size = tuple(self.params.IMAGE_SIZE[:2])  # (224, 224)
+
+        # data parallel across DISTRIBUTE.STRATEGY workers; batch_size is the global batch
+        self.strategy = distribute.get_strategy(self.params.DISTRIBUTE.STRATEGY)
+        self.num_workers = distribute.num_workers() if distribute.is_distributed() else 1
+        self.worker_index = distribute.worker_index() if self.num_workers > 1 else 0
+        self.is_chief = self.worker_index == 0
         self.batch_size = self.params.BATCH_SIZE
+        if self.params.DISTRIBUTE.SCALE_BATCH_SIZE:
+            self.batch_size *= self.num_workers
         self.epochs = self.params.EPOCHS
+        self.training_mode = self.params.TRAINING_MODE  # "full" | "bottleneck"
+        self.input_format = self.params.INPUT_FORMAT  # "files" | "shards"
+        self.dataset_params = self.params.DATASET
+        self.fine_tune_params = self.params.FINE_TUNE
+        self.mixed_precision = self.params.MIXED_PRECISION
+        self.jit_compile = self.params.JIT_COMPILE
+        self.checkpoint_params = self.params.CHECKPOINT
+        self.early_stopping_params = self.params.EARLY_STOPPING
+        self.best_model_selector = None  # shared by all phases, see _prepare_checkpoints
+
+        # other workers keep their own checkpoints, the chief's folder is its alone
+        self.checkpoint_dir = Path(self.config.checkpoint_dir)
+        if not self.is_chief:
+            self.checkpoint_dir = self.checkpoint_dir.with_name(
+                f"{self.checkpoint_dir.name}_worker{self.worker_index}"
+            )
+
+        # preprocessing must match the backbone's ImageNet weights
+        self.backbone = self.prepare_base_model_artifact.backbone
+        self.preprocessing = get_preprocessing(self.backbone)
+
+        head_architecture = self.prepare_base_model_artifact.head_architecture or {}
+        self.feature_layer_name = head_architecture.get("feature_layer", self.FEATURE_LAYER_NAME)
 
         # build dataset root
-        self.dataset_root = Path(self.data_ingestion_artifact.unzip_dir) / self.DATASET_SUBDIR
+        self.dataset_root = dataset_root(self.data_ingestion_artifact)
 
     # ---------- helpers for data pipeline ----------
 
@@ -75,24 +142,84 @@ class ModelTraining:
         else:
             csv_name = self.TEST_CSV_NAME
 
-        csv_path = self.dataset_root / split / csv_name
-        logger.info(f"Reading {split} CSV from: {csv_path}")
-        df = pd.read_csv(csv_path)
-        
-        df.columns = df.columns.str.strip() 
+        return load_split_df(self.dataset_root, split, csv_name)
+
+    def _dataset_options(self) -> tf.data.Options:
+        """
+        Threading, determinism and autotune budget from params.DATASET.
+        """
+        params = self.dataset_params
+        options = tf.data.Options()
+        options.deterministic = params.DETERMINISTIC
+        if self.num_workers > 1:
+            # _shard_inputs already gave every worker its own part of the inputs
+            options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+        if params.PRIVATE_THREADPOOL_SIZE:
+            options.threading.private_threadpool_size = params.PRIVATE_THREADPOOL_SIZE
+        if params.AUTOTUNE_RAM_BUDGET_MB:
+            options.autotune.ram_budget = int(params.AUTOTUNE_RAM_BUDGET_MB) * 1024 * 1024
+        return options
+
+    def _shard_inputs(self, ds: tf.data.Dataset) -> tf.data.Dataset:
+        """
+        Keeps every NUM_SHARDS-th input, before any decoding happens, and
+        splits that between the workers of a multi-worker run.
+        """
+        num_shards = self.dataset_params.NUM_SHARDS * self.num_workers
+        if num_shards > 1:
+            shard_index = self.dataset_params.SHARD_INDEX * self.num_workers + self.worker_index
+            ds = ds.shard(num_shards, shard_index)
+        return ds
+
+    def _cache(self, ds: tf.data.Dataset, split: str, sources: list) -> tf.data.Dataset:
+        """
+        Caches decoded images in memory or on disk (CACHE: none | memory | disk).
+        The disk cache is keyed by every source file (path, size, mtime or CRC).
+        """
+        mode = self.dataset_params.CACHE
+        if split is None or mode == "none":
+            return ds
+        if mode == "memory":
+            return ds.cache()
+        if mode == "disk":
+            cache_dir = Path(self.config.dataset_cache_dir)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # [0, 255] pixels: the backbone preprocessing runs after the cache
+            h = hashlib.sha256(
+                f"{self.image_size}:{self.dataset_params.NUM_SHARDS}:{self.dataset_params.SHARD_INDEX}:"
+                f"{self.num_workers}:{self.worker_index}:raw:decode{DECODE_VERSION}".encode()
+            )
+            for path in sources:
+                h.update(f"{path}:{signature(path)};".encode())
+            return ds.cache(str(cache_dir / f"{split}_{h.hexdigest()[:16]}"))
+        raise ValueError(f"Unknown DATASET.CACHE mode: {mode}")
+
+    def _finish_dataset(self, ds: tf.data.Dataset, shuffle: bool, augment: bool = False) -> tf.data.Dataset:
+        """
+        Bounded shuffle + batch + (augmentation) + backbone preprocessing +
+        prefetch + options, shared by every input format. Augmentation and
+        preprocessing run once per batch rather than once per image.
+        """
+        if shuffle:
+            ds = ds.shuffle(buffer_size=self.dataset_params.SHUFFLE_BUFFER)
 
-        # ensure filename column + labels exist
-        missing = [c for c in self.LABEL_COLUMNS + ["filename"] if c not in df.columns]
-        if missing:
-            raise ValueError(f"Missing columns in {split} CSV: {missing}")
+        augmentation = self.params.AUGMENTATION
+        augment = augment and augmentation.ENABLED
 
-        # build full image paths
-        img_dir = self.dataset_root / split
-        df["filepath"] = df["filename"].apply(lambda fn: os.path.join(img_dir, fn))
+        def _prepare_batch(images, labels):
+            if augment:
+                images = augment_batch(images, augmentation)
+            return normalize_image(images, self.preprocessing), labels
 
-        return df
+        ds = ds.batch(self.batch_size)
+        ds = ds.map(_prepare_batch, num_parallel_calls=tf.data.AUTOTUNE)
+        ds = ds.prefetch(tf.data.AUTOTUNE)
+        return ds.with_options(self._dataset_options())
 
-    def _df_to_tfdata(self, df: pd.DataFrame, shuffle: bool = True) -> tf.data.Dataset:
+    def _df_to_tfdata(self, df: pd.DataFrame, shuffle: bool = True, split: str = None) -> tf.data.Dataset:
+        """
+        Decoded, resized images of `df`; the training split is augmented.
+        """
         filepaths = df["filepath"].tolist()
         labels = df[self.LABEL_COLUMNS].values.astype("float32")
 
@@ -100,87 +227,595 @@ class ModelTraining:
         labels_tensor = tf.constant(labels, dtype=tf.float32)
 
         def _process(path, label):
-            img = tf.io.read_file(path)
-            img = tf.image.decode_jpeg(img, channels=3)
-            img = tf.image.resize(img, self.image_size)
-            img = img / 255.0  # normalise
-            return img, label
+            return decode_and_resize(path, self.image_size), label
 
         ds = tf.data.Dataset.from_tensor_slices((paths_tensor, labels_tensor))
+        ds = self._shard_inputs(ds)
         ds = ds.map(_process, num_parallel_calls=tf.data.AUTOTUNE)
+        ds = self._cache(ds, split, sources=filepaths)
+
+        return self._finish_dataset(ds, shuffle, augment=split == "train")
 
+    def _shards_to_tfdata(self, split: str, shuffle: bool = True) -> tf.data.Dataset:
+        """
+        Streams a split from the uint8 TFRecord shards written by DataPreprocessing.
+        """
+        split_dir = Path(self.data_preprocessing_artifact.shards_dir) / split
+        shard_files = sorted(str(p) for p in split_dir.glob("*.tfrecord"))
+        if not shard_files:
+            raise FileNotFoundError(f"No shards found in: {split_dir}")
+
+        height, width = self.image_size
+        feature_spec = {
+            "image": tf.io.FixedLenFeature([], tf.string),
+            "label": tf.io.FixedLenFeature([len(self.LABEL_COLUMNS)], tf.float32),
+        }
+
+        def _parse(record):
+            example = tf.io.parse_single_example(record, feature_spec)
+            img = tf.io.decode_raw(example["image"], tf.uint8)
+            img = tf.reshape(img, (height, width, 3))
+            return tf.cast(img, tf.float32), example["label"]
+
+        ds = tf.data.Dataset.from_tensor_slices(shard_files)
+        ds = self._shard_inputs(ds)
         if shuffle:
-            ds = ds.shuffle(buffer_size=len(filepaths))
+            ds = ds.shuffle(buffer_size=len(shard_files))
+
+        # read several shards at once so file I/O overlaps with parsing
+        ds = ds.interleave(
+            tf.data.TFRecordDataset,
+            cycle_length=min(len(shard_files), 8),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not shuffle,
+        )
+        ds = ds.map(_parse, num_parallel_calls=tf.data.AUTOTUNE)
+        ds = self._cache(ds, split, sources=shard_files)
 
-        ds = ds.batch(self.batch_size).prefetch(tf.data.AUTOTUNE)
-        return ds
+        return self._finish_dataset(ds, shuffle, augment=split == "train")
 
     def _create_datasets(self):
+        if self.input_format == "shards":
+            logger.info(f"Reading datasets from shards in: {self.data_preprocessing_artifact.shards_dir}")
+            train_ds = self._shards_to_tfdata("train", shuffle=True)
+            valid_ds = self._shards_to_tfdata("valid", shuffle=False)
+            test_ds = self._shards_to_tfdata("test", shuffle=False)
+            return train_ds, valid_ds, test_ds
+
         train_df = self._load_split_df("train")
         valid_df = self._load_split_df("valid")
         test_df = self._load_split_df("test")
 
-        train_ds = self._df_to_tfdata(train_df, shuffle=True)
-        valid_ds = self._df_to_tfdata(valid_df, shuffle=False)
-        test_ds = self._df_to_tfdata(test_df, shuffle=False)
+        train_ds = self._df_to_tfdata(train_df, shuffle=True, split="train")
+        valid_ds = self._df_to_tfdata(valid_df, shuffle=False, split="valid")
+        test_ds = self._df_to_tfdata(test_df, shuffle=False, split="test")
 
         return train_ds, valid_ds, test_ds
 
+    # ---------- bottleneck features ----------
+
+    def _split_at_features(self, model: keras.Model):
+        """
+        Splits the full model into (frozen base -> features) and (features -> head).
+
+        The head re-uses the layer objects of `model`, so training it trains
+        the full model's head in place.
+        """
+        feature_layer = model.get_layer(self.feature_layer_name)
+        feature_index = model.layers.index(feature_layer)
+
+        trainable_base = [l.name for l in model.layers[:feature_index] if l.trainable and l.weights]
+        if trainable_base:
+            raise ValueError(
+                f"Bottleneck training needs a frozen base, but these layers are trainable: {trainable_base}"
+            )
+
+        extractor = keras.Model(model.input, feature_layer.output, name="feature_extractor")
+
+        head_input = keras.Input(shape=feature_layer.output.shape[1:], name="features")
+        x = head_input
+        for layer in model.layers[feature_index + 1:]:
+            x = layer(x)
+        head = keras.Model(head_input, x, name="classifier_head")
+
+        return extractor, head
+
+    @staticmethod
+    def _weights_hash(model: keras.Model) -> str:
+        h = hashlib.sha256()
+        for w in model.get_weights():
+            h.update(w.tobytes())
+        return h.hexdigest()
+
+    def _features_cache_key(self, df: pd.DataFrame, base_hash: str) -> str:
+        """
+        Key = base-model weights + image size + decode method + compute dtype
+        + every image (name, size, mtime or CRC).
+        """
+        compute_dtype = "mixed_bfloat16" if self.mixed_precision else "float32"
+        h = hashlib.sha256(f"{base_hash}:{self.image_size}:decode{DECODE_VERSION}:{compute_dtype}".encode())
+        for path in df["filepath"]:
+            h.update(f"{os.path.basename(path)}:{signature(path)};".encode())
+        return h.hexdigest()[:16]
+
+    def _extraction_dataset(self, df: pd.DataFrame) -> tf.data.Dataset:
+        """
+        Preprocessed batches of every image of `df`, in row order: the
+        features are written by position and paired with `df`'s labels, so
+        no sharding and no DETERMINISTIC: False here.
+        """
+        ds = tf.data.Dataset.from_tensor_slices(tf.constant(df["filepath"].tolist()))
+        ds = ds.map(
+            lambda path: decode_and_resize(path, self.image_size),
+            num_parallel_calls=tf.data.AUTOTUNE, deterministic=True,
+        )
+        ds = ds.batch(self.batch_size).map(
+            lambda images: normalize_image(images, self.preprocessing),
+            num_parallel_calls=tf.data.AUTOTUNE, deterministic=True,
+        )
+        options = self._dataset_options()
+        options.deterministic = True
+        return ds.prefetch(tf.data.AUTOTUNE).with_options(options)
+
+    def _get_split_features(
+        self, extractor: keras.Model, split: str, df: pd.DataFrame, base_hash: str
+    ) -> np.ndarray:
+        """
+        Returns the features of one split as a read-only memmap,
+        running the frozen base only when they are not cached yet.
+        """
+        features_dir = Path(self.config.features_dir)
+        cache_path = features_dir / f"{split}_{self._features_cache_key(df, base_hash)}.npy"
+
+        if cache_path.exists():
+            logger.info(f"Reusing cached {split} features: {cache_path}")
+            return np.load(cache_path, mmap_mode="r")
+
+        features_dir.mkdir(parents=True, exist_ok=True)
+        feature_dim = int(np.prod(extractor.output.shape[1:]))
+        logger.info(f"Extracting {split} features ({len(df)} images, dim {feature_dim})")
+
+        tmp_path = cache_path.with_name(f".{cache_path.name}.tmp")
+        features = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(len(df), feature_dim)
+        )
+        start = 0
+        for images in self._extraction_dataset(df):
+            out = extractor.predict_on_batch(images)
+            features[start:start + len(out)] = out.reshape(len(out), -1)
+            start += len(out)
+        features.flush()
+        del features
+        if start != len(df):
+            os.remove(tmp_path)
+            raise RuntimeError(f"Extracted {start} {split} features for {len(df)} images")
+        os.replace(tmp_path, cache_path)
+
+        logger.info(f"Cached {split} features at: {cache_path}")
+        return np.load(cache_path, mmap_mode="r")
+
+    def _features_to_tfdata(
+        self, features: np.ndarray, labels: np.ndarray, shuffle: bool = True
+    ) -> tf.data.Dataset:
+        """
+        Streams batches out of the memmap so features never have to fit in RAM.
+        """
+        n = len(labels)
+
+        def _batches():
+            order = np.random.permutation(n) if shuffle else np.arange(n)
+            for start in range(0, n, self.batch_size):
+                idx = np.sort(order[start:start + self.batch_size])
+                yield np.asarray(features[idx]), labels[idx]
+
+        ds = tf.data.Dataset.from_generator(
+            _batches,
+            output_signature=(
+                tf.TensorSpec(shape=(None, features.shape[1]), dtype=tf.float32),
+                tf.TensorSpec(shape=(None, labels.shape[1]), dtype=tf.float32),
+            ),
+        )
+        return ds.prefetch(tf.data.AUTOTUNE)
+
+    def _train_on_bottleneck_features(self, model: keras.Model):
+        """
+        Runs the frozen base once per split, then trains only the head.
+        """
+        extractor, head = self._split_at_features(model)
+        self._compile(head, self.params.LEARNING_RATE)
+
+        base_hash = self._weights_hash(extractor)
+        datasets = {}
+        with profiling.stage("features"):
+            for split, shuffle in (("train", True), ("valid", False), ("test", False)):
+                df = self._load_split_df(split)
+                features = self._get_split_features(extractor, split, df, base_hash)
+                labels = df[self.LABEL_COLUMNS].values.astype("float32")
+                datasets[split] = self._features_to_tfdata(features, labels, shuffle=shuffle)
+
+        logger.info(f"Training head on cached features for {self.epochs} epochs")
+        self._fit(head, datasets["train"], datasets["valid"], phase="fit")
+
+        logger.info("Evaluating on test set.")
+        with profiling.stage("evaluate"):
+            return head.evaluate(datasets["test"])
+
+    def _training_callbacks(self) -> list:
+        """
+        images/sec logging, plus step profiling and an optional profiler
+        trace when PROFILING is enabled.
+        """
+        callbacks = [ThroughputLogger(self.batch_size)]
+
+        profiling_params = self.params.PROFILING
+        if profiling_params.ENABLED:
+            callbacks.append(StepProfiler(self.batch_size, probe_runs=profiling_params.COMPUTE_PROBE_RUNS))
+            if profiling_params.TRACE_STEPS:
+                start_step, stop_step = profiling_params.TRACE_STEPS
+                callbacks.append(ProfilerTrace(self.config.trace_dir, start_step, stop_step))
+        return callbacks
+
+    def _fit(
+        self,
+        model: keras.Model,
+        train_ds: tf.data.Dataset,
+        valid_ds: tf.data.Dataset,
+        phase: str,
+        initial_epoch: int = 0,
+        epochs: int = None,
+    ):
+        """
+        One training phase ("fit" = head, "fine_tune"), profiled as a stage of that name.
+
+        With CHECKPOINT enabled the phase checkpoints into its own folder and
+        resumes from there; a phase that already finished is not run again.
+        """
+        callbacks = self._training_callbacks()
+        if self.best_model_selector is not None:
+            callbacks.append(self.best_model_selector)
+        if self.early_stopping_params.ENABLED:
+            params = self.early_stopping_params
+            callbacks.append(keras.callbacks.EarlyStopping(
+                monitor=params.MONITOR,
+                patience=params.PATIENCE,
+                min_delta=params.MIN_DELTA,
+                restore_best_weights=False,  # BestModelSelector does, also across phases
+            ))
+
+        if self.checkpoint_params.ENABLED:
+            checkpoint = TrainingCheckpoint(
+                self.checkpoint_dir / phase,
+                max_to_keep=self.checkpoint_params.MAX_TO_KEEP,
+                every_n_steps=self.checkpoint_params.EVERY_N_STEPS,
+            )
+            if self.checkpoint_params.RESUME:
+                # slot variables must exist before the optimizer state is restored
+                with self.strategy.scope():
+                    model.optimizer.build(model.trainable_variables)
+                completed_epochs, completed = checkpoint.restore(model)
+                if completed:
+                    logger.info(f"Phase {phase} already completed, skipping it")
+                    return None
+                initial_epoch = max(initial_epoch, completed_epochs)
+            callbacks.append(checkpoint)  # last: saves after the best weights are restored
+
+        with profiling.stage(phase):
+            history = model.fit(
+                train_ds,
+                validation_data=valid_ds,
+                initial_epoch=initial_epoch,
+                epochs=epochs or self.epochs,
+                callbacks=callbacks,
+            )
+            throughput = callbacks[0]
+            logger.info(
+                f"Phase {phase}: {throughput.total_steps} steps at {throughput.steps_per_sec:.2f} steps/sec "
+                f"(mixed_precision={self.mixed_precision}, jit_compile={self.jit_compile})"
+            )
+            profiling.record("steps_per_sec", round(throughput.steps_per_sec, 3))
+            for callback in callbacks:
+                if isinstance(callback, StepProfiler):
+                    profiling.record("epochs", callback.epochs)
+            profiling.record("history", {k: [float(v) for v in vals] for k, vals in history.history.items()})
+        return history
+
+    # ---------- fine-tuning / precision ----------
+
+    def _compile(self, model: keras.Model, learning_rate: float):
+        # for multi-label classification:
+        # final layer must have sigmoid activation and binary_crossentropy loss
+        model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            loss="binary_crossentropy",
+            metrics=["binary_accuracy"],
+            jit_compile=self.jit_compile,
+        )
+
+    def _with_dtype_policy(self, model: keras.Model, policy: str) -> keras.Model:
+        """
+        Copy of `model` (same weights and trainable flags) whose layers
+        compute in `policy`, e.g. "mixed_bfloat16". The sigmoid output
+        layer stays float32 so probabilities are not rounded to bfloat16.
+        """
+        output_layer = model.layers[-1]
+
+        def _clone(layer):
+            config = layer.get_config()
+            if not isinstance(layer, keras.layers.InputLayer):
+                config["dtype"] = "float32" if layer is output_layer else policy
+            return layer.__class__.from_config(config)
+
+        with self.strategy.scope():
+            clone = keras.models.clone_model(model, clone_function=_clone)
+        clone.set_weights(model.get_weights())
+        return clone
+
+    def _unfreeze_top_blocks(self, model: keras.Model, num_blocks: int) -> list:
+        """
+        Makes the top `num_blocks` blocks of the backbone trainable, except
+        BatchNormalization layers (they keep their ImageNet statistics).
+        """
+        feature_index = model.layers.index(model.get_layer(self.feature_layer_name))
+        base_layers = model.layers[:feature_index]
+        blocks = layer_blocks([layer.name for layer in base_layers], self.backbone)
+
+        ordered = list(dict.fromkeys(b for b in blocks if b is not None))
+        unfrozen = ordered[-num_blocks:] if num_blocks > 0 else []
+        for layer, block in zip(base_layers, blocks):
+            layer.trainable = block in unfrozen and not isinstance(layer, keras.layers.BatchNormalization)
+        return unfrozen
+
+    def _fine_tune(self, model: keras.Model, train_ds: tf.data.Dataset, valid_ds: tf.data.Dataset):
+        """
+        Phase 2: unfreezes the top FINE_TUNE.UNFREEZE_BLOCKS backbone blocks
+        and keeps training at the lower FINE_TUNE.LEARNING_RATE.
+        """
+        params = self.fine_tune_params
+        blocks = self._unfreeze_top_blocks(model, params.UNFREEZE_BLOCKS)
+        logger.info(
+            f"Fine-tuning {blocks} for {params.EPOCHS} epochs at learning rate {params.LEARNING_RATE} "
+            f"({len(model.trainable_weights)} trainable weight tensors)"
+        )
+
+        # recompile, so the optimizer sees the new trainable variables
+        self._compile(model, params.LEARNING_RATE)
+        self._fit(
+            model, train_ds, valid_ds,
+            phase="fine_tune",
+            initial_epoch=self.epochs,
+            epochs=self.epochs + params.EPOCHS,
+        )
+
+    # ---------- reports ----------
+
+    def _measure_latency(self, model: keras.Model, runs: int = 20) -> dict:
+        """
+        CPU latency of the trained model at batch 1 and at the training batch size.
+        """
+        results = {}
+        for batch_size in (1, self.batch_size):
+            batch = np.random.uniform(0, 255, (batch_size, *self.image_size, 3)).astype("float32")
+            for _ in range(3):  # warm-up / tracing
+                model.predict_on_batch(batch)
+
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                model.predict_on_batch(batch)
+                timings.append(time.perf_counter() - start)
+
+            p50 = float(np.percentile(timings, 50))
+            results[f"batch_{batch_size}"] = {
+                "p50_ms": p50 * 1000,
+                "p95_ms": float(np.percentile(timings, 95)) * 1000,
+                "images_per_sec": batch_size / p50,
+            }
+        return results
+
+    def _write_backbone_report(self, model: keras.Model, test_metrics) -> None:
+        """
+        Adds this run to the per-backbone latency / accuracy report.
+        """
+        report_path = Path(self.config.backbone_report_path)
+        report = {}
+        if report_path.exists():
+            with open(report_path) as f:
+                report = json.load(f)
+
+        report[self.backbone] = {
+            "preprocessing": self.preprocessing,
+            "total_params": int(model.count_params()),
+            "model_size_bytes": os.path.getsize(self.config.trained_model_path),
+            "test_metrics": dict(zip(["loss", "binary_accuracy"], map(float, np.atleast_1d(test_metrics)))),
+            "latency": self._measure_latency(model),
+            "epochs": self.epochs,
+            "image_size": list(self.image_size),
+        }
+        save_json(report_path, report)
+
     # ---------- model training ----------
 
+    def _checkpoint_key(self, model: keras.Model) -> str:
+        """
+        Identifies the training run: training params, architecture and
+        the starting weights of the model.
+        """
+        params = {k: v for k, v in self.params.items() if k not in self.CHECKPOINT_KEY_IGNORED}
+        h = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode())
+        h.update(f"{self.backbone}:{self.prepare_base_model_artifact.head_architecture}".encode())
+        h.update(self._weights_hash(model).encode())
+        return h.hexdigest()
+
+    def _prepare_checkpoints(self, model: keras.Model) -> None:
+        """
+        Keeps the checkpoints of an interrupted run with the same key and
+        deletes any others, then sets up best-model selection (its weights
+        live in the checkpoint folder too).
+        """
+        checkpoint_dir = self.checkpoint_dir
+        run_path = checkpoint_dir / "run.json"
+        key = self._checkpoint_key(model)
+
+        previous = None
+        if run_path.exists():
+            with open(run_path) as f:
+                previous = json.load(f).get("key")
+
+        resume = self.checkpoint_params.ENABLED and self.checkpoint_params.RESUME
+        if resume and previous == key:
+            logger.info(f"Resuming from checkpoints in: {checkpoint_dir}")
+        elif checkpoint_dir.exists():
+            logger.info(f"Discarding previous checkpoints: {checkpoint_dir}")
+            shutil.rmtree(checkpoint_dir)
+
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        save_json(run_path, {"key": key})
+
+        if self.early_stopping_params.RESTORE_BEST:
+            self.best_model_selector = BestModelSelector(
+                checkpoint_dir / "best",
+                monitor=self.early_stopping_params.MONITOR,
+                min_delta=self.early_stopping_params.MIN_DELTA,
+            )
+
     def _load_model(self) -> keras.Model:
         """
         Load the updated base model (VGG16 + ANN head)
         """
         model_path = self.prepare_base_model_artifact.updated_base_model_path
         logger.info(f"Loading updated base model from: {model_path}")
-        model = keras.models.load_model(model_path)
+        with self.strategy.scope():
+            model = keras.models.load_model(model_path)
+        if self.num_workers > 1:
+            # on other hosts the base model (random head) was built separately
+            model.set_weights(distribute.broadcast_from_chief(self.strategy, model.get_weights()))
+            logger.info("Starting from the chief's weights")
         logger.info("Model loaded successfully.")
         return model
 
+    def train_until(self, model_path: Path, initial_epoch: int = 0) -> dict:
+        """
+        Trains from epoch `initial_epoch` up to EPOCHS and saves the model,
+        optimizer state included, to `model_path`. Epoch 0 starts from the
+        base model, any later epoch from `model_path`, so a sweep trial can
+        stop after some epochs and carry on later.
+
+        Returns the Keras history of these epochs.
+        """
+        if self.training_mode != "full":
+            raise ValueError("Sweep trials train with TRAINING_MODE full")
+
+        if initial_epoch:
+            with self.strategy.scope():
+                model = keras.models.load_model(model_path)
+        else:
+            model = self._load_model()
+            if self.mixed_precision:
+                model = self._with_dtype_policy(model, "mixed_bfloat16")
+            self._compile(model, self.params.LEARNING_RATE)
+
+        train_ds, valid_ds, _ = self._create_datasets()
+        history = self._fit(model, train_ds, valid_ds, phase="fit", initial_epoch=initial_epoch)
+        model.save(model_path)
+        return history.history
+
     def initiate_model_training(self) -> ModelTrainingArtifact:
         """
         Orchestrates dataset creation + training + saving final model.
         """
         logger.info("=== Stage 03: Model Training started ===")
 
-        # create datasets
-        train_ds, valid_ds, test_ds = self._create_datasets()
+        if self.num_workers > 1 and self.training_mode == "bottleneck":
+            raise ValueError("TRAINING_MODE bottleneck trains on one worker, use DISTRIBUTE.STRATEGY none")
 
         # load model
-        model = self._load_model()
+        with profiling.stage("load_model"):
+            model = self._load_model()
+
+        self._prepare_checkpoints(model)
+
+        if self.mixed_precision:
+            # bfloat16 compute with float32 weights: no loss scaling needed
+            logger.info("Using mixed_bfloat16 precision")
+            model = self._with_dtype_policy(model, "mixed_bfloat16")
 
-        # for multi-label classification:
-        # final layer must have sigmoid activation and binary_crossentropy loss
         logger.info("Re-compiling model for multi-label training.")
-        model.compile(
-            optimizer=keras.optimizers.Adam(learning_rate=self.params.LEARNING_RATE),
-            loss="binary_crossentropy",
-            metrics=["binary_accuracy"],
-        )
+        self._compile(model, self.params.LEARNING_RATE)
 
         logger.info(
-            f"Starting training for {self.epochs} epochs, "
+            f"Starting {self.training_mode} training for {self.epochs} epochs, "
             f"batch size {self.batch_size}, image size {self.image_size}"
         )
 
-        model.fit(
-            train_ds,
-            validation_data=valid_ds,
-            epochs=self.epochs,
-        )
-
-        logger.info("Evaluating on test set.")
-        test_metrics = model.evaluate(test_ds)
+        test_metrics = datasets = None
+        if self.training_mode == "bottleneck":
+            # head layers are shared, so `model` ends up with the trained head
+            test_metrics = self._train_on_bottleneck_features(model)
+        else:
+            # create datasets
+            with profiling.stage("datasets"):
+                datasets = self._create_datasets()
+
+            self._fit(model, datasets[0], datasets[1], phase="fit")
+
+        if self.fine_tune_params.ENABLED:
+            if datasets is None:
+                with profiling.stage("datasets"):
+                    datasets = self._create_datasets()
+            self._fine_tune(model, datasets[0], datasets[1])
+            test_metrics = None  # the backbone changed, evaluate the full model
+
+        if test_metrics is None:
+            logger.info("Evaluating on test set.")
+            with profiling.stage("evaluate"):
+                test_metrics = model.evaluate(datasets[2])
         logger.info(f"Test metrics: {test_metrics}")
 
-        # save final trained model
+        if self.mixed_precision:
+            # saved model computes in float32, like every model the serving runtimes load
+            model = self._with_dtype_policy(model, "float32")
+            self._compile(model, self.params.LEARNING_RATE)
+
         trained_model_path = self.config.trained_model_path
+        if not self.is_chief:
+            # the chief holds the same weights and writes the outputs, but
+            # model.save reads synced variables (collective ops), so every
+            # worker has to save: the others into their checkpoint folder
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            with profiling.stage("save"):
+                model.save(self.checkpoint_dir / Path(trained_model_path).name)
+            shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+            logger.info(f"=== Stage 03: Model Training completed on worker {self.worker_index} ===")
+            return ModelTrainingArtifact(
+                trained_model_path=trained_model_path,
+                model_meta_path=self.config.model_meta_path,
+            )
+
+        # save final trained model
         logger.info(f"Saving trained model to: {trained_model_path}")
-        model.save(trained_model_path)
+        with profiling.stage("save"):
+            model.save(trained_model_path)
+        # the run is complete, the next one starts from scratch
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+        # serving reads this to preprocess exactly like training
+        save_json(self.config.model_meta_path, {
+            "backbone": self.backbone,
+            "preprocessing": self.preprocessing,
+            "image_size": list(self.image_size),
+            "labels": list(self.LABEL_COLUMNS),
+            "head_architecture": self.prepare_base_model_artifact.head_architecture,
+        })
+
+        with profiling.stage("backbone_report"):
+            if self.num_workers > 1:
+                # predicting with the distributed model would wait for the other workers
+                model = keras.models.load_model(trained_model_path)
+            self._write_backbone_report(model, test_metrics)
 
         logger.info("=== Stage 03: Model Training completed ===")
 
         return ModelTrainingArtifact(
             trained_model_path=trained_model_path,
+            model_meta_path=self.config.model_meta_path,
         )
@@ -2,14 +2,25 @@ from pathlib import Path
 from tensorflow import keras
 from cnnClassifier.entity.config_entity import PrepareBaseModelConfig
 from cnnClassifier.entity.artifact_entity import PrepareBaseModelArtifact
-from cnnClassifier.utils.common import create_directories
+from cnnClassifier.utils.common import create_directories, save_json
+from cnnClassifier.utils.backbones import get_backbone
+from cnnClassifier.utils import profiling
 from cnnClassifier.logger.logging import logger
 
 
 class PrepareBaseModel:
+
+    # pooling option -> layer that turns the backbone's feature map into a vector
+    POOLING_LAYERS = {
+        "flatten": (keras.layers.Flatten, "flatten"),
+        "avg": (keras.layers.GlobalAveragePooling2D, "global_avg_pool"),
+        "max": (keras.layers.GlobalMaxPooling2D, "global_max_pool"),
+    }
+
     def __init__(self, config: PrepareBaseModelConfig):
         self.config = config
         self.model = None
+        self.head_architecture = None
 
     @staticmethod
     def _save_model(path: Path, model: keras.Model):
@@ -19,21 +30,48 @@ class PrepareBaseModel:
 
     def get_base_model(self) -> keras.Model:
         """
-        Load VGG16 with imagenet weights, without top classifier.
+        Load the configured backbone with imagenet weights, without top classifier.
         """
-        logger.info("Loading VGG16 base model with ImageNet weights")
+        backbone = self.config.params_backbone
+        logger.info(f"Loading {backbone} base model with ImageNet weights")
 
-        self.model = keras.applications.vgg16.VGG16(
+        self.model = get_backbone(backbone)(
             include_top=self.config.params_include_top,  # False
             weights=self.config.params_weights,          # "imagenet"
             input_shape=self.config.params_image_size,   # [224, 224, 3]
         )
 
-        logger.info("Base VGG16 model loaded successfully")
+        logger.info(f"Base {backbone} model loaded successfully")
         self._save_model(self.config.base_model_path, self.model)
 
         return self.model
 
+    def _build_head(self, features):
+        """
+        Pooling -> Dense/Dropout blocks -> sigmoid output, as set in params HEAD.
+        """
+        pooling = self.config.params_head_pooling
+        if pooling not in self.POOLING_LAYERS:
+            raise ValueError(f"Unknown HEAD.POOLING '{pooling}', expected one of {list(self.POOLING_LAYERS)}")
+
+        pooling_layer, feature_layer = self.POOLING_LAYERS[pooling]
+        x = pooling_layer(name=feature_layer)(features)
+
+        for i, units in enumerate(self.config.params_head_dense_units):
+            suffix = "" if i == 0 else f"_{i + 1}"
+            x = keras.layers.Dense(units, activation="relu", name=f"fc{i + 1}")(x)
+            if self.config.params_head_dropout:
+                x = keras.layers.Dropout(self.config.params_head_dropout, name=f"dropout{suffix}")(x)
+
+        # independent sigmoid per label (multi-label), not softmax
+        output = keras.layers.Dense(
+            self.config.params_classes,
+            activation="sigmoid",
+            name="predictions",
+        )(x)
+
+        return output, feature_layer
+
     def prepare_full_model(self) -> keras.Model:
         """
         Freeze CNN layers and add custom ANN head for 10 classes.
@@ -45,32 +83,43 @@ class PrepareBaseModel:
         for layer in self.model.layers:
             layer.trainable = False
 
-        logger.info("Adding custom ANN classifier head on top")
-        x = keras.layers.Flatten(name="flatten")(self.model.output)
-        x = keras.layers.Dense(256, activation="relu", name="fc1")(x)
-        x = keras.layers.Dropout(0.5, name="dropout")(x)
-        output = keras.layers.Dense(
-            self.config.params_classes,
-            activation="softmax",
-            name="predictions",
-        )(x)
+        logger.info(
+            f"Adding custom ANN classifier head on top "
+            f"(pooling={self.config.params_head_pooling}, dense={self.config.params_head_dense_units})"
+        )
+        output, feature_layer = self._build_head(self.model.output)
 
         full_model = keras.models.Model(
             inputs=self.model.input,
             outputs=output,
-            name="vgg16_transfer_learning",
+            name=f"{self.config.params_backbone}_transfer_learning",
         )
 
-        logger.info("Compiling updated model with Adam + categorical_crossentropy")
+        logger.info("Compiling updated model with Adam + binary_crossentropy")
         full_model.compile(
             optimizer=keras.optimizers.Adam(
                 learning_rate=self.config.params_learning_rate  # 0.0001
             ),
-            loss="categorical_crossentropy",
-            metrics=["accuracy"],
+            loss="binary_crossentropy",
+            metrics=["binary_accuracy"],
         )
 
+        head_params = sum(
+            layer.count_params()
+            for layer in full_model.layers[full_model.layers.index(full_model.get_layer(feature_layer)):]
+        )
+        self.head_architecture = {
+            "pooling": self.config.params_head_pooling,
+            "dense_units": list(self.config.params_head_dense_units),
+            "dropout": self.config.params_head_dropout,
+            "feature_layer": feature_layer,
+            "head_params": int(head_params),
+            "total_params": int(full_model.count_params()),
+        }
+        logger.info(f"Head architecture: {self.head_architecture}")
+
         self._save_model(self.config.updated_base_model_path, full_model)
+        save_json(self.config.head_architecture_path, self.head_architecture)
 
         return full_model
 
@@ -79,11 +128,15 @@ class PrepareBaseModel:
         Orchestrates base model loading + head creation + saving.
         """
         logger.info("=== Stage 02: Prepare Base Model started ===")
-        self.get_base_model()
-        self.prepare_full_model()
+        with profiling.stage("base_model"):
+            self.get_base_model()
+        with profiling.stage("head"):
+            self.prepare_full_model()
         logger.info("=== Stage 02: Prepare Base Model completed ===")
 
         return PrepareBaseModelArtifact(
             base_model_path=self.config.base_model_path,
             updated_base_model_path=self.config.updated_base_model_path,
+            backbone=self.config.params_backbone,
+            head_architecture=self.head_architecture,
         )
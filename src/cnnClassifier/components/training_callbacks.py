@@ -0,0 +1,319 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from cnnClassifier.logger.logging import logger
+
+
+class ThroughputLogger(keras.callbacks.Callback):
+    """
+    Logs images/sec of every training epoch.
+
+    Keras only reports time per step, which hides whether the input
+    pipeline keeps up once batch size or dataset options change.
+    """
+
+    def __init__(self, batch_size: int):
+        super().__init__()
+        self.batch_size = batch_size
+        self._epoch_start = None
+        self._batch_start = None
+        self._steps = 0
+        # whole fit() call, training steps only (no validation)
+        self.total_steps = 0
+        self.train_seconds = 0.0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._steps = 0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._batch_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+        self.total_steps += 1
+        self.train_seconds += time.perf_counter() - self._batch_start
+
+    @property
+    def steps_per_sec(self) -> float:
+        return self.total_steps / self.train_seconds if self.train_seconds > 0 else 0.0
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._epoch_start
+        images = self._steps * self.batch_size
+        throughput = images / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"Epoch {epoch + 1}: {self._steps} steps, ~{images} images in {elapsed:.1f}s "
+            f"({throughput:.1f} images/sec)"
+        )
+        if logs is not None:
+            logs["images_per_sec"] = throughput
+
+
+class StepProfiler(keras.callbacks.Callback):
+    """
+    Per-epoch steps/sec and a split of the step time into input-pipeline
+    wait and compute.
+
+    Keras fetches the next batch inside the compiled train step, so a
+    callback only sees the total step time. At the end of every epoch the
+    forward + backward pass is timed on a synthetic in-memory batch (no
+    weights are updated); whatever the real steps took beyond that is
+    counted as waiting for input.
+    """
+
+    def __init__(self, batch_size: int, probe_runs: int = 5):
+        super().__init__()
+        self.batch_size = batch_size
+        self.probe_runs = probe_runs
+        self.epochs = []
+        self._probe_fn = None
+        self._probe_batch = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._step_times = []
+        self._epoch_start = time.perf_counter()
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._step_times.append(time.perf_counter() - self._step_start)
+
+    def _compute_seconds(self) -> float:
+        """median forward + backward time of one batch that is already in memory"""
+        if self._probe_fn is None:
+            model = self.model
+            strategy = model.distribute_strategy
+            loss_fn = keras.losses.get(model.loss)
+            # one replica's share of the (global) batch
+            batch_size = max(1, self.batch_size // strategy.num_replicas_in_sync)
+            x = tf.random.uniform((batch_size, *model.input_shape[1:]), 0.0, 255.0)
+            y = tf.cast(tf.random.uniform((batch_size, *model.output_shape[1:])) > 0.5, tf.float32)
+
+            def _replica_probe(x, y):
+                with tf.GradientTape() as tape:
+                    loss = tf.reduce_mean(loss_fn(y, model(x, training=False)))
+                return tape.gradient(loss, model.trainable_variables)
+
+            @tf.function
+            def _probe(x, y):
+                # replica context, distributed variables are not readable outside it;
+                # gradients are not all-reduced, so other workers are not involved
+                return strategy.experimental_local_results(strategy.run(_replica_probe, args=(x, y)))[0]
+
+            self._probe_fn, self._probe_batch = _probe, (x, y)
+            self._probe_fn(*self._probe_batch)  # trace
+
+        times = []
+        for _ in range(self.probe_runs):
+            start = time.perf_counter()
+            grads = self._probe_fn(*self._probe_batch)
+            _ = [g.numpy() for g in grads[:1] if g is not None]  # wait for the result
+            times.append(time.perf_counter() - start)
+        return float(np.median(times))
+
+    def on_epoch_end(self, epoch, logs=None):
+        steps = len(self._step_times)
+        if steps == 0:
+            return
+        elapsed = time.perf_counter() - self._epoch_start
+        train_seconds = float(np.sum(self._step_times))
+        step_seconds = float(np.median(self._step_times))
+        compute_seconds = min(self._compute_seconds(), step_seconds)
+        input_wait_seconds = step_seconds - compute_seconds
+
+        stats = {
+            "epoch": epoch + 1,
+            "steps": steps,
+            "epoch_seconds": round(elapsed, 3),
+            "train_seconds": round(train_seconds, 3),
+            "validation_seconds": round(elapsed - train_seconds, 3),
+            "steps_per_sec": round(steps / train_seconds, 3),
+            "images_per_sec": round(steps * self.batch_size / train_seconds, 1),
+            "median_step_ms": round(step_seconds * 1000, 2),
+            "compute_ms": round(compute_seconds * 1000, 2),
+            "input_wait_ms": round(input_wait_seconds * 1000, 2),
+            "input_wait_fraction": round(input_wait_seconds / step_seconds, 3),
+        }
+        self.epochs.append(stats)
+        logger.info(
+            f"Epoch {epoch + 1}: {stats['steps_per_sec']:.2f} steps/sec, step {stats['median_step_ms']:.0f} ms "
+            f"= ~{stats['compute_ms']:.0f} ms compute + ~{stats['input_wait_ms']:.0f} ms input wait"
+        )
+
+
+class ProfilerTrace(keras.callbacks.Callback):
+    """
+    Captures a TensorFlow profiler trace (open it in TensorBoard's Profile
+    tab) for training steps [start_step, stop_step], counted across epochs.
+    """
+
+    def __init__(self, log_dir, start_step: int, stop_step: int):
+        super().__init__()
+        self.log_dir = str(log_dir)
+        self.start_step = start_step
+        self.stop_step = stop_step
+        self._step = 0
+        self._tracing = False
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self._step == self.start_step and not self._tracing:
+            logger.info(f"Starting profiler trace at step {self._step}, writing to: {self.log_dir}")
+            tf.profiler.experimental.start(self.log_dir)
+            self._tracing = True
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self._tracing and self._step >= self.stop_step:
+            self._stop()
+        self._step += 1
+
+    def on_train_end(self, logs=None):
+        if self._tracing:
+            self._stop()
+
+    def _stop(self):
+        tf.profiler.experimental.stop()
+        self._tracing = False
+        logger.info(f"Profiler trace saved for steps {self.start_step}-{min(self._step, self.stop_step)}")
+
+
+class TrainingCheckpoint(keras.callbacks.Callback):
+    """
+    Periodic checkpoints of one training phase: weights, optimizer state,
+    completed epochs and steps, with the newest `max_to_keep` kept by a
+    tf.train.CheckpointManager. `restore()` continues from the latest one.
+
+    A checkpoint taken mid-epoch restores its weights and optimizer state;
+    that epoch is then run again from its start.
+    """
+
+    def __init__(self, directory, max_to_keep: int = 3, every_n_steps: int = 0):
+        super().__init__()
+        self.directory = str(directory)
+        self.max_to_keep = max_to_keep
+        self.every_n_steps = every_n_steps
+        self.epoch = tf.Variable(0, dtype=tf.int64, trainable=False)  # completed epochs
+        self.step = tf.Variable(0, dtype=tf.int64, trainable=False)
+        self.completed = tf.Variable(False, trainable=False)  # phase finished
+        self._manager = None
+
+    def _checkpoint_manager(self, model: keras.Model) -> tf.train.CheckpointManager:
+        if self._manager is None:
+            checkpoint = tf.train.Checkpoint(
+                model=model,
+                optimizer=model.optimizer,
+                epoch=self.epoch,
+                step=self.step,
+                completed=self.completed,
+            )
+            self._manager = tf.train.CheckpointManager(checkpoint, self.directory, max_to_keep=self.max_to_keep)
+        return self._manager
+
+    def restore(self, model: keras.Model):
+        """
+        Loads the latest checkpoint into `model` (compiled) and its optimizer.
+
+        Returns (completed epochs, whether the phase had finished); (0, False)
+        when there is no checkpoint.
+        """
+        manager = self._checkpoint_manager(model)
+        if manager.latest_checkpoint is None:
+            return 0, False
+        # optimizer slots are created on the first step and filled in then
+        manager.checkpoint.restore(manager.latest_checkpoint)
+        logger.info(
+            f"Restored {manager.latest_checkpoint}: epoch {int(self.epoch.numpy())}, "
+            f"step {int(self.step.numpy())}{' (phase completed)' if bool(self.completed.numpy()) else ''}"
+        )
+        return int(self.epoch.numpy()), bool(self.completed.numpy())
+
+    def _save(self):
+        path = self._manager.save(checkpoint_number=int(self.step.numpy()))
+        logger.info(f"Checkpoint saved: {path}")
+
+    def on_train_begin(self, logs=None):
+        self._checkpoint_manager(self.model)
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.step.assign_add(1)
+        if self.every_n_steps and int(self.step.numpy()) % self.every_n_steps == 0:
+            self._save()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch.assign(epoch + 1)
+        self._save()
+
+    def on_train_end(self, logs=None):
+        self.completed.assign(True)
+        self._save()
+
+
+class BestModelSelector(keras.callbacks.Callback):
+    """
+    Saves the weights of the epoch with the best `monitor` value and puts
+    them back when training ends.
+
+    One instance is shared by all training phases, so the previous phase's
+    (restored) result stays a candidate. Its state lives in `directory`,
+    so it survives a resumed run.
+    """
+
+    STATE_NAME = "best.json"
+
+    def __init__(self, directory, monitor: str = "val_loss", min_delta: float = 0.0, restore: bool = True):
+        super().__init__()
+        self.directory = Path(directory)
+        self.monitor = monitor
+        self.min_delta = abs(min_delta)
+        self.restore = restore
+        # losses go down, accuracies go up
+        self.mode = "min" if "loss" in monitor else "max"
+        self.state = {"value": None, "epoch": None, "model": None}
+
+        state_path = self.directory / self.STATE_NAME
+        if state_path.exists():
+            with open(state_path) as f:
+                self.state = json.load(f)
+
+    def _improved(self, value: float) -> bool:
+        best = self.state["value"]
+        if best is None:
+            return True
+        if self.mode == "min":
+            return value < best - self.min_delta
+        return value > best + self.min_delta
+
+    def _save(self, value: float, epoch: int):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tf.train.Checkpoint(model=self.model).write(str(self.directory / "weights"))
+        self.state = {"value": value, "epoch": epoch, "model": self.model.name}
+        with open(self.directory / self.STATE_NAME, "w") as f:
+            json.dump(self.state, f)
+
+    def on_train_begin(self, logs=None):
+        if self.state["value"] is not None and self.state["model"] != self.model.name:
+            # new phase on another model object (bottleneck head -> full model):
+            # it starts from the best weights so far, keep them as that model's best
+            self._save(self.state["value"], self.state["epoch"])
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is None:
+            logger.info(f"Best-model selection: '{self.monitor}' is not in the epoch logs")
+            return
+        if self._improved(float(value)):
+            self._save(float(value), epoch + 1)
+            logger.info(f"Epoch {epoch + 1}: new best {self.monitor} = {float(value):.4f}")
+
+    def on_train_end(self, logs=None):
+        if self.restore and self.state["value"] is not None and self.state["model"] == self.model.name:
+            tf.train.Checkpoint(model=self.model).read(str(self.directory / "weights")).expect_partial()
+            logger.info(
+                f"Restored best weights: epoch {self.state['epoch']}, {self.monitor} = {self.state['value']:.4f}"
+            )
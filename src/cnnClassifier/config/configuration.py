@@ -1,7 +1,7 @@
 from pathlib import Path
 from cnnClassifier.constants import CONFIG_FILE_PATH, PARAMS_FILE_PATH
 from cnnClassifier.utils.common import * 
-from cnnClassifier.entity.config_entity import DataIngestionConfig ,PrepareBaseModelConfig , TrainingConfig
+from cnnClassifier.entity.config_entity import DataIngestionConfig, DataPreprocessingConfig, PrepareBaseModelConfig , TrainingConfig, ModelExportConfig, ModelQuantizationConfig, ProfilingConfig, RunManifestConfig, SweepConfig, ServingConfig, PreforkConfig, PredictionCacheConfig
 
 CONFIG_FILE_PATH = Path("config.yaml")
 PARAMS_FILE_PATH = Path("params.yaml")
@@ -11,30 +11,64 @@ class ConfigurationManager:
         self,
         config_filepath: Path = CONFIG_FILE_PATH,
         params_filepath: Path = PARAMS_FILE_PATH,
+        create_dirs: bool = True,
     ):
+        """
+        create_dirs=False only reads the configs; serving processes use it
+        so they start without touching the artifacts tree.
+        """
 
         self.config = read_yaml(config_filepath)
         self.params = read_yaml(params_filepath)
+        self.create_dirs = create_dirs
 
-        create_directories([self.config["artifacts_root"]])
+        self._create_directories([self.config["artifacts_root"]])
+
+    def _create_directories(self, path_to_directories: list):
+        if self.create_dirs:
+            create_directories(path_to_directories)
 
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         config = self.config["data_ingestion"]
+        params = self.params.INGESTION
 
         root_dir = Path(config["root_dir"])
         local_data_file = Path(config["local_data_file"])
         unzip_dir = Path(config["unzip_dir"])
 
-        # Your Google Drive file id
-        gdrive_file_id = "1XaNxpHP3XwDyKjEw-1wirLcgLqMRSsV-"
+        # Your Google Drive file id, unless another source is configured
+        source_url = config.get("source_url") or f"gdrive://{config['gdrive_file_id']}"
 
-        create_directories([root_dir, unzip_dir, local_data_file.parent])
+        self._create_directories([root_dir, unzip_dir, local_data_file.parent])
 
         return DataIngestionConfig(
             root_dir=root_dir,
             local_data_file=local_data_file,
             unzip_dir=unzip_dir,
-            gdrive_file_id=gdrive_file_id,
+            source_url=source_url,
+            sha256=config.get("sha256"),
+            params_mode=params.MODE,
+            params_chunk_size_mb=params.CHUNK_SIZE_MB,
+            params_retries=params.RETRIES,
+            params_extract_workers=params.EXTRACT_WORKERS,
+        )
+
+
+
+    def get_data_preprocessing_config(self) -> DataPreprocessingConfig:
+        config = self.config.data_preprocessing
+        params = self.params
+
+        root_dir = Path(config.root_dir)
+        shards_dir = Path(config.shards_dir)
+
+        self._create_directories([root_dir, shards_dir])
+
+        return DataPreprocessingConfig(
+            root_dir=root_dir,
+            shards_dir=shards_dir,
+            params_image_size=params.IMAGE_SIZE,
+            params_shard_size=params.SHARD_SIZE,
         )
 
 
@@ -46,18 +80,24 @@ class ConfigurationManager:
         root_dir = Path(config["root_dir"])
         base_model_path = Path(config["base_model_path"])
         updated_base_model_path = Path(config["updated_base_model_path"])
+        head_architecture_path = Path(config["head_architecture_path"])
 
-        create_directories([root_dir, base_model_path.parent, updated_base_model_path.parent])
+        self._create_directories([root_dir, base_model_path.parent, updated_base_model_path.parent])
 
         return PrepareBaseModelConfig(
             root_dir=root_dir,
             base_model_path=base_model_path,
             updated_base_model_path=updated_base_model_path,
+            head_architecture_path=head_architecture_path,
             params_image_size=params["IMAGE_SIZE"],
             params_learning_rate=params["LEARNING_RATE"],
+            params_backbone=params["BACKBONE"],
             params_include_top=params["INCLUDE_TOP"],
             params_weights=params["WEIGHTS"],
             params_classes=params["CLASSES"],
+            params_head_pooling=params["HEAD"]["POOLING"],
+            params_head_dense_units=params["HEAD"]["DENSE_UNITS"],
+            params_head_dropout=params["HEAD"]["DROPOUT"],
         )
 
 
@@ -67,10 +107,172 @@ class ConfigurationManager:
 
         root_dir = Path(config.root_dir)
         trained_model_path = Path(config.trained_model_path)
+        features_dir = Path(config.features_dir)
+        dataset_cache_dir = Path(config.dataset_cache_dir)
+        model_meta_path = Path(config.model_meta_path)
+        backbone_report_path = Path(config.backbone_report_path)
+        trace_dir = Path(config.trace_dir)
+        checkpoint_dir = Path(config.checkpoint_dir)
 
-        create_directories([root_dir, trained_model_path.parent])
+        self._create_directories([root_dir, trained_model_path.parent])
 
         return TrainingConfig(
             root_dir=root_dir,
             trained_model_path=trained_model_path,
-        )
\ No newline at end of file
+            features_dir=features_dir,
+            dataset_cache_dir=dataset_cache_dir,
+            model_meta_path=model_meta_path,
+            backbone_report_path=backbone_report_path,
+            trace_dir=trace_dir,
+            checkpoint_dir=checkpoint_dir,
+        )
+
+
+
+    def get_model_export_config(self) -> ModelExportConfig:
+        config = self.config.model_export
+        params = self.params
+
+        root_dir = Path(config.root_dir)
+        saved_model_dir = Path(config.saved_model_dir)
+        tflite_model_path = Path(config.tflite_model_path)
+
+        self._create_directories([root_dir])
+
+        return ModelExportConfig(
+            root_dir=root_dir,
+            saved_model_dir=saved_model_dir,
+            tflite_model_path=tflite_model_path,
+            params_image_size=params.IMAGE_SIZE,
+            params_formats=params.EXPORT.FORMATS,
+            params_fixed_batch_size=params.EXPORT.FIXED_BATCH_SIZE,
+        )
+
+
+
+    def get_model_quantization_config(self) -> ModelQuantizationConfig:
+        config = self.config.model_quantization
+        params = self.params
+
+        root_dir = Path(config.root_dir)
+        promoted_model_path = Path(config.promoted_model_path)
+        report_path = Path(config.report_path)
+
+        self._create_directories([root_dir])
+
+        return ModelQuantizationConfig(
+            root_dir=root_dir,
+            promoted_model_path=promoted_model_path,
+            report_path=report_path,
+            params_image_size=params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_variants=params.QUANTIZATION.VARIANTS,
+            params_representative_samples=params.QUANTIZATION.REPRESENTATIVE_SAMPLES,
+            params_tolerance=params.QUANTIZATION.TOLERANCE,
+        )
+
+
+
+    def get_profiling_config(self) -> ProfilingConfig:
+        config = self.config.profiling
+        params = self.params.PROFILING
+
+        root_dir = Path(config.root_dir)
+
+        return ProfilingConfig(
+            root_dir=root_dir,
+            run_report_path=Path(config.run_report_path),
+            params_enabled=params.ENABLED,
+        )
+
+
+
+    def get_run_manifest_config(self) -> RunManifestConfig:
+        config = self.config.run_manifest
+        params = self.params.PIPELINE
+
+        return RunManifestConfig(
+            manifest_path=Path(config.manifest_path),
+            params_incremental=params.INCREMENTAL,
+            params_force_stages=list(params.FORCE_STAGES or []),
+        )
+
+
+
+    def get_sweep_config(self) -> SweepConfig:
+        config = self.config.sweep
+        params = self.params.SWEEP
+
+        root_dir = Path(config.root_dir)
+
+        self._create_directories([root_dir])
+
+        return SweepConfig(
+            root_dir=root_dir,
+            results_path=Path(config.results_path),
+            params_method=params.METHOD,
+            params_trials=params.TRIALS,
+            params_seed=params.SEED,
+            params_metric=params.METRIC,
+            params_workers=params.WORKERS,
+            params_threads_per_trial=params.THREADS_PER_TRIAL,
+            params_halving=params.HALVING.ENABLED,
+            params_min_epochs=params.HALVING.MIN_EPOCHS,
+            params_eta=params.HALVING.ETA,
+            params_space=dict(params.SPACE or {}),
+        )
+
+
+
+    def get_serving_config(self) -> ServingConfig:
+        params = self.params.SERVING
+
+        return ServingConfig(
+            params_runtime=params.RUNTIME,
+            params_num_threads=params.NUM_THREADS,
+            params_share_weights=params.SHARE_WEIGHTS,
+            params_warm_up=params.WARM_UP,
+            params_micro_batching=params.MICRO_BATCHING,
+            params_max_batch_size=params.MAX_BATCH_SIZE,
+            params_max_wait_ms=params.MAX_WAIT_MS,
+            params_max_queue_size=params.MAX_QUEUE_SIZE,
+            params_workers=params.WORKERS,
+            params_max_pending=params.MAX_PENDING,
+        )
+
+
+
+
+    def get_prefork_config(self) -> PreforkConfig:
+        config = self.config.serving
+        params = self.params.SERVING.PREFORK
+
+        return PreforkConfig(
+            bind=config.bind,
+            params_workers=params.WORKERS,
+            params_timeout=params.TIMEOUT,
+            params_graceful_timeout=params.GRACEFUL_TIMEOUT,
+            params_max_requests=params.MAX_REQUESTS,
+            params_max_requests_jitter=params.MAX_REQUESTS_JITTER,
+        )
+
+
+
+    def get_prediction_cache_config(self) -> PredictionCacheConfig:
+        config = self.config.prediction_cache
+        params = self.params.PREDICTION_CACHE
+
+        root_dir = Path(config.root_dir)
+        cache_file = Path(config.cache_file)
+
+        if params.PERSIST:
+            self._create_directories([root_dir])
+
+        return PredictionCacheConfig(
+            root_dir=root_dir,
+            cache_file=cache_file,
+            params_enabled=params.ENABLED,
+            params_max_entries=params.MAX_ENTRIES,
+            params_ttl_seconds=params.TTL_SECONDS,
+            params_persist=params.PERSIST,
+        )
@@ -2,4 +2,8 @@ from pathlib import Path
 
 
 CONFIG_FILE_PATH = Path("config.yaml")
-PARAMS_FILE_PATH = Path("params.yaml")
\ No newline at end of file
+PARAMS_FILE_PATH = Path("params.yaml")
+
+# uploaded images kept for the preview in templates/index.html
+UPLOAD_DIR = Path("static") / "uploads"
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp"}
@@ -5,6 +5,13 @@ from pathlib import Path
 class DataIngestionArtifact:
     zip_file_path: Path
     unzip_dir: Path
+    read_from_zip: bool = False  # INGESTION.MODE zip: images are read from zip_file_path
+
+
+
+@dataclass(frozen=True)
+class DataPreprocessingArtifact:
+    shards_dir: Path
 
 
 
@@ -12,9 +19,29 @@ class DataIngestionArtifact:
 class PrepareBaseModelArtifact:
     base_model_path: Path
     updated_base_model_path: Path
+    backbone: str
+    head_architecture: dict
 
 
 
 @dataclass(frozen=True)
 class ModelTrainingArtifact:
-    trained_model_path: Path
\ No newline at end of file
+    trained_model_path: Path
+    model_meta_path: Path
+
+
+
+@dataclass(frozen=True)
+class ModelExportArtifact:
+    saved_model_dir: Path
+    tflite_model_path: Path
+    fixed_batch_size: int
+
+
+
+@dataclass(frozen=True)
+class ModelQuantizationArtifact:
+    variant_paths: dict
+    report_path: Path
+    promoted_variant: str
+    promoted_model_path: Path
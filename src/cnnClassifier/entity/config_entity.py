@@ -6,7 +6,21 @@ class DataIngestionConfig:
     root_dir: Path
     local_data_file: Path
     unzip_dir: Path
-    gdrive_file_id: str
+    source_url: str
+    sha256: str
+    params_mode: str
+    params_chunk_size_mb: int
+    params_retries: int
+    params_extract_workers: int
+
+
+
+@dataclass(frozen=True)
+class DataPreprocessingConfig:
+    root_dir: Path
+    shards_dir: Path
+    params_image_size: list
+    params_shard_size: int
 
 
 
@@ -15,11 +29,16 @@ class PrepareBaseModelConfig:
     root_dir: Path
     base_model_path: Path
     updated_base_model_path: Path
+    head_architecture_path: Path
     params_image_size: list
     params_learning_rate: float
+    params_backbone: str
     params_include_top: bool
     params_weights: str
     params_classes: int
+    params_head_pooling: str
+    params_head_dense_units: list
+    params_head_dropout: float
 
 
 
@@ -28,4 +47,105 @@ class PrepareBaseModelConfig:
 @dataclass(frozen=True)
 class TrainingConfig:
     root_dir: Path
-    trained_model_path: Path
\ No newline at end of file
+    trained_model_path: Path
+    features_dir: Path
+    dataset_cache_dir: Path
+    model_meta_path: Path
+    backbone_report_path: Path
+    trace_dir: Path
+    checkpoint_dir: Path
+
+
+
+@dataclass(frozen=True)
+class ModelExportConfig:
+    root_dir: Path
+    saved_model_dir: Path
+    tflite_model_path: Path
+    params_image_size: list
+    params_formats: list
+    params_fixed_batch_size: int
+
+
+
+@dataclass(frozen=True)
+class ModelQuantizationConfig:
+    root_dir: Path
+    promoted_model_path: Path
+    report_path: Path
+    params_image_size: list
+    params_batch_size: int
+    params_variants: list
+    params_representative_samples: int
+    params_tolerance: float
+
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    root_dir: Path
+    run_report_path: Path
+    params_enabled: bool
+
+
+
+@dataclass(frozen=True)
+class RunManifestConfig:
+    manifest_path: Path
+    params_incremental: bool
+    params_force_stages: list
+
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    root_dir: Path
+    results_path: Path
+    params_method: str
+    params_trials: int
+    params_seed: int
+    params_metric: str
+    params_workers: int
+    params_threads_per_trial: int
+    params_halving: bool
+    params_min_epochs: int
+    params_eta: int
+    params_space: dict
+
+
+
+@dataclass(frozen=True)
+class ServingConfig:
+    params_runtime: str
+    params_num_threads: int
+    params_share_weights: bool
+    params_warm_up: bool
+    params_micro_batching: bool
+    params_max_batch_size: int
+    params_max_wait_ms: float
+    params_max_queue_size: int
+    params_workers: int
+    params_max_pending: int
+
+
+
+@dataclass(frozen=True)
+class PreforkConfig:
+    bind: str
+    params_workers: int
+    params_timeout: int
+    params_graceful_timeout: int
+    params_max_requests: int
+    params_max_requests_jitter: int
+
+
+
+
+@dataclass(frozen=True)
+class PredictionCacheConfig:
+    root_dir: Path
+    cache_file: Path
+    params_enabled: bool
+    params_max_entries: int
+    params_ttl_seconds: float
+    params_persist: bool
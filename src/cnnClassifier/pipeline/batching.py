@@ -0,0 +1,161 @@
+import threading
+import time
+import queue
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+from cnnClassifier.logger.logging import logger
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler already has `max_queue_size` requests queued."""
+
+
+class MicroBatchScheduler:
+    """
+    Collects concurrent single-image requests into one batched forward pass.
+
+    Callers `submit()` a preprocessed (H, W, 3) array and get back a Future.
+    A background thread waits for the first request, keeps collecting until
+    either `max_batch_size` requests are queued or `max_wait_ms` has passed,
+    runs `predict_fn` once on the stacked batch and resolves every Future
+    with its own row of the output. With `max_queue_size` > 0 a full queue
+    fails the request with QueueFullError instead of blocking the caller.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 0,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._batches = 0
+        self._stopped = threading.Event()
+
+        self._worker = threading.Thread(
+            target=self._run, name="micro-batch-scheduler", daemon=True
+        )
+        self._worker.start()
+        logger.info(
+            f"Micro-batching enabled (max batch {max_batch_size}, max wait {max_wait_ms} ms)"
+        )
+
+    def submit(self, image: np.ndarray) -> Future:
+        """
+        Queues one preprocessed image, returns a Future of its model output.
+        The Future fails with QueueFullError if `max_queue_size` requests
+        are already queued.
+
+        Raises:
+            RuntimeError: if the scheduler is stopped
+        """
+        if self._stopped.is_set():
+            raise RuntimeError("micro-batch scheduler is stopped")
+        future = Future()
+        try:
+            self._queue.put_nowait((image, future))
+        except queue.Full:
+            future.set_exception(QueueFullError(f"{self._queue.maxsize} requests queued"))
+            return future
+        if self._stopped.is_set():
+            # stop() may have drained the queue before this put
+            self._drain()
+        return future
+
+    def _collect(self) -> list:
+        try:
+            items = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    @staticmethod
+    def _padded_size(n: int) -> int:
+        # round up to a power of two so the model only ever sees a few shapes
+        return 1 << (n - 1).bit_length()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            items = self._collect()
+            if not items:
+                continue
+
+            n = len(items)
+            images = [image for image, _ in items]
+            size = min(self._padded_size(n), self.max_batch_size)
+            batch = np.zeros((size, *images[0].shape), dtype=np.float32)
+            batch[:n] = images
+
+            try:
+                preds = np.asarray(self.predict_fn(batch))
+            except Exception as e:
+                logger.error(f"Batched inference failed for {n} requests: {e}")
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            for i, (_, future) in enumerate(items):
+                future.set_result(preds[i])
+
+            with self._lock:
+                self._batches += 1
+                self._requests += n
+                self._batch_sizes[n] += 1
+
+    def stats(self) -> dict:
+        """
+        Queue depth and batch-size metrics for monitoring.
+        """
+        with self._lock:
+            batches = self._batches
+            requests = self._requests
+            histogram = dict(sorted(self._batch_sizes.items()))
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "batch_size_histogram": histogram,
+        }
+
+    def _drain(self):
+        """fails the Futures of every request still queued"""
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            future.set_exception(RuntimeError("micro-batch scheduler stopped before this request ran"))
+
+    def stop(self):
+        """
+        Stops the worker thread; requests still queued fail instead of
+        waiting forever, and later `submit()` calls raise.
+        """
+        self._stopped.set()
+        self._worker.join()
+        self._drain()
@@ -0,0 +1,75 @@
+"""
+Runs the training pipeline as a multi-worker cluster on this machine:
+
+    python -m cnnClassifier.pipeline.local_cluster --workers 2
+
+Starts one `main.py` process per worker, each with the TF_CONFIG of its
+place in the cluster, and waits for all of them. Requires
+DISTRIBUTE.STRATEGY: multi_worker in params.yaml. Worker 0 is the chief;
+the other workers log to logs/ like any pipeline run.
+
+On several hosts, set TF_CONFIG on each one instead (see
+cnnClassifier.utils.distribute) and run `python main.py` there.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from cnnClassifier.constants import PARAMS_FILE_PATH
+from cnnClassifier.utils.common import read_yaml
+from cnnClassifier.utils.distribute import free_ports, local_tf_config
+
+
+def launch(workers: int, script: str = "main.py") -> int:
+    """
+    Runs `script` on `workers` local workers; returns the first non-zero
+    exit code, 0 when every worker succeeded.
+    """
+    ports = free_ports(workers)
+    processes = []
+    for index in range(workers):
+        env = dict(os.environ, TF_CONFIG=json.dumps(local_tf_config(workers, index, ports)))
+        processes.append(subprocess.Popen([sys.executable, script], env=env))
+        print(f"worker {index}: pid {processes[-1].pid}, localhost:{ports[index]}", flush=True)
+
+    exit_code = 0
+    running = dict(enumerate(processes))
+    try:
+        while running:
+            for index, process in list(running.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+                del running[index]
+                print(f"worker {index} exited with {code}", flush=True)
+                if code and not exit_code:
+                    exit_code = code
+                    # the others would wait for it forever
+                    for other in running.values():
+                        other.terminate()
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        raise
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="worker processes (default 2)")
+    parser.add_argument("--script", default="main.py", help="pipeline entry point (default main.py)")
+    args = parser.parse_args()
+
+    strategy = read_yaml(PARAMS_FILE_PATH).DISTRIBUTE.STRATEGY
+    if strategy != "multi_worker":
+        parser.error(f"DISTRIBUTE.STRATEGY is '{strategy}', set it to multi_worker in {PARAMS_FILE_PATH}")
+
+    sys.exit(launch(args.workers, args.script))
+
+
+if __name__ == "__main__":
+    main()
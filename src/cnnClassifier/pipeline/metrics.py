@@ -0,0 +1,265 @@
+import abc
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _Metric(abc.ABC):
+    """
+    Base of the metric types: a name, help text and one child per label set.
+    """
+
+    type_name = None
+    family_suffix = ""  # of the name on the HELP / TYPE lines
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    @abc.abstractmethod
+    def _new_child(self):
+        """a new child (one label set) of this metric type"""
+
+    def labels(self, *values, **kwargs):
+        """child metric for one combination of label values"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}, use .labels()")
+        return self._children[()]
+
+    def samples(self):
+        """(suffix, labels dict, value) of every child"""
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            for suffix, extra, value in child.samples():
+                yield suffix, {**labels, **extra}, value
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def samples(self):
+        yield "_total", {}, self._value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count; exposed as <name>_total."""
+
+    type_name = "counter"
+    family_suffix = "_total"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._function = None
+
+    def set(self, value: float):
+        self._value = float(value)
+
+    def set_function(self, function):
+        """reads the value from `function()` at scrape time"""
+        self._function = function
+
+    def samples(self):
+        yield "", {}, float(self._function()) if self._function is not None else self._value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a callback."""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._upper_bounds = buckets
+        self._counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative = 0
+        for bound, count in zip(self._upper_bounds + [math.inf], counts):
+            cumulative += count
+            yield "_bucket", {"le": _format_value(bound)}, cumulative
+        yield "_sum", {}, total
+        yield "_count", {}, cumulative
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with _sum and _count, as Prometheus expects."""
+
+    type_name = "histogram"
+
+    # seconds, 1 ms .. 10 s
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = sorted(float(b) for b in buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    value = float(value)
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape(value: str) -> str:
+    """label values also escape double quotes"""
+    return _escape_help(value).replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of this process and renders them in the Prometheus
+    text exposition format (version 0.0.4) for a /metrics endpoint.
+
+    Metrics are per process: with several server workers every worker
+    reports its own numbers and Prometheus sums them.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            family = metric.name + metric.family_suffix
+            lines.append(f"# HELP {family} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {family} {metric.type_name}")
+            for suffix, labels, value in metric.samples():
+                label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{metric.name}{suffix}{label_text} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ---------- prediction service metrics ----------
+
+PREDICTIONS = Counter(
+    "cnn_predictions", "Images predicted, by where the result came from.", ["source"]
+)
+PREDICTION_ERRORS = Counter(
+    "cnn_prediction_errors", "Images that could not be predicted, by failing step.", ["stage"]
+)
+LABEL_POSITIVES = Counter(
+    "cnn_label_positives", "Predictions at or above the request threshold, per label.", ["label"]
+)
+DECODE_SECONDS = Histogram(
+    "cnn_decode_seconds", "Time to decode, resize and preprocess one image."
+)
+INFERENCE_SECONDS = Histogram(
+    "cnn_inference_seconds", "Time of one forward pass."
+)
+INFERENCE_BATCH_SIZE = Histogram(
+    "cnn_inference_batch_size", "Rows per forward pass.", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+HTTP_REQUESTS = Counter(
+    "cnn_http_requests", "HTTP requests, by endpoint and status code.", ["endpoint", "status"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "cnn_http_request_seconds", "HTTP request latency, by endpoint.", ["endpoint"]
+)
+UPLOAD_BYTES = Histogram(
+    "cnn_upload_bytes", "Size of uploaded images.",
+    buckets=(16e3, 64e3, 256e3, 1e6, 2e6, 4e6, 8e6, 16e6),
+)
+MODEL_READY = Gauge(
+    "cnn_model_ready", "1 once the model is loaded and warmed up."
+)
+POOL_PENDING = Gauge(
+    "cnn_worker_pool_pending", "Requests queued or running in the model worker pool."
+)
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from cnnClassifier.logger.logging import logger
+
+
+class ModelUnavailableError(RuntimeError):
+    """the prediction pipeline is still loading, or failed to load"""
+
+
+class ModelLoader:
+    """
+    Builds the prediction pipeline lazily, so a web worker can start serving
+    static pages (and answer health checks) before the model is loaded.
+
+    `start()` loads (and optionally warms up) the pipeline on a background
+    thread; `get()` returns it, loading it on the caller's thread if nobody
+    started it yet, and blocks while another thread is loading.
+
+    States: not_loaded -> loading -> warming_up -> ready (or failed).
+    """
+
+    def __init__(self, factory, warm_up: bool = True):
+        self.factory = factory
+        self.warm_up = warm_up
+
+        self.pipeline = None
+        self.state = "not_loaded"
+        self.error = None
+        self.load_seconds = None
+        self.warm_up_seconds = None
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _claim(self) -> bool:
+        """
+        Marks the loader as loading; False if another thread got there first.
+        """
+        with self._lock:
+            if self.state != "not_loaded":
+                return False
+            self.state = "loading"
+            return True
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            pipeline = self.factory()
+            self.load_seconds = time.perf_counter() - start
+            logger.info(f"Prediction pipeline loaded in {self.load_seconds:.2f}s")
+
+            if self.warm_up:
+                self.state = "warming_up"
+                self.warm_up_seconds = pipeline.warm_up()
+
+            self.pipeline = pipeline
+            self.state = "ready"
+        except Exception as e:
+            logger.exception(f"Loading the prediction pipeline failed: {e}")
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self._done.set()
+
+    def start(self):
+        """
+        Loads the pipeline on a background thread (no-op if already started).
+        """
+        if self._claim():
+            threading.Thread(target=self._load, name="model-loader", daemon=True).start()
+
+    def get(self, timeout: float = None):
+        """
+        Returns the loaded pipeline.
+
+        Raises:
+            TimeoutError: if it is not loaded within `timeout` seconds
+            RuntimeError: if loading failed
+        """
+        if self._claim():
+            self._load()
+        if not self._done.wait(timeout):
+            raise TimeoutError("prediction pipeline is still loading")
+        if self.pipeline is None:
+            raise RuntimeError(f"prediction pipeline failed to load: {self.error}")
+        return self.pipeline
+
+    def get_nowait(self):
+        """
+        Like `get()` for a request: loads the pipeline on this thread when
+        nobody started loading it (WARM_UP False), but does not wait for a
+        load in progress.
+
+        Raises:
+            ModelUnavailableError: while loading / warming up, or if loading failed
+        """
+        if self.state in ("loading", "warming_up"):
+            raise ModelUnavailableError(f"prediction pipeline is {self.state.replace('_', ' ')}")
+        try:
+            return self.get()
+        except RuntimeError as e:
+            raise ModelUnavailableError(str(e)) from e
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warm_up_seconds": self.warm_up_seconds,
+        }
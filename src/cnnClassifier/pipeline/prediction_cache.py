@@ -0,0 +1,153 @@
+import atexit
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from cnnClassifier.logger.logging import logger
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of model outputs keyed by image content + model identity.
+
+    Values are the raw sigmoid probabilities, so the decision threshold is
+    applied by the caller and every threshold reuses the same entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 0,
+        persist_path: Path = None,
+        persist_every: int = 100,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.persist_every = persist_every
+
+        self._entries = OrderedDict()  # key -> (created_at, probabilities)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._dirty = 0
+
+        if self.persist_path is not None:
+            self.load()
+            atexit.register(self.save)
+
+    @staticmethod
+    def model_identity(model_path: Path) -> str:
+        """
+        Cheap identity of a model: path, size and modification time of its
+        file (or of every file, for a SavedModel directory).
+        """
+        model_path = Path(model_path)
+        files = sorted(p for p in model_path.rglob("*") if p.is_file()) if model_path.is_dir() else [model_path]
+
+        h = hashlib.sha256(str(model_path.resolve()).encode())
+        for path in files:
+            stat = os.stat(path)
+            h.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return h.hexdigest()[:16]
+
+    @staticmethod
+    def content_key(model_id: str, data) -> str:
+        """
+        Cache key for encoded image bytes or a decoded array.
+        """
+        h = hashlib.sha256()
+        if isinstance(data, np.ndarray):
+            h.update(f"{data.shape}{data.dtype}".encode())
+            data = np.ascontiguousarray(data)
+        h.update(data)
+        return f"{model_id}:{h.hexdigest()}"
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[0], now):
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: str, probabilities: np.ndarray):
+        with self._lock:
+            self._entries[key] = (time.time(), np.asarray(probabilities, dtype=np.float32))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            flush = self.persist_path is not None and self._dirty >= self.persist_every
+
+        if flush:
+            self.save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses, size = self._hits, self._misses, len(self._entries)
+        lookups = hits + misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+    def save(self):
+        """
+        Writes the cache to `persist_path` (atomic replace).
+        """
+        if self.persist_path is None:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = list(self._entries.keys())
+            created = np.array([v[0] for v in self._entries.values()], dtype=np.float64)
+            probs = np.array([v[1] for v in self._entries.values()], dtype=np.float32)
+            self._dirty = 0
+
+        os.makedirs(self.persist_path.parent, exist_ok=True)
+        tmp_path = self.persist_path.with_name(f".{self.persist_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=np.array(keys, dtype=str), created=created, probs=probs)
+        os.replace(tmp_path, self.persist_path)
+        logger.info(f"Prediction cache saved ({len(keys)} entries) at: {self.persist_path}")
+
+    def load(self):
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+
+        try:
+            with np.load(self.persist_path) as data:
+                keys, created, probs = data["keys"], data["created"], data["probs"]
+        except Exception as e:
+            logger.error(f"Ignoring unreadable prediction cache {self.persist_path}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, ts, p in zip(keys.tolist(), created.tolist(), probs):
+                if not self._expired(ts, now):
+                    self._entries[key] = (ts, p)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        logger.info(f"Prediction cache loaded ({len(self._entries)} entries) from: {self.persist_path}")
@@ -1,11 +1,17 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
-from PIL import Image
 
 from cnnClassifier.config.configuration import ConfigurationManager
+from cnnClassifier.pipeline import metrics
+from cnnClassifier.pipeline.batching import MicroBatchScheduler
+from cnnClassifier.pipeline.prediction_cache import PredictionCache
+from cnnClassifier.pipeline.runtimes import load_runtime
+from cnnClassifier.utils.backbones import LEGACY_PREPROCESSING
+from cnnClassifier.utils.preprocessing import load_image
+from cnnClassifier.utils.common import load_json
 from cnnClassifier.logger.logging import logger
 
 
@@ -29,46 +35,172 @@ class PredictionPipeline:
         Loads model + params from config.yaml + params.yaml
         """
 
-        config = ConfigurationManager()
+        config = ConfigurationManager(create_dirs=False)
 
-        # training config to get model path
-        training_config = config.get_training_config()
         params = config.params
+        training_config = config.get_training_config()
 
-        self.model_path = training_config.trained_model_path
         self.image_size = tuple(params.IMAGE_SIZE[:2])  # (224, 224)
 
-        logger.info(f"Loading trained model from: {self.model_path}")
-        self.model = keras.models.load_model(self.model_path)
-        logger.info("Model loaded successfully.")
+        # same preprocessing as the model was trained with (see ModelTraining)
+        self.preprocessing = LEGACY_PREPROCESSING
+        if training_config.model_meta_path.exists():
+            self.preprocessing = load_json(training_config.model_meta_path).preprocessing
+        logger.info(f"Using '{self.preprocessing}' preprocessing")
 
-    def _preprocess_image(self, image_path: str):
+        runtime_name, self.model_path, runtime_kwargs = self.resolve_runtime(config)
+        self.runtime = load_runtime(runtime_name, self.model_path, **runtime_kwargs)
+
+        self.scheduler = None
+
+        cache_config = config.get_prediction_cache_config()
+        self.cache = None
+        self.model_id = PredictionCache.model_identity(self.model_path)
+        if cache_config.params_enabled:
+            self.cache = PredictionCache(
+                max_entries=cache_config.params_max_entries,
+                ttl_seconds=cache_config.params_ttl_seconds,
+                persist_path=cache_config.cache_file if cache_config.params_persist else None,
+            )
+
+    @staticmethod
+    def resolve_runtime(config: ConfigurationManager):
         """
-        Loads and preprocesses an image exactly like training.
+        Returns (runtime name, model artifact path, runtime kwargs) for SERVING.RUNTIME.
+
+        keras reads the training output, the others the exported artifacts.
         """
-        img = Image.open(image_path).convert("RGB")
-        img = img.resize(self.image_size)
-        img = np.array(img) / 255.0
-        img = np.expand_dims(img, axis=0)  # (1, 224, 224, 3)
-        return img
+        serving_config = config.get_serving_config()
+        runtime_name = serving_config.params_runtime
 
-    def predict(self, image_path: str, threshold: float = 0.5):
+        if runtime_name == "keras":
+            return runtime_name, config.get_training_config().trained_model_path, {}
+
+        tflite_kwargs = {
+            "num_threads": serving_config.params_num_threads,
+            "share_weights": serving_config.params_share_weights,
+        }
+        if runtime_name == "tflite_quantized":
+            # variant promoted by the quantization stage (dynamic batch)
+            quantization_config = config.get_model_quantization_config()
+            if not Path(quantization_config.promoted_model_path).exists():
+                raise FileNotFoundError(
+                    f"SERVING.RUNTIME is tflite_quantized, but no quantized variant was promoted "
+                    f"(see {quantization_config.report_path}): {quantization_config.promoted_model_path}"
+                )
+            return "tflite", quantization_config.promoted_model_path, tflite_kwargs
+
+        export_config = config.get_model_export_config()
+        runtime_kwargs = {"fixed_batch_size": export_config.params_fixed_batch_size}
+        if runtime_name == "tflite":
+            return runtime_name, export_config.tflite_model_path, {**runtime_kwargs, **tflite_kwargs}
+        return runtime_name, export_config.saved_model_dir, runtime_kwargs
+
+    def enable_micro_batching(
+        self,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 0,
+    ) -> MicroBatchScheduler:
         """
-        Performs prediction on a single image.
+        Routes `predict` calls from concurrent threads through one shared
+        batched forward pass instead of one batch-1 pass per call.
+        """
+        if self.scheduler is None:
+            self.scheduler = MicroBatchScheduler(
+                predict_fn=self.predict_on_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                max_queue_size=max_queue_size,
+            )
+        return self.scheduler
 
-        Args:
-            image_path: path to input image
-            threshold: cut-off for multi-label classification
+    def warm_up(self) -> float:
         """
-        img = self._preprocess_image(image_path)
+        Runs dummy forward passes so graph tracing / tensor allocation happen
+        before the first real request. With micro-batching every padded batch
+        size the scheduler can produce is traced.
 
-        logger.info(f"Performing inference on: {image_path}")
-        preds = self.model.predict(img)[0]  # shape (10,)
+        Returns the warm-up time in seconds.
+        """
+        sizes = [1]
+        if self.scheduler is not None:
+            while sizes[-1] < self.scheduler.max_batch_size:
+                sizes.append(min(sizes[-1] * 2, self.scheduler.max_batch_size))
+
+        start = time.perf_counter()
+        for size in sizes:
+            # straight to the runtime, dummy passes stay out of the metrics
+            self.runtime.predict(np.zeros((size, *self.image_size, 3), dtype=np.float32))
+        elapsed = time.perf_counter() - start
+
+        logger.info(f"Warm-up done in {elapsed:.2f}s (batch sizes {sizes})")
+        return elapsed
+
+    def _load_image(self, image, out: np.ndarray = None) -> np.ndarray:
+        """
+        Decodes an image into a preprocessed float32 (224, 224, 3) array,
+        written into `out` (e.g. a row of a batch) when given.
+
+        `image` may be a path, the raw encoded bytes, a binary file-like
+        object (e.g. an upload stream) or an RGB array. Same decode / resize
+        as training, see utils/preprocessing.py.
+        """
+        start = time.perf_counter()
+        try:
+            out = load_image(image, self.image_size, self.preprocessing, out=out)
+        except Exception:
+            metrics.PREDICTION_ERRORS.labels("decode").inc()
+            raise
+        metrics.DECODE_SECONDS.observe(time.perf_counter() - start)
+        return out
+
+    @staticmethod
+    def _read_input(image):
+        """
+        Returns the encoded bytes of a path / file-like input (arrays pass through).
+        """
+        if isinstance(image, (np.ndarray, bytes)):
+            return image
+        if isinstance(image, (bytearray, memoryview)):
+            return bytes(image)
+        if isinstance(image, (str, Path)):
+            with open(image, "rb") as f:
+                return f.read()
+        return image.read()
+
+    def _lookup(self, image):
+        """
+        Cache lookup for one input.
+
+        Returns (data, key, cached probabilities or None); `data` is the
+        input read into memory so a miss does not read it twice.
+        """
+        if self.cache is None:
+            return image, None, None
+        data = self._read_input(image)
+        key = PredictionCache.content_key(self.model_id, data)
+        return data, key, self.cache.get(key)
+
+    def _preprocess_image(self, image_path: str):
+        """
+        Loads and preprocesses an image exactly like training.
+        """
+        img = np.empty((1, *self.image_size, 3), dtype=np.float32)  # (1, 224, 224, 3)
+        self._load_image(image_path, out=img[0])
+        return img
 
+    def _to_result(self, preds: np.ndarray, threshold: float) -> dict:
+        """
+        Converts the sigmoid outputs of one image into the result dict.
+        """
         # Convert sigmoid outputs → 0/1 labels
         binary_outputs = (preds >= threshold).astype(int)
+        for label, binary in zip(self.LABEL_COLUMNS, binary_outputs):
+            if binary:
+                metrics.LABEL_POSITIVES.labels(label).inc()
 
-        result = {
+        return {
             label: {
                 "probability": float(pred),
                 "prediction": int(binary)
@@ -76,4 +208,137 @@ class PredictionPipeline:
             for label, pred, binary in zip(self.LABEL_COLUMNS, preds, binary_outputs)
         }
 
-        return result
+    def predict(self, image_path: str, threshold: float = 0.5):
+        """
+        Performs prediction on a single image.
+
+        Args:
+            image_path: path to input image, or its bytes / file-like object
+            threshold: cut-off for multi-label classification
+        """
+        source = image_path if isinstance(image_path, (str, Path)) else type(image_path).__name__
+
+        # threshold is applied after the lookup so every threshold shares an entry
+        image_path, key, preds = self._lookup(image_path)
+        if preds is not None:
+            logger.info(f"Prediction cache hit for: {source}")
+            metrics.PREDICTIONS.labels("cache").inc()
+            return self._to_result(preds, threshold)
+
+        if self.scheduler is not None:
+            # decode in the caller's thread, batch only the forward pass
+            img = self._load_image(image_path)
+            preds = self.scheduler.submit(img).result()  # shape (10,)
+        else:
+            img = self._preprocess_image(image_path)
+
+            logger.info(f"Performing inference on: {source}")
+            preds = self.predict_on_batch(img)[0]  # shape (10,)
+
+        metrics.PREDICTIONS.labels("model").inc()
+        if key is not None:
+            self.cache.put(key, preds)
+
+        return self._to_result(preds, threshold)
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Runs one forward pass on an already preprocessed (N, 224, 224, 3) batch.
+        """
+        start = time.perf_counter()
+        try:
+            preds = self.runtime.predict(batch)
+        except Exception:
+            metrics.PREDICTION_ERRORS.labels("inference").inc()
+            raise
+        metrics.INFERENCE_SECONDS.observe(time.perf_counter() - start)
+        metrics.INFERENCE_BATCH_SIZE.observe(len(batch))
+        return preds
+
+    def predict_proba_batch(
+        self,
+        images,
+        batch_size: int = 32,
+        num_workers: int = None,
+    ) -> np.ndarray:
+        """
+        Returns the sigmoid outputs for many images, shape (N, 10).
+
+        Images are decoded on a thread pool straight into one of two
+        preallocated float32 batch buffers while the other one runs through
+        the model. Every forward pass uses exactly `batch_size` rows (rows
+        past the end are zero) so the model never sees a new shape.
+        Cache hits are not decoded and their rows are ignored.
+        """
+        images = list(images)
+        preds = np.empty((len(images), len(self.LABEL_COLUMNS)), dtype=np.float32)
+        if not images:
+            return preds
+
+        chunks = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+        buffers = [np.zeros((batch_size, *self.image_size, 3), dtype=np.float32) for _ in range(2)]
+
+        with ThreadPoolExecutor(max_workers=num_workers or os.cpu_count()) as executor:
+
+            def _prepare(image, row):
+                data, key, cached = self._lookup(image)
+                if cached is None:
+                    self._load_image(data, out=row)
+                return key, cached
+
+            def _submit(idx):
+                batch = buffers[idx % 2]
+                batch[len(chunks[idx]):] = 0.0
+                return [executor.submit(_prepare, img, batch[i]) for i, img in enumerate(chunks[idx])]
+
+            pending = _submit(0)
+            start = 0
+            for idx in range(len(chunks)):
+                current = pending
+                # decode the next chunk while this one is being predicted
+                if idx + 1 < len(chunks):
+                    pending = _submit(idx + 1)
+
+                misses = []  # (row in batch, cache key)
+                for i, future in enumerate(current):
+                    key, cached = future.result()
+                    if cached is not None:
+                        preds[start + i] = cached
+                    else:
+                        misses.append((i, key))
+
+                metrics.PREDICTIONS.labels("cache").inc(len(current) - len(misses))
+                if misses:
+                    metrics.PREDICTIONS.labels("model").inc(len(misses))
+                    out = self.predict_on_batch(buffers[idx % 2])
+                    for i, key in misses:
+                        preds[start + i] = out[i]
+                        if key is not None:
+                            self.cache.put(key, out[i])
+                start += len(current)
+
+        return preds
+
+    def predict_batch(
+        self,
+        images,
+        batch_size: int = 32,
+        threshold: float = 0.5,
+        num_workers: int = None,
+    ) -> list:
+        """
+        Performs prediction on many images with batched forward passes.
+
+        Args:
+            images: image paths, encoded bytes, file-like objects or RGB arrays
+            batch_size: images per forward pass (32-64 works well on CPU)
+            threshold: cut-off for multi-label classification
+            num_workers: decode threads, defaults to the CPU count
+
+        Returns:
+            list of result dicts in the same order as `images`
+        """
+        images = list(images)
+        logger.info(f"Performing batched inference on {len(images)} images (batch size {batch_size})")
+        preds = self.predict_proba_batch(images, batch_size=batch_size, num_workers=num_workers)
+        return [self._to_result(p, threshold) for p in preds]
@@ -0,0 +1,155 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from cnnClassifier.logger.logging import logger
+
+
+def _run_fixed_batch(batch: np.ndarray, fixed_batch_size: int, fn) -> np.ndarray:
+    """
+    Feeds a model that only accepts `fixed_batch_size` rows: splits larger
+    batches into chunks and zero-pads the last one.
+    """
+    outputs = []
+    for start in range(0, len(batch), fixed_batch_size):
+        chunk = batch[start:start + fixed_batch_size]
+        n = len(chunk)
+        if n < fixed_batch_size:
+            padded = np.zeros((fixed_batch_size, *batch.shape[1:]), dtype=batch.dtype)
+            padded[:n] = chunk
+            chunk = padded
+        outputs.append(fn(chunk)[:n])
+    return np.concatenate(outputs, axis=0)
+
+
+class KerasRuntime:
+    """
+    Full Keras model (.h5), the training output.
+    """
+
+    name = "keras"
+
+    def __init__(self, model_path: Path):
+        from tensorflow import keras
+
+        self.model_path = Path(model_path)
+        self.model = keras.models.load_model(self.model_path)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+class SavedModelRuntime:
+    """
+    Concrete `serving_default` signature of the exported SavedModel;
+    skips the Keras predict loop entirely.
+    """
+
+    name = "saved_model"
+
+    def __init__(self, model_path: Path, fixed_batch_size: int = 0):
+        import tensorflow as tf
+
+        self.model_path = Path(model_path)
+        self.fixed_batch_size = fixed_batch_size
+        self._loaded = tf.saved_model.load(str(self.model_path))
+        self._serve = self._loaded.signatures["serving_default"]
+        self._input_name = list(self._serve.structured_input_signature[1].keys())[0]
+        self._output_name = list(self._serve.structured_outputs.keys())[0]
+
+    def _call(self, batch: np.ndarray) -> np.ndarray:
+        return self._serve(**{self._input_name: batch})[self._output_name].numpy()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        if self.fixed_batch_size:
+            return _run_fixed_batch(batch, self.fixed_batch_size, self._call)
+        return self._call(batch)
+
+
+class TFLiteRuntime:
+    """
+    TFLite interpreter. Uses the standalone `tflite_runtime` package when it
+    is installed, so a serving worker does not need to import TensorFlow.
+
+    The model file is memory-mapped read-only, so every process serving the
+    same file shares its pages. With `share_weights` the default XNNPACK
+    delegate is skipped, because it repacks the weights into private
+    per-process buffers.
+    """
+
+    name = "tflite"
+
+    def __init__(
+        self,
+        model_path: Path,
+        fixed_batch_size: int = 0,
+        num_threads: int = None,
+        share_weights: bool = False,
+    ):
+        try:
+            from tflite_runtime.interpreter import Interpreter, OpResolverType
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+            OpResolverType = tf.lite.experimental.OpResolverType
+
+        resolver = OpResolverType.AUTO
+        if share_weights:
+            resolver = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+
+        self.model_path = Path(model_path)
+        self.fixed_batch_size = fixed_batch_size
+        self.interpreter = Interpreter(
+            model_path=str(self.model_path),
+            num_threads=num_threads or os.cpu_count(),
+            experimental_op_resolver_type=resolver,
+        )
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        # the interpreter holds one set of tensors, calls must not interleave
+        self._lock = threading.Lock()
+
+    def _call(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if tuple(self._input["shape"]) != batch.shape:
+                self.interpreter.resize_tensor_input(self._input["index"], batch.shape)
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._output = self.interpreter.get_output_details()[0]
+            self.interpreter.set_tensor(self._input["index"], batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"]).copy()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=self._input["dtype"])
+        if self.fixed_batch_size:
+            return _run_fixed_batch(batch, self.fixed_batch_size, self._call)
+        return self._call(batch)
+
+
+RUNTIMES = {
+    KerasRuntime.name: KerasRuntime,
+    SavedModelRuntime.name: SavedModelRuntime,
+    TFLiteRuntime.name: TFLiteRuntime,
+}
+
+
+def load_runtime(name: str, model_path: Path, **kwargs):
+    """
+    Builds the runtime called `name` ("keras", "saved_model" or "tflite").
+    """
+    if name not in RUNTIMES:
+        raise ValueError(f"Unknown runtime '{name}', expected one of {list(RUNTIMES)}")
+
+    logger.info(f"Loading {name} runtime from: {model_path}")
+    if name == KerasRuntime.name:
+        runtime = KerasRuntime(model_path)
+    else:
+        runtime = RUNTIMES[name](model_path, **kwargs)
+    logger.info("Model loaded successfully.")
+    return runtime
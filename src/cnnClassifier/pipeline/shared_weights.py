@@ -0,0 +1,39 @@
+import mmap
+import os
+from pathlib import Path
+
+from cnnClassifier.logger.logging import logger
+
+
+# path -> read-only mappings, kept open for the lifetime of the process
+_MAPPINGS = {}
+
+
+def map_read_only(model_path: Path) -> int:
+    """
+    Memory-maps a model file (or every file of a SavedModel directory)
+    read-only and asks the kernel to page it in.
+
+    Called in the pre-fork master: the pages land in the shared page cache
+    once, and every worker that later maps the same file (the TFLite
+    interpreter does) reuses them instead of reading its own copy.
+
+    Returns the number of bytes mapped.
+    """
+    model_path = Path(model_path)
+    files = sorted(p for p in model_path.rglob("*") if p.is_file()) if model_path.is_dir() else [model_path]
+
+    total = 0
+    for path in files:
+        key = str(path.resolve())
+        if key in _MAPPINGS or os.path.getsize(path) == 0:
+            continue
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, "MADV_WILLNEED"):
+            mapping.madvise(mmap.MADV_WILLNEED)
+        _MAPPINGS[key] = mapping
+        total += len(mapping)
+
+    logger.info(f"Mapped {total / 1024 / 1024:.1f} MB of model weights read-only: {model_path}")
+    return total
@@ -0,0 +1,278 @@
+"""
+Hyperparameter sweep over params.yaml (SWEEP block):
+
+    python -m cnnClassifier.pipeline.sweep
+
+Ingestion, preprocessing and the base model are prepared once, through the
+run manifest like `main.py` (so usually skipped), and shared by every
+trial. Trials are params.yaml with the SWEEP.SPACE values of one grid point
+or random sample; they train in a pool of processes, each limited to
+SWEEP.THREADS_PER_TRIAL threads.
+
+With successive halving, all trials train for MIN_EPOCHS, only the best
+1/ETA of them continue to MIN_EPOCHS x ETA epochs, and so on up to EPOCHS.
+A trial continues from the model it saved at the previous rung.
+
+Every trial and rung is a row of SWEEP results_path (CSV); the best trial's
+params go to best_params.json next to it. EARLY_STOPPING is off in trials,
+halving stops the weak ones instead.
+"""
+import copy
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing import get_context
+from pathlib import Path
+
+import pandas as pd
+import tensorflow as tf
+from box import ConfigBox
+from tensorflow import keras
+
+from cnnClassifier.components.model_training import ModelTraining
+from cnnClassifier.config.configuration import ConfigurationManager
+from cnnClassifier.entity.config_entity import SweepConfig
+from cnnClassifier.logger.logging import logger
+from cnnClassifier.pipeline.training_pipeline import TrainingPipeline
+from cnnClassifier.utils.common import save_json
+
+
+def sample_space(space: dict, method: str, trials: int, seed: int) -> list:
+    """
+    Param overrides of every trial: all combinations of the SPACE lists
+    (grid), or `trials` random draws. Random search also takes
+    {"uniform": [low, high]} and {"log_uniform": [low, high]}.
+    """
+    keys = list(space)
+    if method == "grid":
+        for key in keys:
+            if not isinstance(space[key], list):
+                raise ValueError(f"SWEEP.SPACE.{key}: grid search needs a list of values")
+        return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+    if method != "random":
+        raise ValueError(f"Unknown SWEEP.METHOD '{method}', expected grid or random")
+
+    rng = random.Random(seed)
+
+    def _draw(spec):
+        if isinstance(spec, list):
+            return rng.choice(spec)
+        if "log_uniform" in spec:
+            low, high = spec["log_uniform"]
+            return float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        if "uniform" in spec:
+            low, high = spec["uniform"]
+            return rng.uniform(low, high)
+        raise ValueError(f"Unsupported SWEEP.SPACE value: {spec}")
+
+    return [{key: _draw(space[key]) for key in keys} for _ in range(trials)]
+
+
+def rung_epochs(max_epochs: int, min_epochs: int, eta: int) -> list:
+    """epochs every surviving trial has trained after each rung, e.g. [1, 2, 4, 6]"""
+    rungs = []
+    epochs = max(1, min_epochs)
+    while epochs < max_epochs:
+        rungs.append(epochs)
+        epochs *= eta
+    return rungs + [max_epochs]
+
+
+def _set_param(params: dict, key: str, value) -> None:
+    """sets a (dotted) params.yaml key, e.g. FINE_TUNE.LEARNING_RATE"""
+    *parents, name = key.split(".")
+    node = params
+    for parent in parents:
+        node = node[parent]
+    if name not in node:
+        raise KeyError(f"SWEEP.SPACE key '{key}' is not in params.yaml")
+    node[name] = value
+
+
+def _init_worker(threads: int):
+    # before TensorFlow runs its first op (and starts its thread pools) in this process
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(1, threads // 2))
+
+
+def run_trial(task: dict) -> dict:
+    """
+    Trains one trial up to the EPOCHS of its params, in a pool process.
+    Returns the Keras history of the new epochs, or the error.
+    """
+    trial_dir = Path(task["trial_dir"])
+    trial_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    try:
+        training_config = replace(
+            ConfigurationManager(create_dirs=False).get_training_config(),
+            root_dir=trial_dir,
+            trained_model_path=trial_dir / "model.h5",
+            dataset_cache_dir=trial_dir / "tfdata_cache",
+            model_meta_path=trial_dir / "model_meta.json",
+            backbone_report_path=trial_dir / "backbone_report.json",
+            trace_dir=trial_dir / "profiler_trace",
+            checkpoint_dir=trial_dir / "checkpoints",
+        )
+        trainer = ModelTraining(
+            config=training_config,
+            params=ConfigBox(task["params"]),
+            data_ingestion_artifact=task["data_ingestion_artifact"],
+            prepare_base_model_artifact=task["prepare_base_model_artifact"],
+            data_preprocessing_artifact=task["data_preprocessing_artifact"],
+        )
+        history = trainer.train_until(training_config.trained_model_path, task["initial_epoch"])
+        result = {"status": "ok", "history": history}
+    except Exception as e:
+        logger.exception(f"Trial {task['trial']} failed")
+        result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+    finally:
+        keras.backend.clear_session()  # the pool process trains the next trial
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+class HyperparameterSweep:
+    def __init__(self):
+        config = ConfigurationManager()
+        self.config: SweepConfig = config.get_sweep_config()
+        self.params = config.params
+
+        # lower is better for losses, higher for accuracies
+        self.minimize = "loss" in self.config.params_metric
+
+    def _best(self, values: list) -> float:
+        return min(values) if self.minimize else max(values)
+
+    def _trial_params(self, overrides: dict, epochs: int) -> dict:
+        params = copy.deepcopy(self.params.to_dict())
+        for key, value in overrides.items():
+            _set_param(params, key, value)
+        params["EPOCHS"] = epochs
+        # rungs are the checkpoints and successive halving the early stopping;
+        # every trial trains exactly the epochs of its rung; one process per trial
+        params["CHECKPOINT"]["ENABLED"] = False
+        params["EARLY_STOPPING"]["ENABLED"] = False
+        params["DISTRIBUTE"]["STRATEGY"] = "none"
+        params["DATASET"]["PRIVATE_THREADPOOL_SIZE"] = self.config.params_threads_per_trial
+        return params
+
+    def _rungs(self, trials: list) -> list:
+        """epochs per rung; one rung of each trial's own EPOCHS without halving"""
+        if not self.config.params_halving:
+            return None
+        if any("EPOCHS" in overrides for overrides in trials):
+            raise ValueError("SWEEP.SPACE.EPOCHS cannot be combined with successive halving (EPOCHS is its budget)")
+        return rung_epochs(self.params.EPOCHS, self.config.params_min_epochs, self.config.params_eta)
+
+    def _save_results(self, rows: list) -> pd.DataFrame:
+        table = pd.DataFrame(rows)
+        table.to_csv(self.config.results_path, index=False)
+        return table
+
+    def main(self):
+        config = ConfigurationManager()
+        logger.info("=== Hyperparameter sweep started ===")
+
+        # dataset + base model once, for every trial
+        pipeline = TrainingPipeline()
+        pipeline.open_manifest(config.get_run_manifest_config())
+        data_ingestion_artifact, data_preprocessing_artifact, prepare_base_model_artifact = (
+            pipeline.run_input_stages(config, self.params)
+        )
+
+        trials = sample_space(
+            self.config.params_space, self.config.params_method,
+            self.config.params_trials, self.config.params_seed,
+        )
+        rungs = self._rungs(trials)
+        threads = self.config.params_threads_per_trial
+        workers = self.config.params_workers or max(1, (os.cpu_count() or 1) // threads)
+        workers = min(workers, len(trials))
+        logger.info(
+            f"{len(trials)} trials ({self.config.params_method}), rungs {rungs or 'off'}, "
+            f"{workers} at a time with {threads} threads each"
+        )
+
+        metric = self.config.params_metric
+        alive = list(range(len(trials)))
+        trained = {i: 0 for i in alive}    # epochs done per trial
+        histories = {i: {} for i in alive}
+        rows = []
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads,),
+        ) as pool:
+            for rung in range(len(rungs) if rungs else 1):
+                tasks = {}
+                for i in alive:
+                    epochs = rungs[rung] if rungs else trials[i].get("EPOCHS", self.params.EPOCHS)
+                    tasks[i] = {
+                        "trial": i,
+                        "trial_dir": str(Path(self.config.root_dir) / f"trial_{i:03d}"),
+                        "params": self._trial_params(trials[i], epochs),
+                        "initial_epoch": trained[i],
+                        "data_ingestion_artifact": data_ingestion_artifact,
+                        "data_preprocessing_artifact": data_preprocessing_artifact,
+                        "prepare_base_model_artifact": prepare_base_model_artifact,
+                    }
+                    trained[i] = epochs
+
+                results = dict(zip(tasks, pool.map(run_trial, tasks.values())))
+
+                scores = {}
+                for i, result in results.items():
+                    row = {"trial": i, "rung": rung, "epochs": trained[i], **trials[i],
+                           "status": result["status"], "seconds": result["seconds"]}
+                    if result["status"] == "ok":
+                        for key, values in result["history"].items():
+                            histories[i].setdefault(key, []).extend(values)
+                            row[key] = values[-1]
+                        if metric not in histories[i]:
+                            raise KeyError(f"SWEEP.METRIC '{metric}' not in the training logs: {list(histories[i])}")
+                        scores[i] = self._best(histories[i][metric])
+                        row[f"best_{metric}"] = scores[i]
+                    else:
+                        row["error"] = result["error"]
+                    rows.append(row)
+
+                ranked = sorted(scores, key=scores.get, reverse=not self.minimize)
+                last_rung = not rungs or rung == len(rungs) - 1
+                alive = ranked if last_rung else ranked[:max(1, math.ceil(len(ranked) / self.config.params_eta))]
+                for row in rows[-len(results):]:
+                    if row["status"] == "ok":
+                        row["status"] = "completed" if last_rung else ("promoted" if row["trial"] in alive else "stopped")
+
+                self._save_results(rows)
+                logger.info(f"Rung {rung}: {len(scores)} trials scored, {len(alive)} continue")
+                if not alive:
+                    raise RuntimeError(f"Every trial failed, see {self.config.results_path}")
+
+        table = self._save_results(rows)
+        best = alive[0]
+        save_json(Path(self.config.results_path).with_name("best_params.json"), {
+            "trial": best,
+            "params": trials[best],
+            "epochs": trained[best],
+            f"best_{metric}": scores[best],
+        })
+
+        finished = table[table["status"] == "completed"].sort_values(f"best_{metric}", ascending=self.minimize)
+        logger.info(f"Completed trials:\n{finished.to_string(index=False)}")
+        logger.info(f"Best trial {best}: {trials[best]}, {metric} = {scores[best]:.4f}")
+        logger.info(f"=== Hyperparameter sweep finished, results in {self.config.results_path} ===")
+        return table
+
+
+if __name__ == "__main__":
+    HyperparameterSweep().main()
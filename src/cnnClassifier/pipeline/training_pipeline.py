@@ -1,27 +1,56 @@
+import contextlib
+from pathlib import Path
+
 from cnnClassifier.config.configuration import ConfigurationManager
 from cnnClassifier.components.data_ingestion import DataIngestion
+from cnnClassifier.components.data_preprocessing import DataPreprocessing
 from cnnClassifier.components.prepare_base_model import PrepareBaseModel
 from cnnClassifier.components.model_training import ModelTraining
+from cnnClassifier.components.model_export import ModelExport
+from cnnClassifier.components.model_quantization import ModelQuantization
 
 
 from cnnClassifier.entity.config_entity import (
     DataIngestionConfig,
+    DataPreprocessingConfig,
     PrepareBaseModelConfig,
-    TrainingConfig,)
+    TrainingConfig,
+    ModelExportConfig,
+    ModelQuantizationConfig,)
 
 
 from cnnClassifier.entity.artifact_entity import (
     DataIngestionArtifact,
+    DataPreprocessingArtifact,
     PrepareBaseModelArtifact,
-    ModelTrainingArtifact
+    ModelTrainingArtifact,
+    ModelExportArtifact,
+    ModelQuantizationArtifact,
 )
 
+from cnnClassifier.utils import distribute, profiling
+from cnnClassifier.utils.run_manifest import RunManifest
 from cnnClassifier.logger.logging import logger
 
 
 class TrainingPipeline:
+
+    # params blocks model training does not read: changing them reruns only
+    # the stages that do (their params are part of those stages' configs)
+    NON_TRAINING_PARAMS = (
+        "PIPELINE",
+        "PROFILING",
+        "EXPORT",
+        "QUANTIZATION",
+        "SERVING",
+        "PREDICTION_CACHE",
+        "CHECKPOINT",
+        "SWEEP",
+    )
+
     def __init__(self):
-        pass
+        self.manifest = None
+        self.force_stages = set()
 
     def start_data_ingestion(self) -> DataIngestionArtifact:
         logger.info("Entered start_data_ingestion of TrainingPipeline")
@@ -38,6 +67,27 @@ class TrainingPipeline:
 
 
 
+    def start_data_preprocessing(
+        self,
+        data_ingestion_artifact: DataIngestionArtifact,
+    ) -> DataPreprocessingArtifact:
+        logger.info("Entered start_data_preprocessing of TrainingPipeline")
+
+        config = ConfigurationManager()
+        data_preprocessing_config = config.get_data_preprocessing_config()
+
+        data_preprocessing = DataPreprocessing(
+            config=data_preprocessing_config,
+            data_ingestion_artifact=data_ingestion_artifact,
+        )
+        data_preprocessing_artifact = data_preprocessing.initiate_data_preprocessing()
+
+        logger.info("Completed data preprocessing in TrainingPipeline")
+        return data_preprocessing_artifact
+
+
+
+
     def start_prepare_base_model(self) -> PrepareBaseModelArtifact:
         logger.info("Entered start_prepare_base_model of TrainingPipeline")
 
@@ -59,6 +109,7 @@ class TrainingPipeline:
         self,
         data_ingestion_artifact: DataIngestionArtifact,
         prepare_base_model_artifact: PrepareBaseModelArtifact,
+        data_preprocessing_artifact: DataPreprocessingArtifact = None,
     ) -> ModelTrainingArtifact:
         logger.info("Entered start_model_training of TrainingPipeline")
 
@@ -70,12 +121,51 @@ class TrainingPipeline:
             params=config.params,
             data_ingestion_artifact=data_ingestion_artifact,
             prepare_base_model_artifact=prepare_base_model_artifact,
+            data_preprocessing_artifact=data_preprocessing_artifact,
         )
 
         model_training_artifact = model_trainer.initiate_model_training()
 
         logger.info("Completed model_training in TrainingPipeline")
         return model_training_artifact
+
+    def start_model_export(
+        self,
+        model_training_artifact: ModelTrainingArtifact,
+    ) -> ModelExportArtifact:
+        logger.info("Entered start_model_export of TrainingPipeline")
+
+        config = ConfigurationManager()
+        model_export_config = config.get_model_export_config()
+
+        model_export = ModelExport(
+            config=model_export_config,
+            model_training_artifact=model_training_artifact,
+        )
+        model_export_artifact = model_export.initiate_model_export()
+
+        logger.info("Completed model_export in TrainingPipeline")
+        return model_export_artifact
+
+    def start_model_quantization(
+        self,
+        data_ingestion_artifact: DataIngestionArtifact,
+        model_training_artifact: ModelTrainingArtifact,
+    ) -> ModelQuantizationArtifact:
+        logger.info("Entered start_model_quantization of TrainingPipeline")
+
+        config = ConfigurationManager()
+        model_quantization_config = config.get_model_quantization_config()
+
+        model_quantization = ModelQuantization(
+            config=model_quantization_config,
+            data_ingestion_artifact=data_ingestion_artifact,
+            model_training_artifact=model_training_artifact,
+        )
+        model_quantization_artifact = model_quantization.initiate_model_quantization()
+
+        logger.info("Completed model_quantization in TrainingPipeline")
+        return model_quantization_artifact
     
 
 
@@ -85,26 +175,168 @@ class TrainingPipeline:
 
 
 
+    def _run_stage(self, name: str, artifact_cls, run, *values, inputs=()):
+        """
+        Runs one stage, or reuses its artifact when its fingerprint (config /
+        params `values` + hashes of the upstream artifacts in `inputs`) is
+        the one recorded in the run manifest.
+        """
+        with profiling.stage(name):
+            if self.manifest is None:
+                return run()
+
+            fingerprint = self.manifest.fingerprint(*values, inputs=inputs)
+            if name not in self.force_stages:
+                artifact = self.manifest.lookup(name, fingerprint, artifact_cls)
+                if artifact is not None:
+                    logger.info(f"Skipping {name}: config, params and inputs unchanged")
+                    profiling.record("skipped", True)
+                    return artifact
+
+            # a failed rerun must not leave the old record pointing at half-written outputs
+            self.manifest.invalidate(name)
+            artifact = run()
+            self.manifest.record(name, fingerprint, artifact)
+            return artifact
+
+    def open_manifest(self, run_manifest_config) -> None:
+        """loads the run manifest (None when runs are not incremental) and the forced stages"""
+        self.manifest = (
+            RunManifest(run_manifest_config.manifest_path)
+            if run_manifest_config.params_incremental else None
+        )
+        self.force_stages = set(run_manifest_config.params_force_stages)
+
+    def run_input_stages(self, config: ConfigurationManager, params) -> tuple:
+        """
+        Stages 01-02: the dataset and the base model that training starts
+        from, skipped when unchanged (also used by the hyperparameter sweep).
+        """
+        # Stage 01
+        data_ingestion_artifact = self._run_stage(
+            "data_ingestion", DataIngestionArtifact,
+            self.start_data_ingestion,
+            config.get_data_ingestion_config(),
+        )
+
+        # Stage 01b (optional): pre-decoded shards
+        data_preprocessing_artifact = None
+        if params.INPUT_FORMAT == "shards":
+            data_preprocessing_artifact = self._run_stage(
+                "data_preprocessing", DataPreprocessingArtifact,
+                lambda: self.start_data_preprocessing(
+                    data_ingestion_artifact=data_ingestion_artifact,
+                ),
+                config.get_data_preprocessing_config(),
+                inputs=[data_ingestion_artifact],
+            )
+
+        # Stage 02
+        prepare_base_model_artifact = self._run_stage(
+            "prepare_base_model", PrepareBaseModelArtifact,
+            self.start_prepare_base_model,
+            config.get_prepare_base_model_config(),
+        )
+
+        return data_ingestion_artifact, data_preprocessing_artifact, prepare_base_model_artifact
+
+    @contextlib.contextmanager
+    def _input_stages_lock(self, run_manifest_config):
+        """
+        Workers on one machine share the artifacts folder: they run the
+        input stages one at a time, and the later ones reuse what the first
+        one produced (the manifest is re-read under the lock).
+        """
+        if not distribute.is_distributed():
+            yield
+            return
+
+        manifest_path = Path(run_manifest_config.manifest_path)
+        with distribute.host_lock(manifest_path.with_suffix(".lock")):
+            if self.manifest is not None:
+                self.manifest = RunManifest(manifest_path)
+            yield
+
     def main(self):
-        try:
-            logger.info("=== Training Pipeline started ===")
+        config = ConfigurationManager()
+        params = config.params
+        # multi-worker collectives must be set up before the first TensorFlow op
+        distribute.get_strategy(params.DISTRIBUTE.STRATEGY)
+        chief = not distribute.is_distributed() or distribute.is_chief()
 
-            # Stage 01
-            data_ingestion_artifact= self.start_data_ingestion()
+        profiling_config = config.get_profiling_config()
+        run_manifest_config = config.get_run_manifest_config()
+        profiler = profiling.start_run() if profiling_config.params_enabled and chief else None
+        status = "failed"
 
-            # Stage 02
-            prepare_base_model_artifact = self.start_prepare_base_model()
+        self.open_manifest(run_manifest_config)
+        if distribute.is_distributed():
+            # every worker has to take part in every training step
+            self.force_stages.add("model_training")
 
+        try:
+            logger.info("=== Training Pipeline started ===")
 
+            with self._input_stages_lock(run_manifest_config):
+                data_ingestion_artifact, data_preprocessing_artifact, prepare_base_model_artifact = (
+                    self.run_input_stages(config, params)
+                )
+
+            if not chief:
+                # the chief saves the model and runs the stages after training
+                self.start_model_training(
+                    data_ingestion_artifact=data_ingestion_artifact,
+                    prepare_base_model_artifact=prepare_base_model_artifact,
+                    data_preprocessing_artifact=data_preprocessing_artifact,
+                )
+                status = "completed"
+                logger.info(f"=== Training Pipeline finished on worker {distribute.worker_index()} ===")
+                return
+
+            # Stage 03
+            model_training_artifact = self._run_stage(
+                "model_training", ModelTrainingArtifact,
+                lambda: self.start_model_training(
+                    data_ingestion_artifact=data_ingestion_artifact,
+                    prepare_base_model_artifact=prepare_base_model_artifact,
+                    data_preprocessing_artifact=data_preprocessing_artifact,
+                ),
+                config.get_training_config(),
+                {k: v for k, v in params.items() if k not in self.NON_TRAINING_PARAMS},
+                {"workers": distribute.num_workers() if distribute.is_distributed() else 1},
+                inputs=[data_ingestion_artifact, data_preprocessing_artifact, prepare_base_model_artifact],
+            )
 
-             # Stage 03
-            _ = self.start_model_training(
-                data_ingestion_artifact=data_ingestion_artifact,
-                prepare_base_model_artifact=prepare_base_model_artifact,
+            # Stage 04
+            self._run_stage(
+                "model_export", ModelExportArtifact,
+                lambda: self.start_model_export(
+                    model_training_artifact=model_training_artifact,
+                ),
+                config.get_model_export_config(),
+                inputs=[model_training_artifact],
             )
 
-            logger.info("=== Training Pipeline finished (Stages 1 & 2) ===")
+            # Stage 05 (optional)
+            if params.QUANTIZATION.ENABLED:
+                self._run_stage(
+                    "model_quantization", ModelQuantizationArtifact,
+                    lambda: self.start_model_quantization(
+                        data_ingestion_artifact=data_ingestion_artifact,
+                        model_training_artifact=model_training_artifact,
+                    ),
+                    config.get_model_quantization_config(),
+                    inputs=[data_ingestion_artifact, model_training_artifact],
+                )
+
+            status = "completed"
+            logger.info("=== Training Pipeline finished ===")
 
         except Exception as e:
             logger.error(e)
             raise e
+
+        finally:
+            if profiler is not None:
+                profiler.save(profiling_config.run_report_path, status)
+                profiling.end_run()
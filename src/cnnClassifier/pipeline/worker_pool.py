@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from cnnClassifier.logger.logging import logger
+
+
+class PoolFullError(Exception):
+    """Raised when the worker pool already has `max_pending` jobs."""
+
+
+class BoundedWorkerPool:
+    """
+    Thread pool for blocking work (image decode, inference) called from an
+    asyncio server. Admission is bounded: once `max_pending` jobs are running
+    or waiting, `run` fails fast with PoolFullError instead of queueing more,
+    so the server can answer 429 rather than building up latency.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 64):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-worker")
+        self._pending = 0  # only touched from the event loop thread
+
+        logger.info(f"Worker pool started ({max_workers} workers, max {max_pending} pending jobs)")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise PoolFullError(f"{self._pending} jobs pending")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
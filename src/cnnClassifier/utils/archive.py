@@ -0,0 +1,159 @@
+"""
+Zip helpers for dataset ingestion.
+
+A file inside a zip is addressed as "<archive>.zip!<member>" (the same
+notation as Java jar URLs), so code that takes image / CSV paths can read
+the dataset straight out of the archive without extracting it.
+"""
+import io
+import os
+import threading
+import zlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from cnnClassifier.logger.logging import logger
+
+
+ZIP_MEMBER_MARKER = ".zip!"
+
+_local = threading.local()
+
+
+def zip_member_path(zip_path: Path, member: str) -> Path:
+    """path of `member` inside `zip_path`, e.g. data.zip!dataset/train"""
+    return Path(f"{zip_path}!{member}")
+
+
+def split_zip_path(path) -> tuple:
+    """(archive, member) of a zip member path, None for a plain file path"""
+    archive, marker, member = str(path).partition(ZIP_MEMBER_MARKER)
+    if not marker:
+        return None
+    return archive + ".zip", member.replace(os.sep, "/").lstrip("/")
+
+
+def _zipfile(archive: str) -> zipfile.ZipFile:
+    # one open handle per thread and archive; ZipFile reads are not thread-safe
+    handles = getattr(_local, "handles", None)
+    if handles is None:
+        handles = _local.handles = {}
+    handle = handles.get(archive)
+    if handle is None:
+        handle = handles[archive] = zipfile.ZipFile(archive)
+    return handle
+
+
+def read_bytes(path) -> bytes:
+    """contents of a plain file or a zip member path"""
+    location = split_zip_path(path)
+    if location is None:
+        with open(path, "rb") as f:
+            return f.read()
+    archive, member = location
+    return _zipfile(archive).read(member)
+
+
+def open_binary(path):
+    """binary file object of a plain file or a zip member path"""
+    if split_zip_path(path) is None:
+        return open(path, "rb")
+    return io.BytesIO(read_bytes(path))
+
+
+def signature(path) -> str:
+    """cheap change marker: size + mtime of a file, size + CRC of a zip member"""
+    location = split_zip_path(path)
+    if location is None:
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    archive, member = location
+    info = _zipfile(archive).getinfo(member)
+    return f"{info.file_size}:{info.CRC:08x}"
+
+
+def read_file(path):
+    """tf.io.read_file that also reads zip member paths
+
+    Args:
+        path (tf.Tensor): scalar string, file or zip member path
+
+    Returns:
+        tf.Tensor: scalar string with the file contents
+    """
+    import tensorflow as tf
+
+    def _read_member(p):
+        return read_bytes(p.numpy().decode())
+
+    return tf.cond(
+        tf.strings.regex_full_match(path, f".*{ZIP_MEMBER_MARKER.replace('.', '[.]')}.*"),
+        lambda: tf.reshape(tf.py_function(_read_member, [path], tf.string), []),
+        lambda: tf.io.read_file(path),
+    )
+
+
+def _target_path(dest: Path, info: zipfile.ZipInfo) -> Path:
+    # same sanitising as ZipFile.extract: no absolute paths, no ".." escapes
+    parts = [p for p in info.filename.split("/") if p not in ("", ".", "..")]
+    return dest.joinpath(*parts)
+
+
+def _crc32(path: Path) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def _unchanged(target: Path, info: zipfile.ZipInfo) -> bool:
+    try:
+        if target.stat().st_size != info.file_size:
+            return False
+    except FileNotFoundError:
+        return False
+    return _crc32(target) == info.CRC
+
+
+def extract_zip(zip_path: Path, dest: Path, workers: int = 0) -> dict:
+    """extracts `zip_path` into `dest` with parallel workers, skipping members
+    already there with the same size and CRC
+
+    Args:
+        zip_path (Path): archive
+        dest (Path): folder to extract into
+        workers (int, optional): extraction threads, 0 = CPU count
+
+    Returns:
+        dict: number of members extracted and skipped
+    """
+    dest = Path(dest)
+    with zipfile.ZipFile(zip_path) as zf:
+        members = [info for info in zf.infolist() if not info.is_dir()]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(members) or 1))
+    # round-robin, so large and small members spread over the workers
+    chunks = [members[i::workers] for i in range(workers)]
+
+    def _extract(chunk):
+        extracted = skipped = 0
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in chunk:
+                if _unchanged(_target_path(dest, info), info):
+                    skipped += 1
+                else:
+                    zf.extract(info, dest)
+                    extracted += 1
+        return extracted, skipped
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        counts = list(executor.map(_extract, chunks))
+
+    result = {
+        "extracted": sum(c[0] for c in counts),
+        "skipped": sum(c[1] for c in counts),
+    }
+    logger.info(f"Extracted {result['extracted']} members, {result['skipped']} unchanged ({workers} workers)")
+    return result
@@ -0,0 +1,109 @@
+"""
+Random training augmentation on whole batches (AUGMENTATION in params.yaml).
+
+Runs after `.batch()`, so every op works on a (batch, height, width, 3)
+tensor and runs once per batch:
+
+- crop + horizontal flip: one `crop_and_resize` over the batch (a box with
+  x1 > x2 samples the crop mirrored)
+- with ROTATION, crop + flip + rotation instead become one projective
+  transform per image, applied by a single ImageProjectiveTransformV3 call
+  (several times slower than crop_and_resize on CPU)
+- brightness / contrast: one fused multiply-add per pixel
+
+Pixels are in [0, 255], before the backbone preprocessing.
+"""
+import math
+
+import tensorflow as tf
+
+
+def _crop_boxes(batch_size, flip: bool, crop: float):
+    """
+    (batch, 4) normalised [y1, x1, y2, x2] boxes: a random crop of
+    1 - `crop` .. 1 of each side, x1 and x2 swapped for a flip.
+    """
+    size = tf.random.uniform([batch_size, 2], 1.0 - crop, 1.0)
+    start = tf.random.uniform([batch_size, 2]) * (1.0 - size)
+    y1, x1 = start[:, 0], start[:, 1]
+    y2, x2 = y1 + size[:, 0], x1 + size[:, 1]
+    if flip:
+        flipped = tf.random.uniform([batch_size]) < 0.5
+        x1, x2 = tf.where(flipped, x2, x1), tf.where(flipped, x1, x2)
+    return tf.stack([y1, x1, y2, x2], axis=1)
+
+
+def _projective_transforms(batch_size, height, width, flip: bool, crop: float, rotation: float):
+    """
+    (batch, 8) projective transforms mapping output to input pixels: a
+    random rotation of up to `rotation` degrees, a zoom into a crop of
+    1 - `crop` .. 1 of each side at a random position, and a random
+    horizontal flip.
+    """
+    h = tf.cast(height, tf.float32)
+    w = tf.cast(width, tf.float32)
+    cx, cy = (w - 1.0) / 2.0, (h - 1.0) / 2.0
+
+    angle = tf.random.uniform([batch_size], -1.0, 1.0) * (rotation * math.pi / 180.0)
+    scale = tf.random.uniform([batch_size], 1.0 - crop, 1.0)
+    # crop position: anywhere the crop still fits inside the image
+    tx = tf.random.uniform([batch_size], -1.0, 1.0) * (1.0 - scale) * w / 2.0
+    ty = tf.random.uniform([batch_size], -1.0, 1.0) * (1.0 - scale) * h / 2.0
+    sign = tf.ones([batch_size])
+    if flip:
+        sign = tf.where(tf.random.uniform([batch_size]) < 0.5, -1.0, 1.0)
+
+    # input = A @ (output - c) + c + t, with A = flip @ scale @ rotation
+    cos, sin = tf.cos(angle), tf.sin(angle)
+    a00, a01 = sign * scale * cos, -sign * scale * sin
+    a10, a11 = scale * sin, scale * cos
+    b0 = cx + tx - a00 * cx - a01 * cy
+    b1 = cy + ty - a10 * cx - a11 * cy
+
+    zeros = tf.zeros([batch_size])
+    return tf.stack([a00, a01, b0, a10, a11, b1, zeros, zeros], axis=1)
+
+
+def augment_batch(images, params):
+    """random flip / crop / rotation / brightness / contrast of a batch
+
+    Args:
+        images (tf.Tensor): float32 (batch, height, width, 3), values in [0, 255]
+        params (ConfigBox): the AUGMENTATION block of params.yaml
+
+    Returns:
+        tf.Tensor: augmented images, same shape, clipped to [0, 255]
+    """
+    shape = tf.shape(images)
+    batch_size, height, width = shape[0], shape[1], shape[2]
+
+    if params.ROTATION:
+        transforms = _projective_transforms(
+            batch_size, height, width, params.FLIP, float(params.CROP), float(params.ROTATION)
+        )
+        images = tf.raw_ops.ImageProjectiveTransformV3(
+            images=images,
+            transforms=transforms,
+            output_shape=shape[1:3],
+            fill_value=0.0,
+            interpolation="BILINEAR",
+            fill_mode="REFLECT",  # no black corners after a rotation
+        )
+    elif params.FLIP or params.CROP:
+        images = tf.image.crop_and_resize(
+            images,
+            _crop_boxes(batch_size, params.FLIP, float(params.CROP)),
+            box_indices=tf.range(batch_size),
+            crop_size=shape[1:3],
+        )
+
+    if params.BRIGHTNESS or params.CONTRAST:
+        # (x - mean) * factor + mean + delta, as one multiply-add
+        factor = tf.random.uniform([batch_size, 1, 1, 1], 1.0 - params.CONTRAST, 1.0 + params.CONTRAST)
+        delta = tf.random.uniform([batch_size, 1, 1, 1], -params.BRIGHTNESS, params.BRIGHTNESS) * 255.0
+        offset = delta
+        if params.CONTRAST:
+            offset += tf.reduce_mean(images, axis=[1, 2], keepdims=True) * (1.0 - factor)
+        images = images * factor + offset
+
+    return tf.clip_by_value(images, 0.0, 255.0)
@@ -0,0 +1,99 @@
+import re
+
+import numpy as np
+
+
+# backbone name -> (keras.applications constructor, preprocessing mode)
+BACKBONES = {
+    "vgg16": ("VGG16", "caffe"),
+    "resnet50": ("ResNet50", "caffe"),
+    "mobilenet_v2": ("MobileNetV2", "tf"),
+    "mobilenet_v3_small": ("MobileNetV3Small", "none"),
+    "mobilenet_v3_large": ("MobileNetV3Large", "none"),
+    "efficientnet_b0": ("EfficientNetB0", "none"),
+}
+
+# backbone name -> regex whose first group is the block a layer belongs to
+BLOCK_PATTERNS = {
+    "vgg16": r"^(block\d+)_",
+    "resnet50": r"^(conv\d+_block\d+)_",
+    "mobilenet_v2": r"^(expanded_conv|block_\d+)_",
+    "mobilenet_v3_small": r"^(expanded_conv(?:_\d+)?)/",
+    "mobilenet_v3_large": r"^(expanded_conv(?:_\d+)?)/",
+    "efficientnet_b0": r"^(block\d+[a-z])_",
+}
+
+# models trained before the backbone was configurable used plain x / 255
+LEGACY_PREPROCESSING = "rescale"
+
+_CAFFE_MEAN_BGR = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+
+def get_backbone(name: str):
+    """returns the keras.applications constructor of a backbone"""
+    if name not in BACKBONES:
+        raise ValueError(f"Unknown BACKBONE '{name}', expected one of {list(BACKBONES)}")
+
+    from tensorflow import keras
+
+    return getattr(keras.applications, BACKBONES[name][0])
+
+
+def layer_blocks(layer_names: list, name: str) -> list:
+    """block of every backbone layer, in model order
+
+    Layers that match no block pattern (activations, the final 1x1 conv)
+    belong to the block before them; stem layers before the first block
+    get None.
+
+    Args:
+        layer_names (list): names of the backbone's layers, input to output
+        name (str): backbone name
+
+    Returns:
+        list: block name (or None) per layer
+    """
+    if name not in BLOCK_PATTERNS:
+        raise ValueError(f"Unknown BACKBONE '{name}', expected one of {list(BLOCK_PATTERNS)}")
+
+    pattern = re.compile(BLOCK_PATTERNS[name])
+    blocks, current = [], None
+    for layer_name in layer_names:
+        match = pattern.match(layer_name)
+        if match:
+            current = match.group(1)
+        blocks.append(current)
+    return blocks
+
+
+def get_preprocessing(name: str) -> str:
+    """preprocessing mode matching the ImageNet weights of a backbone"""
+    if name not in BACKBONES:
+        raise ValueError(f"Unknown BACKBONE '{name}', expected one of {list(BACKBONES)}")
+    return BACKBONES[name][1]
+
+
+def preprocess_image(x, mode: str):
+    """maps RGB pixels in [0, 255] to the input range of the backbone
+
+    Only uses slicing and arithmetic, so the same function runs on numpy
+    arrays (serving) and tf tensors (training).
+
+    Args:
+        x: float image(s), channels last
+        mode (str): 'caffe', 'tf', 'none' or 'rescale'
+
+    Returns:
+        preprocessed image(s), same type as `x`
+    """
+    if mode == "caffe":
+        # RGB -> BGR, zero-centred on the ImageNet mean, no scaling
+        return x[..., ::-1] - _CAFFE_MEAN_BGR
+    if mode == "tf":
+        return x / 127.5 - 1.0
+    if mode == "rescale":
+        return x / 255.0
+    if mode == "none":
+        # the model rescales internally (EfficientNet, MobileNetV3)
+        return x
+    raise ValueError(f"Unknown preprocessing mode: {mode}")
@@ -2,14 +2,56 @@ import os
 import yaml
 from cnnClassifier.logger.logging import logger
 import json
-import joblib
-from ensure import ensure_annotations
+import hashlib
+import functools
+import tempfile
+import inspect
 from box import ConfigBox
 from pathlib import Path
 from typing import Any
-import base64
 from box.exceptions import BoxValueError
 
+# joblib and base64 are imported where they are used: this module is loaded
+# by every entry point, including the web app, and should import fast.
+
+
+def ensure_annotations(func):
+    """checks call arguments and the return value against plain-class annotations
+
+    Lightweight stand-in for `ensure.ensure_annotations`: typing constructs
+    such as `Any` are not checked.
+
+    Raises:
+        TypeError: if an argument or the return value has the wrong type
+    """
+    def _checkable(annotation):
+        return isinstance(annotation, type) and annotation is not inspect.Parameter.empty
+
+    signature = inspect.signature(func)
+    checked = {
+        name: param.annotation
+        for name, param in signature.parameters.items()
+        if _checkable(param.annotation)
+    }
+    returns = signature.return_annotation if _checkable(signature.return_annotation) else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for name, value in signature.bind(*args, **kwargs).arguments.items():
+            if name in checked and not isinstance(value, checked[name]):
+                raise TypeError(
+                    f"Argument {name} of {func.__name__} must be {checked[name].__name__}, "
+                    f"got {type(value).__name__}"
+                )
+        result = func(*args, **kwargs)
+        if returns is not None and not isinstance(result, returns):
+            raise TypeError(
+                f"Return value of {func.__name__} must be {returns.__name__}, got {type(result).__name__}"
+            )
+        return result
+
+    return wrapper
+
 
 
 @ensure_annotations
@@ -93,6 +135,8 @@ def save_bin(data: Any, path: Path):
         data (Any): data to be saved as binary
         path (Path): path to binary file
     """
+    import joblib
+
     joblib.dump(value=data, filename=path)
     logger.info(f"binary file saved at: {path}")
 
@@ -107,6 +151,8 @@ def load_bin(path: Path) -> Any:
     Returns:
         Any: object stored in the file
     """
+    import joblib
+
     data = joblib.load(path)
     logger.info(f"binary file loaded from: {path}")
     return data
@@ -125,7 +171,42 @@ def get_size(path: Path) -> str:
     return f"~ {size_in_kb} KB"
 
 
+@ensure_annotations
+def save_content_addressed(data: bytes, directory: Path, suffix: str = ".jpg") -> Path:
+    """save bytes under a name derived from their sha256
+
+    Identical uploads map to the same file, so concurrent requests never
+    overwrite each other and repeated uploads are written only once.
+
+    Args:
+        data (bytes): file content
+        directory (Path): target directory
+        suffix (str, optional): file extension. Defaults to ".jpg".
+
+    Returns:
+        Path: path of the stored file
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = Path(directory) / f"{digest}{suffix}"
+
+    if not path.exists():
+        os.makedirs(directory, exist_ok=True)
+        # unique per call: threads of one process may save the same upload at once
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{digest}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    return path
+
+
 def decodeImage(imgstring, fileName):
+    import base64
+
     imgdata = base64.b64decode(imgstring)
     with open(fileName, 'wb') as f:
         f.write(imgdata)
@@ -133,5 +214,7 @@ def decodeImage(imgstring, fileName):
 
 
 def encodeImageIntoBase64(croppedImagePath):
+    import base64
+
     with open(croppedImagePath, "rb") as f:
         return base64.b64encode(f.read())
\ No newline at end of file
@@ -0,0 +1,89 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import tensorflow as tf
+
+from cnnClassifier.logger.logging import logger
+from cnnClassifier.utils.archive import open_binary, zip_member_path
+from cnnClassifier.utils.preprocessing import decode_and_resize, normalize_image
+
+
+# label column names from the dataset CSV header
+LABEL_COLUMNS = [
+    "Acne",
+    "Blackheads",
+    "Dark Spots",
+    "Dry Skin",
+    "Eye bags",
+    "Normal Skin",
+    "Oily Skin",
+    "Pores",
+    "Skin Redness",
+    "Wrinkles",
+]
+
+DATASET_SUBDIR = "skin_problems_dataset_multilabel"  # folder created after unzip
+CLASSES_CSV_NAME = "_classes.csv"
+SPLITS = ("train", "valid", "test")
+
+
+def dataset_root(data_ingestion_artifact) -> Path:
+    """folder holding the splits: extracted, or inside the zip (INGESTION.MODE zip)
+
+    Args:
+        data_ingestion_artifact (DataIngestionArtifact): output of data ingestion
+
+    Returns:
+        Path: dataset folder, or a zip member path like data.zip!skin_problems_dataset_multilabel
+    """
+    if data_ingestion_artifact.read_from_zip:
+        return zip_member_path(data_ingestion_artifact.zip_file_path, DATASET_SUBDIR)
+    return Path(data_ingestion_artifact.unzip_dir) / DATASET_SUBDIR
+
+
+def load_split_df(dataset_root: Path, split: str, csv_name: str = CLASSES_CSV_NAME) -> pd.DataFrame:
+    """reads the labels CSV of one split
+
+    Args:
+        dataset_root (Path): folder holding the train / valid / test splits (may be inside a zip)
+        split (str): 'train', 'valid' or 'test'
+        csv_name (str, optional): labels file inside the split folder
+
+    Raises:
+        ValueError: if the filename or a label column is missing
+
+    Returns:
+        pd.DataFrame: CSV rows plus a `filepath` column with full image paths
+    """
+    csv_path = Path(dataset_root) / split / csv_name
+    logger.info(f"Reading {split} CSV from: {csv_path}")
+    with open_binary(csv_path) as f:
+        df = pd.read_csv(f)
+
+    df.columns = df.columns.str.strip()
+
+    # ensure filename column + labels exist
+    missing = [c for c in LABEL_COLUMNS + ["filename"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in {split} CSV: {missing}")
+
+    # build full image paths
+    img_dir = Path(dataset_root) / split
+    df["filepath"] = df["filename"].apply(lambda fn: os.path.join(img_dir, fn))
+
+    return df
+
+
+def make_image_dataset(
+    df: pd.DataFrame, image_size: tuple, batch_size: int, preprocessing: str
+) -> tf.data.Dataset:
+    """unshuffled (image, label) batches of a split, preprocessed like training"""
+    labels = df[LABEL_COLUMNS].values.astype("float32")
+
+    def _process(path, label):
+        return normalize_image(decode_and_resize(path, image_size), preprocessing), label
+
+    ds = tf.data.Dataset.from_tensor_slices((df["filepath"].tolist(), labels))
+    ds = ds.map(_process, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
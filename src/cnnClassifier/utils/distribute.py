@@ -0,0 +1,174 @@
+"""
+Multi-worker data-parallel training (DISTRIBUTE in params.yaml).
+
+Every worker process runs the same training pipeline; the cluster comes
+from the TF_CONFIG environment variable, e.g. for worker 1 of 2:
+
+    {"cluster": {"worker": ["host-a:23456", "host-b:23456"]},
+     "task": {"type": "worker", "index": 1}}
+
+Worker 0 (or the "chief" task, if the cluster has one) is the chief: it
+writes the trained model and runs the stages after training.
+`local_tf_config` builds the TF_CONFIG of N workers on this machine.
+"""
+import contextlib
+import json
+import os
+import socket
+
+from cnnClassifier.logger.logging import logger
+
+
+STRATEGIES = ("none", "multi_worker")
+
+_strategy = None
+
+
+def tf_config() -> dict:
+    """parsed TF_CONFIG, {} when it is not set"""
+    return json.loads(os.environ.get("TF_CONFIG") or "{}")
+
+
+def num_workers() -> int:
+    """worker processes in the cluster, chief included (1 without TF_CONFIG)"""
+    cluster = tf_config().get("cluster", {})
+    return max(1, len(cluster.get("chief", [])) + len(cluster.get("worker", [])))
+
+
+def worker_index() -> int:
+    """position of this process among all workers, the chief is 0"""
+    config = tf_config()
+    task = config.get("task", {})
+    if task.get("type", "worker") == "chief":
+        return 0
+    # with a separate chief task, worker i is the (i+1)-th worker
+    return int(task.get("index", 0)) + len(config.get("cluster", {}).get("chief", []))
+
+
+def is_chief() -> bool:
+    return worker_index() == 0
+
+
+def get_strategy(name: str):
+    """
+    The tf.distribute strategy for DISTRIBUTE.STRATEGY, created once per
+    process. MultiWorkerMirroredStrategy must be created before TensorFlow
+    runs its first op, so call this at program start.
+    """
+    global _strategy
+    if _strategy is not None:
+        return _strategy
+
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown DISTRIBUTE.STRATEGY '{name}', expected one of {STRATEGIES}")
+
+    import tensorflow as tf
+
+    if name == "multi_worker":
+        if not os.environ.get("TF_CONFIG"):
+            logger.info("DISTRIBUTE.STRATEGY is multi_worker but TF_CONFIG is not set, training on one worker")
+        _strategy = tf.distribute.MultiWorkerMirroredStrategy()
+        logger.info(
+            f"MultiWorkerMirroredStrategy: worker {worker_index()} of {num_workers()}, "
+            f"{_strategy.num_replicas_in_sync} replicas in sync"
+        )
+    else:
+        _strategy = tf.distribute.get_strategy()
+    return _strategy
+
+
+def is_distributed() -> bool:
+    """
+    True once a MultiWorkerMirroredStrategy over several workers has been
+    created in this process (not with STRATEGY none, whatever TF_CONFIG says)
+    """
+    if _strategy is None or num_workers() <= 1:
+        return False
+    import tensorflow as tf
+
+    return isinstance(_strategy, tf.distribute.MultiWorkerMirroredStrategy)
+
+
+def broadcast_from_chief(strategy, arrays: list) -> list:
+    """
+    The chief's `arrays` on every worker, e.g. model weights: each worker
+    may have built its own random initialisation, and MultiWorkerMirroredStrategy
+    does not sync values assigned outside a replica step. One all-reduce in
+    which only the chief contributes non-zeros.
+
+    Args:
+        strategy: the MultiWorkerMirroredStrategy of this process
+        arrays (list): numpy arrays, the same shapes on every worker
+
+    Returns:
+        list: the chief's arrays, in their original dtypes
+    """
+    import numpy as np
+    import tensorflow as tf
+
+    flat = np.concatenate([np.ravel(a).astype(np.float32) for a in arrays] or [np.zeros(0, np.float32)])
+    if not is_chief():
+        flat[:] = 0.0
+    summed = strategy.reduce(
+        tf.distribute.ReduceOp.SUM, strategy.run(lambda: tf.constant(flat)), axis=None
+    ).numpy()
+
+    result, offset = [], 0
+    for a in arrays:
+        size = np.size(a)
+        result.append(summed[offset:offset + size].reshape(np.shape(a)).astype(np.asarray(a).dtype))
+        offset += size
+    return result
+
+
+def free_ports(count: int) -> list:
+    """`count` TCP ports that are free on localhost right now"""
+    sockets = []
+    try:
+        for _ in range(count):
+            s = socket.socket()
+            s.bind(("localhost", 0))
+            sockets.append(s)
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def local_tf_config(workers: int, index: int, ports: list) -> dict:
+    """TF_CONFIG of worker `index` in a cluster of `workers` processes on localhost
+
+    Args:
+        workers (int): cluster size
+        index (int): this worker, 0 is the chief
+        ports (list): one port per worker, the same list for every worker
+
+    Returns:
+        dict: TF_CONFIG, to be set as JSON in the worker's environment
+    """
+    return {
+        "cluster": {"worker": [f"localhost:{port}" for port in ports[:workers]]},
+        "task": {"type": "worker", "index": index},
+    }
+
+
+@contextlib.contextmanager
+def host_lock(path):
+    """
+    Exclusive lock on `path` held by one process of this machine at a time,
+    so workers sharing a filesystem do not run the same stage concurrently.
+    No-op where fcntl is unavailable.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
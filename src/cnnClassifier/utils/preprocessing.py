@@ -0,0 +1,213 @@
+"""
+Image decode + resize shared by training (tf.data) and serving (numpy).
+
+Both paths decode JPEGs at a reduced DCT scale when the source is much
+larger than the model input, then resize with half-pixel bilinear
+interpolation (what `tf.image.resize` does), so a served image goes through
+the same pixels as a training image. The serving path needs no TensorFlow.
+"""
+import io
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from cnnClassifier.utils.archive import read_file
+from cnnClassifier.utils.backbones import preprocess_image
+
+
+# libjpeg can decode directly at 1/2, 1/4 or 1/8 of the full size
+DRAFT_RATIOS = (8, 4, 2)
+# keep at least this many decoded pixels per output pixel before resizing
+DRAFT_OVERSAMPLE = 2
+# bump whenever decode_and_resize gives different pixels: it is part of the
+# keys of everything that stores them (shards, dataset cache)
+DECODE_VERSION = 2
+
+
+class ImageDecodeError(ValueError):
+    """the input is not an image PIL can decode (a client error, not a server fault)"""
+
+
+def draft_ratio(height: int, width: int, image_size: tuple) -> int:
+    """largest JPEG DCT scale-down that keeps the image DRAFT_OVERSAMPLE x the target
+
+    Args:
+        height (int): source height
+        width (int): source width
+        image_size (tuple): target (height, width)
+
+    Returns:
+        int: 1, 2, 4 or 8
+    """
+    for ratio in DRAFT_RATIOS:
+        if (
+            height // ratio >= DRAFT_OVERSAMPLE * image_size[0]
+            and width // ratio >= DRAFT_OVERSAMPLE * image_size[1]
+        ):
+            return ratio
+    return 1
+
+
+def decode_and_resize(path, image_size: tuple):
+    """reads one JPEG and resizes it (bilinear), values stay in [0, 255]
+
+    tf.data version of `load_image`, used by training, sharding and evaluation.
+
+    Args:
+        path (tf.Tensor): image file path, or a zip member path (data.zip!member)
+        image_size (tuple): target (height, width)
+
+    Returns:
+        tf.Tensor: float32 (height, width, 3)
+    """
+    import tensorflow as tf
+
+    data = read_file(path)
+    shape = tf.image.extract_jpeg_shape(data)
+
+    # same choice as draft_ratio(), as a branch index into [1] + DRAFT_RATIOS[::-1]
+    index = tf.add_n([
+        tf.cast(
+            tf.logical_and(
+                shape[0] // ratio >= DRAFT_OVERSAMPLE * image_size[0],
+                shape[1] // ratio >= DRAFT_OVERSAMPLE * image_size[1],
+            ),
+            tf.int32,
+        )
+        for ratio in DRAFT_RATIOS
+    ])
+    img = tf.switch_case(
+        index,
+        [
+            # INTEGER_ACCURATE is libjpeg's default IDCT, the one PIL decodes with
+            lambda r=ratio: tf.image.decode_jpeg(data, channels=3, ratio=r, dct_method="INTEGER_ACCURATE")
+            for ratio in (1,) + DRAFT_RATIOS[::-1]
+        ],
+    )
+    img.set_shape([None, None, 3])
+    return tf.image.resize(img, image_size)
+
+
+def normalize_image(img, preprocessing: str):
+    """maps [0, 255] pixels to what the backbone expects"""
+    return preprocess_image(img, preprocessing)
+
+
+def _interpolation(in_size: int, out_size: int):
+    """source indices + weights of half-pixel bilinear sampling along one axis"""
+    scale = np.float32(in_size) / np.float32(out_size)
+    x = (np.arange(out_size, dtype=np.float32) + np.float32(0.5)) * scale - np.float32(0.5)
+    x_floor = np.floor(x)
+    lower = np.maximum(x_floor, 0).astype(np.intp)
+    upper = np.minimum(np.ceil(x), in_size - 1).astype(np.intp)
+    return lower, upper, (x - x_floor).astype(np.float32)
+
+
+def resize_bilinear(img: np.ndarray, image_size: tuple, out: np.ndarray = None) -> np.ndarray:
+    """numpy equivalent of `tf.image.resize(img, image_size)` (bilinear, no antialias)
+
+    Only the source rows that are sampled get converted to float32, so a
+    large uint8 image is never copied as a whole.
+
+    Args:
+        img (np.ndarray): (H, W, C) image, any dtype
+        image_size (tuple): target (height, width)
+        out (np.ndarray, optional): float32 (height, width, C) buffer to write into
+
+    Returns:
+        np.ndarray: float32 (height, width, C)
+    """
+    y_lo, y_hi, y_lerp = _interpolation(img.shape[0], image_size[0])
+    x_lo, x_hi, x_lerp = _interpolation(img.shape[1], image_size[1])
+    x_lerp = x_lerp[None, :, None]
+
+    def _rows(index):
+        rows = img[index].astype(np.float32)
+        left = rows[:, x_lo]
+        return left + (rows[:, x_hi] - left) * x_lerp
+
+    top = _rows(y_lo)
+    bottom = _rows(y_hi)
+
+    if out is None:
+        out = np.empty((*image_size, img.shape[2]), dtype=np.float32)
+    np.multiply(bottom - top, y_lerp[:, None, None], out=out)
+    out += top
+    return out
+
+
+def decode_image(image, image_size: tuple) -> np.ndarray:
+    """decodes an image to RGB, at a reduced JPEG scale when it is much larger than `image_size`
+
+    Args:
+        image: path, encoded bytes, binary file-like object or image array
+        image_size (tuple): size the image will be resized to
+
+    Returns:
+        np.ndarray: (H, W, 3) array, uint8 unless an (H, W, 3) array was passed in
+
+    Raises:
+        ImageDecodeError: if the data is not a decodable image
+    """
+    if isinstance(image, np.ndarray):
+        if image.ndim == 3 and image.shape[2] == 3:
+            return image
+        # grayscale, RGBA, ...
+        return np.asarray(Image.fromarray(image).convert("RGB"))
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = io.BytesIO(image)
+    elif isinstance(image, Path):
+        image = str(image)
+
+    try:
+        img = Image.open(image)
+        if img.format == "JPEG":
+            width, height = img.size
+            ratio = draft_ratio(height, width, image_size)
+            if ratio > 1:
+                img.draft("RGB", (width // ratio, height // ratio))
+        return np.asarray(img.convert("RGB"))
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+        # PIL reports unknown / truncated data as OSError without an errno;
+        # missing files, permissions etc. are not decode errors
+        if isinstance(e, OSError) and e.errno is not None:
+            raise
+        raise ImageDecodeError(f"cannot decode image: {e}") from e
+
+
+def load_image(image, image_size: tuple, preprocessing: str, out: np.ndarray = None) -> np.ndarray:
+    """decode + resize + backbone preprocessing of one image, like training
+
+    Args:
+        image: path, encoded bytes, binary file-like object or RGB array
+        image_size (tuple): target (height, width)
+        preprocessing (str): backbone preprocessing mode
+        out (np.ndarray, optional): float32 (height, width, 3) buffer, e.g. a row of a batch
+
+    Returns:
+        np.ndarray: float32 (height, width, 3)
+    """
+    out = resize_bilinear(decode_image(image, image_size), image_size, out=out)
+    out[...] = preprocess_image(out, preprocessing)
+    return out
+
+
+def load_batch(images, image_size: tuple, preprocessing: str, out: np.ndarray = None) -> np.ndarray:
+    """`load_image` for several images, written into one float32 batch
+
+    Args:
+        images: sequence of inputs accepted by `load_image`
+        image_size (tuple): target (height, width)
+        preprocessing (str): backbone preprocessing mode
+        out (np.ndarray, optional): preallocated (N >= len(images), height, width, 3) buffer
+
+    Returns:
+        np.ndarray: the first len(images) rows of the batch
+    """
+    images = list(images)
+    if out is None:
+        out = np.empty((len(images), *image_size, 3), dtype=np.float32)
+    for i, image in enumerate(images):
+        load_image(image, image_size, preprocessing, out=out[i])
+    return out[:len(images)]
@@ -0,0 +1,158 @@
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cnnClassifier.logger.logging import logger
+
+
+def _read_peak_rss_mb():
+    """peak RSS since the last reset (Linux), else since process start"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _reset_peak_rss() -> bool:
+    """restarts the VmHWM high-water mark, so a stage sees its own peak (Linux >= 4.0)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class RunProfiler:
+    """
+    Wall time, CPU time and peak RSS of nested pipeline stages, plus any
+    metrics a stage records, saved as one JSON run report.
+
+    Components do not get a profiler passed in: they call the module-level
+    `stage()` / `record()`, which are no-ops unless a run is active.
+    """
+
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self.stages = []
+        self.metrics = {}
+        self._stack = []
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self.per_stage_peak_rss = _reset_peak_rss()
+        self._run_peak = 0.0
+
+    @contextmanager
+    def stage(self, name: str):
+        entry = {
+            "name": name,
+            "status": "running",
+            "wall_seconds": None,
+            "cpu_seconds": None,
+            "peak_rss_mb": None,
+            "metrics": {},
+            "stages": [],
+        }
+        parent = self._stack[-1] if self._stack else None
+        (parent["entry"]["stages"] if parent else self.stages).append(entry)
+
+        # keep the parent's peak before restarting the high-water mark
+        if parent is not None:
+            parent["peak"] = max(parent["peak"], _read_peak_rss_mb())
+        self._run_peak = max(self._run_peak, _read_peak_rss_mb())
+        _reset_peak_rss()
+
+        frame = {"entry": entry, "peak": 0.0}
+        self._stack.append(frame)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield entry
+            entry["status"] = "completed"
+        except BaseException:
+            entry["status"] = "failed"
+            raise
+        finally:
+            self._stack.pop()
+            peak = max(frame["peak"], _read_peak_rss_mb())
+            entry["wall_seconds"] = round(time.perf_counter() - start, 3)
+            entry["cpu_seconds"] = round(time.process_time() - cpu_start, 3)
+            entry["peak_rss_mb"] = round(peak, 1)
+            if parent is not None:
+                parent["peak"] = max(parent["peak"], peak)
+            self._run_peak = max(self._run_peak, peak)
+
+            path = "/".join([f["entry"]["name"] for f in self._stack] + [name])
+            logger.info(
+                f"[profile] {path}: {entry['wall_seconds']:.2f}s wall, "
+                f"{entry['cpu_seconds']:.2f}s cpu, peak RSS {entry['peak_rss_mb']:.0f} MB"
+            )
+
+    def record(self, key: str, value):
+        """attaches a JSON-serialisable metric to the innermost running stage"""
+        target = self._stack[-1]["entry"]["metrics"] if self._stack else self.metrics
+        target[key] = value
+
+    def report(self, status: str) -> dict:
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": status,
+            "wall_seconds": round(time.perf_counter() - self._start, 3),
+            "cpu_seconds": round(time.process_time() - self._cpu_start, 3),
+            "peak_rss_mb": round(max(self._run_peak, _read_peak_rss_mb()), 1),
+            "peak_rss_scope": "stage" if self.per_stage_peak_rss else "process",
+            "host": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "metrics": self.metrics,
+            "stages": self.stages,
+        }
+
+    def save(self, path: Path, status: str) -> dict:
+        report = self.report(status)
+        path = Path(path)
+        os.makedirs(path.parent, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=4, default=str)
+        logger.info(f"Run report saved at: {path}")
+        return report
+
+
+_active = None
+
+
+def start_run() -> RunProfiler:
+    """makes a new RunProfiler the one `stage()` / `record()` report to"""
+    global _active
+    _active = RunProfiler()
+    return _active
+
+
+def end_run():
+    global _active
+    _active = None
+
+
+def stage(name: str):
+    """times a (nested) stage of the active run; no-op without one"""
+    return _active.stage(name) if _active is not None else nullcontext()
+
+
+def record(key: str, value):
+    """attaches a metric to the current stage of the active run; no-op without one"""
+    if _active is not None:
+        _active.record(key, value)
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+from dataclasses import MISSING, asdict, fields, is_dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cnnClassifier.logger.logging import logger
+
+
+def _canonical(value) -> str:
+    """stable JSON text of configs / params / plain values"""
+    if is_dataclass(value):
+        value = asdict(value)
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _artifact_paths(artifact) -> list:
+    """Path fields of an artifact dataclass that are set"""
+    return [
+        getattr(artifact, f.name)
+        for f in fields(artifact)
+        if f.type is Path and getattr(artifact, f.name) is not None
+    ]
+
+
+class RunManifest:
+    """
+    Fingerprint of the last successful run of every pipeline stage, saved
+    as JSON. A stage whose fingerprint (config, params and input artifact
+    hashes) is unchanged and whose outputs are still as it left them is
+    skipped, and its recorded artifact is reused.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._data = {"stages": {}, "digests": {}}
+        if self.path.exists():
+            with open(self.path) as f:
+                self._data.update(json.load(f))
+
+    def _file_digest(self, path: Path, stat: os.stat_result) -> str:
+        # content hash, recomputed only when size or mtime change
+        key = str(path)
+        cached = self._data["digests"].get(key)
+        if cached is not None and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self._data["digests"][key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": h.hexdigest(),
+        }
+        return h.hexdigest()
+
+    def digest(self, path: Path) -> str:
+        """
+        sha256 of a file's content; for a directory, of every file's
+        relative path, size and mtime. None when the path does not exist.
+        """
+        path = Path(path)
+        if path.is_file():
+            return self._file_digest(path, path.stat())
+        if not path.is_dir():
+            return None
+
+        h = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = Path(root) / name
+                stat = file_path.stat()
+                h.update(f"{file_path.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return h.hexdigest()
+
+    def fingerprint(self, *values, inputs=()) -> str:
+        """
+        Hash of config / params `values` plus the content of every Path
+        field of the upstream artifacts in `inputs`.
+        """
+        h = hashlib.sha256()
+        for value in values:
+            h.update(_canonical(value).encode())
+        for artifact in inputs:
+            if artifact is None:
+                continue
+            for path in _artifact_paths(artifact):
+                h.update(f"{path}={self.digest(path)};".encode())
+        return h.hexdigest()
+
+    def lookup(self, stage: str, fingerprint: str, artifact_cls):
+        """
+        The artifact recorded for `stage` if its fingerprint matches and its
+        outputs are unchanged, else None.
+        """
+        entry = self._data["stages"].get(stage)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        for path, digest in entry["outputs"].items():
+            if self.digest(path) != digest:
+                logger.info(f"{stage}: output changed since the last run: {path}")
+                return None
+
+        values = {f.name: entry["artifact"].get(f.name, f.default) for f in fields(artifact_cls)}
+        if any(value is MISSING for value in values.values()):
+            return None  # recorded before the artifact gained a field
+        return artifact_cls(**{
+            f.name: Path(values[f.name]) if f.type is Path and values[f.name] is not None else values[f.name]
+            for f in fields(artifact_cls)
+        })
+
+    def record(self, stage: str, fingerprint: str, artifact):
+        """stores a completed stage and saves the manifest"""
+        self._data["stages"][stage] = {
+            "fingerprint": fingerprint,
+            "completed": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "artifact": json.loads(_canonical(artifact)),
+            "outputs": {str(path): self.digest(path) for path in _artifact_paths(artifact)},
+        }
+        self.save()
+
+    def invalidate(self, stage: str):
+        if self._data["stages"].pop(stage, None) is not None:
+            self.save()
+
+    def save(self):
+        os.makedirs(self.path.parent, exist_ok=True)
+        # write-then-rename, an interrupted save keeps the previous manifest
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f, indent=4)
+        os.replace(tmp_path, self.path)
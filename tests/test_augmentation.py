@@ -0,0 +1,69 @@
+"""augment_batch output shapes, value range and flips."""
+import numpy as np
+import pytest
+import tensorflow as tf
+from box import ConfigBox
+
+from cnnClassifier.utils.augmentation import augment_batch
+
+OFF = {"FLIP": False, "CROP": 0, "ROTATION": 0, "BRIGHTNESS": 0, "CONTRAST": 0}
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    tf.random.set_seed(0)
+
+
+def _params(**overrides) -> ConfigBox:
+    return ConfigBox({"ENABLED": True, **OFF, **overrides})
+
+
+def _images(batch: int = 4, height: int = 12, width: int = 16) -> tf.Tensor:
+    rng = np.random.default_rng(0)
+    return tf.constant(rng.uniform(0, 255, (batch, height, width, 3)).astype(np.float32))
+
+
+@pytest.mark.parametrize("overrides", [
+    {"FLIP": True, "CROP": 0.1},
+    {"FLIP": True, "CROP": 0.2, "ROTATION": 15},
+    {"BRIGHTNESS": 0.5, "CONTRAST": 0.5},
+    {"FLIP": True, "CROP": 0.1, "ROTATION": 10, "BRIGHTNESS": 0.1, "CONTRAST": 0.1},
+])
+def test_shape_dtype_and_range(overrides):
+    images = _images()
+    out = augment_batch(images, _params(**overrides))
+
+    assert out.shape == images.shape
+    assert out.dtype == tf.float32
+    values = out.numpy()
+    assert values.min() >= 0.0 and values.max() <= 255.0
+    assert not np.allclose(values, images.numpy())
+
+
+def test_brightness_is_clipped():
+    white = tf.fill([64, 4, 4, 3], 250.0)
+    out = augment_batch(white, _params(BRIGHTNESS=0.5)).numpy()
+    assert out.max() <= 255.0
+    assert (out == 255.0).any()
+
+
+def test_everything_off_is_identity():
+    images = _images()
+    np.testing.assert_array_equal(augment_batch(images, _params()).numpy(), images.numpy())
+
+
+def test_flip_only_mirrors_or_keeps():
+    images = _images(batch=16).numpy()
+    out = augment_batch(tf.constant(images), _params(FLIP=True)).numpy()
+
+    flipped = [np.allclose(o, i[:, ::-1], atol=1e-3) for o, i in zip(out, images)]
+    kept = [np.allclose(o, i, atol=1e-3) for o, i in zip(out, images)]
+    assert all(f or k for f, k in zip(flipped, kept))
+    assert any(flipped) and any(kept)
+
+
+def test_in_dataset_with_partial_batch():
+    params = _params(FLIP=True, CROP=0.1, BRIGHTNESS=0.1, CONTRAST=0.1)
+    dataset = tf.data.Dataset.from_tensor_slices(_images(batch=5)).batch(2).map(lambda x: augment_batch(x, params))
+
+    assert [tuple(b.shape) for b in dataset] == [(2, 12, 16, 3), (2, 12, 16, 3), (1, 12, 16, 3)]
@@ -0,0 +1,126 @@
+"""MicroBatchScheduler batching, padding, failure and shutdown."""
+import threading
+
+import numpy as np
+import pytest
+
+from cnnClassifier.pipeline.batching import MicroBatchScheduler, QueueFullError
+
+TIMEOUT = 10
+
+
+def _image(value: float) -> np.ndarray:
+    return np.full((2, 2, 3), value, dtype=np.float32)
+
+
+class BlockingModel:
+    """predict_fn that records its batches and blocks until `release` is set"""
+
+    def __init__(self, block: bool = False):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self, batch):
+        self.batches.append(batch.copy())
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        # one output row per image: its value
+        return batch[:, 0, 0, :1] * 10
+
+
+@pytest.fixture
+def schedulers():
+    created = []
+
+    def _make(predict_fn, **kwargs):
+        scheduler = MicroBatchScheduler(predict_fn, **kwargs)
+        created.append(scheduler)
+        return scheduler
+
+    yield _make
+    for scheduler in created:
+        scheduler.stop()
+
+
+def test_batch_padded_to_power_of_two(schedulers):
+    model = BlockingModel()
+    scheduler = schedulers(model, max_batch_size=8, max_wait_ms=500)
+
+    futures = [scheduler.submit(_image(i)) for i in (1, 2, 3)]
+
+    assert [f.result(TIMEOUT)[0] for f in futures] == [10, 20, 30]
+    assert len(model.batches) == 1
+    batch = model.batches[0]
+    assert batch.shape == (4, 2, 2, 3)
+    assert not batch[3].any()  # the padding row
+    assert scheduler.stats()["batch_size_histogram"] == {3: 1}
+
+
+def test_padding_capped_at_max_batch_size(schedulers):
+    model = BlockingModel()
+    scheduler = schedulers(model, max_batch_size=6, max_wait_ms=500)
+
+    futures = [scheduler.submit(_image(i)) for i in range(5)]
+
+    assert [f.result(TIMEOUT)[0] for f in futures] == [0, 10, 20, 30, 40]
+    assert [b.shape[0] for b in model.batches] == [6]
+
+
+def test_inference_error_fails_the_whole_batch(schedulers):
+    def predict_fn(batch):
+        raise ValueError("broken model")
+
+    scheduler = schedulers(predict_fn, max_batch_size=4, max_wait_ms=200)
+    futures = [scheduler.submit(_image(1)) for _ in range(2)]
+
+    for future in futures:
+        with pytest.raises(ValueError, match="broken model"):
+            future.result(TIMEOUT)
+
+    # the worker survives and serves the next batch
+    scheduler.predict_fn = BlockingModel()
+    assert scheduler.submit(_image(2)).result(TIMEOUT)[0] == 20
+
+
+def test_full_queue_fails_fast(schedulers):
+    model = BlockingModel(block=True)
+    scheduler = schedulers(model, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+
+    running = scheduler.submit(_image(1))
+    assert model.started.wait(TIMEOUT)  # taken off the queue, in the model
+    queued = scheduler.submit(_image(2))
+    rejected = scheduler.submit(_image(3))
+
+    with pytest.raises(QueueFullError):
+        rejected.result(0)
+
+    model.release.set()
+    assert running.result(TIMEOUT)[0] == 10
+    assert queued.result(TIMEOUT)[0] == 20
+
+
+def test_stop_fails_pending_requests():
+    model = BlockingModel(block=True)
+    scheduler = MicroBatchScheduler(model, max_batch_size=1, max_wait_ms=0)
+
+    running = scheduler.submit(_image(1))
+    assert model.started.wait(TIMEOUT)
+    pending = [scheduler.submit(_image(2)) for _ in range(3)]
+
+    stopper = threading.Thread(target=scheduler.stop)
+    stopper.start()
+    assert scheduler._stopped.wait(TIMEOUT)
+    model.release.set()
+    stopper.join(TIMEOUT)
+    assert not stopper.is_alive()
+
+    # the batch already in the model finishes, the queued ones fail
+    assert running.result(TIMEOUT)[0] == 10
+    for future in pending:
+        with pytest.raises(RuntimeError, match="stopped"):
+            future.result(TIMEOUT)
+    with pytest.raises(RuntimeError, match="stopped"):
+        scheduler.submit(_image(3))
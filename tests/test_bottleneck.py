@@ -0,0 +1,100 @@
+"""
+TRAINING_MODE bottleneck: cached frozen-base features and head training, on
+a synthetic dataset and a tiny random model.
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from benchmarks import fixtures
+
+PARAMS = {
+    "IMAGE_SIZE": [32, 32, 3],
+    "BACKBONE": "mobilenet_v3_small",
+    "BATCH_SIZE": 4,
+    "EPOCHS": 1,
+    "TRAINING_MODE": "bottleneck",
+    "HEAD.POOLING": "avg",
+    "HEAD.DENSE_UNITS": [8],
+    "DISTRIBUTE.STRATEGY": "none",
+    "CHECKPOINT.ENABLED": False,
+    "EARLY_STOPPING.ENABLED": False,
+    "FINE_TUNE.ENABLED": False,
+}
+
+
+@pytest.fixture
+def trainer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # prepare_workdir chdirs, this restores the cwd afterwards
+    fixtures.prepare_workdir(tmp_path / "run", PARAMS, num_images=24, source_size=48)
+
+    from cnnClassifier.components.model_training import ModelTraining
+    from cnnClassifier.config.configuration import ConfigurationManager
+    from cnnClassifier.entity.artifact_entity import DataIngestionArtifact, PrepareBaseModelArtifact
+    from cnnClassifier.utils.common import load_json
+
+    config = ConfigurationManager()
+    prepare_base_model_config = config.get_prepare_base_model_config()
+    return ModelTraining(
+        config=config.get_training_config(),
+        params=config.params,
+        data_ingestion_artifact=DataIngestionArtifact(
+            zip_file_path=Path("artifacts/data_ingestion/data.zip"),
+            unzip_dir=Path("artifacts/data_ingestion"),
+        ),
+        prepare_base_model_artifact=PrepareBaseModelArtifact(
+            base_model_path=prepare_base_model_config.base_model_path,
+            updated_base_model_path=prepare_base_model_config.updated_base_model_path,
+            backbone=prepare_base_model_config.params_backbone,
+            head_architecture=dict(load_json(prepare_base_model_config.head_architecture_path)),
+        ),
+    )
+
+
+def _images(trainer, df) -> np.ndarray:
+    from cnnClassifier.utils.preprocessing import load_batch
+
+    return load_batch(df["filepath"], trainer.image_size, trainer.preprocessing)
+
+
+def test_features_are_cached_in_row_order(trainer):
+    model = trainer._load_model()
+    extractor, head = trainer._split_at_features(model)
+    df = trainer._load_split_df("valid")
+    base_hash = trainer._weights_hash(extractor)
+
+    features = trainer._get_split_features(extractor, "valid", df, base_hash)
+    images = _images(trainer, df)
+
+    assert features.shape[0] == len(df) > trainer.batch_size  # several batches
+    np.testing.assert_allclose(features, extractor.predict(images, verbose=0), atol=1e-4)
+    # the head on cached features is the full model
+    np.testing.assert_allclose(head.predict(np.asarray(features), verbose=0), model.predict(images, verbose=0), atol=1e-4)
+
+    cached = sorted(Path(trainer.config.features_dir).glob("valid_*.npy"))
+    assert len(cached) == 1
+    mtime = cached[0].stat().st_mtime_ns
+    trainer._get_split_features(extractor, "valid", df, base_hash)
+    assert cached[0].stat().st_mtime_ns == mtime  # reused, not extracted again
+
+    # other base weights, other cache entry
+    trainer._get_split_features(extractor, "valid", df, "other-base")
+    assert len(list(Path(trainer.config.features_dir).glob("valid_*.npy"))) == 2
+
+
+def test_bottleneck_training_trains_the_head_only(trainer):
+    from tensorflow import keras
+
+    base = trainer._load_model()
+    extractor, _ = trainer._split_at_features(base)
+    base_hash = trainer._weights_hash(extractor)
+    head_weights = [w.copy() for w in base.get_layer(index=len(base.layers) - 1).get_weights()]
+
+    artifact = trainer.initiate_model_training()
+
+    trained = keras.models.load_model(artifact.trained_model_path)
+    trained_extractor, _ = trainer._split_at_features(trained)
+    assert trainer._weights_hash(trained_extractor) == base_hash
+    trained_head = trained.get_layer(index=len(trained.layers) - 1).get_weights()
+    assert any(not np.array_equal(a, b) for a, b in zip(head_weights, trained_head))
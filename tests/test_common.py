@@ -0,0 +1,49 @@
+"""cnnClassifier.utils.common helpers."""
+import hashlib
+import os
+import threading
+
+from cnnClassifier.utils import common
+from cnnClassifier.utils.common import save_content_addressed
+
+
+def test_save_content_addressed_names_by_content(tmp_path):
+    data = b"\xff\xd8 not really a jpeg"
+    path = save_content_addressed(data, tmp_path, ".jpg")
+
+    assert path == tmp_path / f"{hashlib.sha256(data).hexdigest()}.jpg"
+    assert path.read_bytes() == data
+    assert save_content_addressed(data, tmp_path, ".jpg") == path
+    assert save_content_addressed(b"other", tmp_path, ".jpg") != path
+
+
+def test_save_content_addressed_concurrent_same_upload(tmp_path, monkeypatch):
+    data = bytes(range(256)) * 4096
+    errors = []
+
+    # every thread has written its temp file before any of them renames it
+    barrier = threading.Barrier(8, timeout=10)
+    replace = os.replace
+
+    def _replace(src, dst):
+        barrier.wait()
+        replace(src, dst)
+
+    monkeypatch.setattr(common.os, "replace", _replace)
+
+    def _save():
+        try:
+            save_content_addressed(data, tmp_path, ".jpg")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_save) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1  # no temp files left behind
+    assert files[0].read_bytes() == data
@@ -0,0 +1,99 @@
+"""Resumable download and incremental extraction of DataIngestion."""
+import http.client
+import zipfile
+
+import pytest
+
+from cnnClassifier.components import data_ingestion
+from cnnClassifier.components.data_ingestion import DataIngestion
+from cnnClassifier.components.data_sources import DataSource
+from cnnClassifier.entity.config_entity import DataIngestionConfig
+
+CHUNK = 1024
+
+
+class FlakySource(DataSource):
+    """serves `data` from any offset; the first connection drops after `fail_after` bytes"""
+
+    def __init__(self, data: bytes, fail_after: int):
+        self.data = data
+        self.fail_after = fail_after
+        self.offsets = []
+
+    def size(self) -> int:
+        return len(self.data)
+
+    def open(self, offset: int, chunk_size: int):
+        self.offsets.append(offset)
+        first = len(self.offsets) == 1
+
+        def _chunks():
+            for start in range(offset, len(self.data), chunk_size):
+                if first and start >= self.fail_after:
+                    raise http.client.IncompleteRead(b"", len(self.data) - start)
+                yield self.data[start:start + chunk_size]
+
+        return offset, _chunks()
+
+
+@pytest.fixture
+def dataset_zip(tmp_path):
+    path = tmp_path / "source.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        for i in range(4):
+            zf.writestr(f"dataset/train/{i}.bin", bytes([i]) * 3000)
+    return path
+
+
+def _ingestion(tmp_path, source_url="unused", sha256=None) -> DataIngestion:
+    return DataIngestion(DataIngestionConfig(
+        root_dir=tmp_path / "ingestion",
+        local_data_file=tmp_path / "ingestion" / "data.zip",
+        unzip_dir=tmp_path / "ingestion",
+        source_url=str(source_url),
+        sha256=sha256,
+        params_mode="extract",
+        params_chunk_size_mb=CHUNK / 1024 / 1024,
+        params_retries=2,
+        params_extract_workers=2,
+    ))
+
+
+def test_download_resumes_after_truncated_body(tmp_path, dataset_zip, monkeypatch):
+    data = dataset_zip.read_bytes()
+    source = FlakySource(data, fail_after=3 * CHUNK)
+    monkeypatch.setattr(data_ingestion, "get_source", lambda url: source)
+    ingestion = _ingestion(tmp_path)
+    ingestion.zip_path.parent.mkdir(parents=True)
+
+    zip_path = ingestion.download_dataset()
+
+    # the retry continues from the bytes already written
+    assert source.offsets == [0, 3 * CHUNK]
+    assert zip_path.read_bytes() == data
+    assert not ingestion.part_path.exists()
+    assert ingestion.verify_local_zip()
+
+
+def test_checksum_mismatch_discards_the_download(tmp_path, dataset_zip):
+    ingestion = _ingestion(tmp_path, dataset_zip, sha256="0" * 64)
+    ingestion.zip_path.parent.mkdir(parents=True)
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        ingestion.download_dataset()
+    assert not ingestion.part_path.exists()
+    assert not ingestion.zip_path.exists()
+
+
+def test_extraction_skips_unchanged_members(tmp_path, dataset_zip):
+    ingestion = _ingestion(tmp_path)
+    unzip_dir = ingestion.extract_zip_file(dataset_zip)
+    member = unzip_dir / "dataset" / "train" / "2.bin"
+    assert member.read_bytes() == bytes([2]) * 3000
+
+    # same size, other content: the CRC tells them apart
+    member.write_bytes(bytes([9]) * 3000)
+    counts = data_ingestion.extract_zip(dataset_zip, unzip_dir, workers=2)
+
+    assert counts == {"extracted": 1, "skipped": 3}
+    assert member.read_bytes() == bytes([2]) * 3000
@@ -0,0 +1,45 @@
+"""TF_CONFIG helpers of cnnClassifier.utils.distribute."""
+import json
+
+import tensorflow as tf
+
+from cnnClassifier.utils import distribute
+
+
+def _set_tf_config(monkeypatch, workers: int, index: int):
+    config = distribute.local_tf_config(workers, index, distribute.free_ports(workers))
+    monkeypatch.setenv("TF_CONFIG", json.dumps(config))
+
+
+def test_local_tf_config_roles(monkeypatch):
+    for index in range(3):
+        _set_tf_config(monkeypatch, 3, index)
+        assert distribute.num_workers() == 3
+        assert distribute.worker_index() == index
+        assert distribute.is_chief() == (index == 0)
+
+
+def test_separate_chief_task_comes_first(monkeypatch):
+    monkeypatch.setenv("TF_CONFIG", json.dumps({
+        "cluster": {"chief": ["a:1"], "worker": ["b:1", "c:1"]},
+        "task": {"type": "worker", "index": 1},
+    }))
+    assert distribute.num_workers() == 3
+    assert distribute.worker_index() == 2
+    assert not distribute.is_chief()
+
+
+def test_no_tf_config_is_one_worker(monkeypatch):
+    monkeypatch.delenv("TF_CONFIG", raising=False)
+    assert distribute.num_workers() == 1
+    assert distribute.is_chief()
+
+
+def test_not_distributed_without_multi_worker_strategy(monkeypatch):
+    # STRATEGY none with a TF_CONFIG left in the environment
+    _set_tf_config(monkeypatch, 2, 1)
+    monkeypatch.setattr(distribute, "_strategy", tf.distribute.get_strategy())
+    assert not distribute.is_distributed()
+
+    monkeypatch.setattr(distribute, "_strategy", None)
+    assert not distribute.is_distributed()
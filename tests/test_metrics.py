@@ -0,0 +1,113 @@
+"""
+/metrics output of MetricsRegistry, scraped over HTTP and read back with the
+Prometheus client's text parser.
+"""
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cnnClassifier.pipeline.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+parser = pytest.importorskip("prometheus_client.parser")
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def scrape(registry):
+    """serves `registry` on a local /metrics endpoint, returns a function that scrapes it"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", MetricsRegistry.CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def _scrape():
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"] == MetricsRegistry.CONTENT_TYPE
+            text = response.read().decode()
+        return {family.name: family for family in parser.text_string_to_metric_families(text)}
+
+    yield _scrape
+    server.shutdown()
+    server.server_close()
+
+
+def _samples(family) -> dict:
+    return {(s.name, tuple(sorted(s.labels.items()))): s.value for s in family.samples}
+
+
+def test_counter_with_labels(registry, scrape):
+    requests = Counter("test_requests", 'Requests, "quoted"\nhelp.', ["endpoint", "status"], registry=registry)
+    requests.labels("/predict", 200).inc()
+    requests.labels("/predict", 200).inc(2)
+    requests.labels(endpoint="/healthz", status=503).inc()
+
+    family = scrape()["test_requests"]
+    assert family.type == "counter"
+    assert family.documentation == 'Requests, "quoted"\nhelp.'
+    assert _samples(family) == {
+        ("test_requests_total", (("endpoint", "/predict"), ("status", "200"))): 3.0,
+        ("test_requests_total", (("endpoint", "/healthz"), ("status", "503"))): 1.0,
+    }
+
+
+def test_gauge_set_and_callback(registry, scrape):
+    pending = Gauge("test_pending", "Pending requests.", registry=registry)
+    ready = Gauge("test_ready", "Ready flag.", registry=registry)
+    pending.set(4)
+    state = {"ready": False}
+    ready.set_function(lambda: state["ready"])
+
+    families = scrape()
+    assert _samples(families["test_pending"]) == {("test_pending", ()): 4.0}
+    assert _samples(families["test_ready"]) == {("test_ready", ()): 0.0}
+
+    state["ready"] = True
+    assert _samples(scrape()["test_ready"]) == {("test_ready", ()): 1.0}
+
+
+def test_histogram_buckets(registry, scrape):
+    latency = Histogram("test_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    family = scrape()["test_seconds"]
+    assert family.type == "histogram"
+    assert _samples(family) == {
+        ("test_seconds_bucket", (("le", "0.1"),)): 2.0,
+        ("test_seconds_bucket", (("le", "1"),)): 3.0,
+        ("test_seconds_bucket", (("le", "+Inf"),)): 4.0,
+        ("test_seconds_sum", ()): pytest.approx(3.65),
+        ("test_seconds_count", ()): 4.0,
+    }
+
+
+def test_duplicate_name_rejected(registry):
+    Counter("test_once", "Once.", registry=registry)
+    with pytest.raises(ValueError):
+        Gauge("test_once", "Twice.", registry=registry)
+
+
+def test_metric_base_is_abstract(registry):
+    from cnnClassifier.pipeline.metrics import _Metric
+
+    with pytest.raises(TypeError):
+        _Metric("test_abstract", "No child type.", registry=registry)
@@ -0,0 +1,179 @@
+"""
+Two MultiWorkerMirroredStrategy workers on localhost training a tiny model
+through ModelTraining on a synthetic dataset (DISTRIBUTE.STRATEGY multi_worker).
+
+The test runs this file once per worker, with the TF_CONFIG of its place in
+the cluster; every worker writes what it saw to multi_worker_<index>.json.
+Worker 1 loads a base model with other weights, as if it had prepared its
+own on another host.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from benchmarks import fixtures
+from cnnClassifier.utils.distribute import free_ports, local_tf_config
+
+WORKERS = 2
+BATCH_SIZE = 4
+TRAIN_IMAGES = 16
+OTHER_BASE_MODEL = "artifacts/prepare_base_model/other_worker_base_model.h5"
+
+PARAMS = {
+    "IMAGE_SIZE": [32, 32, 3],
+    "BACKBONE": "mobilenet_v3_small",
+    "BATCH_SIZE": BATCH_SIZE,
+    "EPOCHS": 1,
+    "HEAD.POOLING": "avg",
+    "HEAD.DENSE_UNITS": [8],
+    "DISTRIBUTE.STRATEGY": "multi_worker",
+    "DISTRIBUTE.SCALE_BATCH_SIZE": True,
+    "CHECKPOINT.ENABLED": False,
+    "EARLY_STOPPING.ENABLED": False,
+    "FINE_TUNE.ENABLED": False,
+}
+
+
+def _worker_main():
+    """one worker: trains, then records its shard of the train split and batch size"""
+    from cnnClassifier.utils import distribute
+
+    # before the first TensorFlow op
+    strategy = distribute.get_strategy("multi_worker")
+
+    import tensorflow as tf
+
+    from cnnClassifier.components.model_training import ModelTraining
+    from cnnClassifier.config.configuration import ConfigurationManager
+    from cnnClassifier.entity.artifact_entity import DataIngestionArtifact, PrepareBaseModelArtifact
+    from cnnClassifier.utils.common import load_json
+
+    config = ConfigurationManager()
+    prepare_base_model_config = config.get_prepare_base_model_config()
+    updated_base_model_path = prepare_base_model_config.updated_base_model_path
+    if not distribute.is_chief():
+        updated_base_model_path = Path(OTHER_BASE_MODEL)
+    trainer = ModelTraining(
+        config=config.get_training_config(),
+        params=config.params,
+        data_ingestion_artifact=DataIngestionArtifact(
+            zip_file_path=Path("artifacts/data_ingestion/data.zip"),
+            unzip_dir=Path("artifacts/data_ingestion"),
+        ),
+        prepare_base_model_artifact=PrepareBaseModelArtifact(
+            base_model_path=prepare_base_model_config.base_model_path,
+            updated_base_model_path=updated_base_model_path,
+            backbone=prepare_base_model_config.params_backbone,
+            head_architecture=dict(load_json(prepare_base_model_config.head_architecture_path)),
+        ),
+    )
+
+    # the train images this worker reads, through the same sharding as its datasets
+    filepaths = trainer._load_split_df("train")["filepath"].tolist()
+    shard = trainer._shard_inputs(tf.data.Dataset.from_tensor_slices(filepaths))
+    files = sorted(Path(p.decode()).name for p in shard.as_numpy_iterator())
+
+    # the weights training starts from
+    start_weights = _weights_hash(trainer._load_model().get_weights())
+
+    trainer.initiate_model_training()
+
+    with open(f"multi_worker_{trainer.worker_index}.json", "w") as f:
+        json.dump({
+            "worker_index": trainer.worker_index,
+            "is_chief": trainer.is_chief,
+            "replicas": strategy.num_replicas_in_sync,
+            "batch_size": trainer.batch_size,
+            "files": files,
+            "start_weights": start_weights,
+        }, f)
+
+
+def _weights_hash(weights) -> str:
+    h = hashlib.sha256()
+    for w in weights:
+        h.update(w.tobytes())
+    return h.hexdigest()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """config.yaml, params.yaml, synthetic dataset and random base model in `tmp_path`"""
+    monkeypatch.chdir(tmp_path)  # prepare_workdir chdirs, this restores the cwd afterwards
+    fixtures.prepare_workdir(tmp_path / "run", PARAMS, num_images=TRAIN_IMAGES, source_size=48)
+
+    from tensorflow import keras
+    from cnnClassifier.config.configuration import ConfigurationManager
+
+    # another random head, for worker 1
+    model = keras.models.load_model(ConfigurationManager().get_prepare_base_model_config().updated_base_model_path)
+    model.set_weights([w + 0.5 for w in model.get_weights()])
+    model.save(OTHER_BASE_MODEL)
+    return tmp_path / "run"
+
+
+def test_two_local_workers(workdir):
+    ports = free_ports(WORKERS)
+    # what pytest.ini gives the test process
+    root = Path(__file__).resolve().parents[1]
+    pythonpath = os.pathsep.join(p for p in (str(root / "src"), str(root), os.environ.get("PYTHONPATH")) if p)
+    trained_model = workdir / "artifacts" / "training" / "model.h5"
+    model_mtime = trained_model.stat().st_mtime_ns if trained_model.exists() else None
+
+    processes = []
+    for index in range(WORKERS):
+        env = dict(
+            os.environ,
+            TF_CONFIG=json.dumps(local_tf_config(WORKERS, index, ports)),
+            PYTHONPATH=pythonpath,
+            TF_CPP_MIN_LOG_LEVEL="2",
+        )
+        log = open(workdir / f"worker_{index}.log", "w")
+        processes.append((subprocess.Popen(
+            [sys.executable, __file__], cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+        ), log))
+
+    deadline = time.monotonic() + 600
+    try:
+        for index, (process, log) in enumerate(processes):
+            code = process.wait(timeout=max(1, deadline - time.monotonic()))
+            log.close()
+            output = (workdir / f"worker_{index}.log").read_text()[-3000:]
+            assert code == 0, f"worker {index} exited with {code}:\n{output}"
+    finally:
+        for process, log in processes:
+            if process.poll() is None:
+                process.kill()
+            log.close()
+
+    results = [json.loads((workdir / f"multi_worker_{i}.json").read_text()) for i in range(WORKERS)]
+
+    assert [r["worker_index"] for r in results] == list(range(WORKERS))
+    assert [r["is_chief"] for r in results] == [True, False]
+    for result in results:
+        assert result["replicas"] == WORKERS
+        # global batch, every worker still steps BATCH_SIZE images
+        assert result["batch_size"] == BATCH_SIZE * WORKERS
+
+    # every worker starts from the chief's weights
+    assert results[0]["start_weights"] == results[1]["start_weights"]
+
+    # disjoint shards that cover the whole train split
+    chief_files, worker_files = (set(r["files"]) for r in results)
+    assert chief_files and worker_files
+    assert not chief_files & worker_files
+    assert len(chief_files | worker_files) == TRAIN_IMAGES
+
+    # only the chief writes the model
+    assert trained_model.exists()
+    assert trained_model.stat().st_mtime_ns != model_mtime
+
+
+if __name__ == "__main__":
+    _worker_main()
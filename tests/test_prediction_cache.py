@@ -0,0 +1,75 @@
+"""PredictionCache LRU / TTL eviction and persistence."""
+import numpy as np
+import pytest
+
+from cnnClassifier.pipeline import prediction_cache
+from cnnClassifier.pipeline.prediction_cache import PredictionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """replaces time.time() in the cache module with a settable clock"""
+    now = {"t": 1000.0}
+    monkeypatch.setattr(prediction_cache.time, "time", lambda: now["t"])
+    return now
+
+
+def _probs(value: float) -> np.ndarray:
+    return np.full(10, value, dtype=np.float32)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2)
+    cache.put("a", _probs(0.1))
+    cache.put("b", _probs(0.2))
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.put("c", _probs(0.3))
+
+    assert cache.get("b") is None
+    np.testing.assert_array_equal(cache.get("a"), _probs(0.1))
+    np.testing.assert_array_equal(cache.get("c"), _probs(0.3))
+    assert cache.stats() == {
+        "entries": 2, "max_entries": 2, "hits": 3, "misses": 1, "hit_ratio": 0.75,
+    }
+
+
+def test_ttl_expires_entries(clock):
+    cache = PredictionCache(ttl_seconds=60)
+    cache.put("a", _probs(0.1))
+
+    clock["t"] += 60
+    assert cache.get("a") is not None
+    clock["t"] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_no_ttl_never_expires(clock):
+    cache = PredictionCache(ttl_seconds=0)
+    cache.put("a", _probs(0.1))
+    clock["t"] += 10 ** 9
+    assert cache.get("a") is not None
+
+
+def test_persisted_cache_drops_expired_entries(tmp_path, clock):
+    path = tmp_path / "cache.npz"
+    cache = PredictionCache(ttl_seconds=60, persist_path=path, persist_every=2)
+    cache.put("old", _probs(0.1))
+    clock["t"] += 30
+    cache.put("new", _probs(0.2))  # second put flushes
+    assert path.exists()
+
+    clock["t"] += 40  # "old" is 70 s old, "new" 40 s
+    reloaded = PredictionCache(ttl_seconds=60, persist_path=path)
+    assert reloaded.stats()["entries"] == 1
+    np.testing.assert_array_equal(reloaded.get("new"), _probs(0.2))
+
+
+def test_content_key_depends_on_model_and_content():
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    key = PredictionCache.content_key("model-a", image)
+
+    assert PredictionCache.content_key("model-a", image.copy()) == key
+    assert PredictionCache.content_key("model-b", image) != key
+    assert PredictionCache.content_key("model-a", image.astype(np.float32)) != key
+    assert PredictionCache.content_key("model-a", image.reshape(3, 2, 2)) != key
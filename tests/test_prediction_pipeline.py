@@ -0,0 +1,99 @@
+"""
+PredictionPipeline batched inference, on a fake runtime instead of a trained
+model (the pipeline is built without reading config.yaml).
+"""
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from cnnClassifier.pipeline.prediction_cache import PredictionCache
+from cnnClassifier.pipeline.prediction_pipeline import PredictionPipeline
+
+IMAGE_SIZE = (4, 4)
+
+
+class FakeRuntime:
+    """sigmoid outputs that depend on the mean pixel of every image"""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        self.batch_shapes.append(batch.shape)
+        scale = np.linspace(0.1, 1.0, len(PredictionPipeline.LABEL_COLUMNS), dtype=np.float32)
+        return batch.mean(axis=(1, 2, 3))[:, None] * scale
+
+
+def _make_pipeline(cache=None) -> PredictionPipeline:
+    pipeline = PredictionPipeline.__new__(PredictionPipeline)
+    pipeline.image_size = IMAGE_SIZE
+    pipeline.preprocessing = "rescale"
+    pipeline.runtime = FakeRuntime()
+    pipeline.scheduler = None
+    pipeline.cache = cache
+    pipeline.model_id = "test-model"
+    return pipeline
+
+
+def _png(value: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), (value, value, value)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def images():
+    return [_png(v) for v in (0, 51, 102, 153, 204)]
+
+
+def test_batch_matches_single_predictions(images):
+    pipeline = _make_pipeline()
+    single = np.stack([
+        np.array([r["probability"] for r in pipeline.predict(data).values()]) for data in images
+    ])
+
+    pipeline.runtime.batch_shapes.clear()
+    batched = pipeline.predict_proba_batch(images, batch_size=2, num_workers=2)
+
+    np.testing.assert_allclose(batched, single, rtol=1e-6)
+    assert batched[:, -1] == pytest.approx([0.0, 0.2, 0.4, 0.6, 0.8])
+    # fixed-size forward passes, the last one padded
+    assert pipeline.runtime.batch_shapes == [(2, *IMAGE_SIZE, 3)] * 3
+
+
+def test_predict_batch_keeps_input_order(images):
+    pipeline = _make_pipeline()
+    results = pipeline.predict_batch(images[::-1], batch_size=4, threshold=0.5)
+
+    assert [r["Wrinkles"]["prediction"] for r in results] == [1, 1, 0, 0, 0]
+    assert [r["Acne"]["prediction"] for r in results] == [0] * 5
+
+
+def test_empty_batch():
+    assert _make_pipeline().predict_proba_batch([]).shape == (0, len(PredictionPipeline.LABEL_COLUMNS))
+
+
+def test_cache_hit_reused_across_thresholds(images):
+    pipeline = _make_pipeline(cache=PredictionCache())
+    low = pipeline.predict(images[2], threshold=0.1)
+    high = pipeline.predict(images[2], threshold=0.35)
+
+    assert len(pipeline.runtime.batch_shapes) == 1  # the second call is a cache hit
+    assert low["Wrinkles"]["probability"] == high["Wrinkles"]["probability"]
+    assert low["Pores"]["prediction"] == 1 and high["Pores"]["prediction"] == 0
+    assert pipeline.cache.stats()["hits"] == 1
+
+
+def test_batch_skips_cached_images(images):
+    pipeline = _make_pipeline(cache=PredictionCache())
+    expected = pipeline.predict_proba_batch(images, batch_size=8)
+
+    pipeline.runtime.batch_shapes.clear()
+    extra = _png(255)
+    preds = pipeline.predict_proba_batch([images[0], extra, images[4]], batch_size=8)
+
+    np.testing.assert_allclose(preds[[0, 2]], expected[[0, 4]])
+    assert preds[1, -1] == pytest.approx(1.0)
+    assert pipeline.runtime.batch_shapes == [(8, *IMAGE_SIZE, 3)]  # one pass, for the miss
@@ -0,0 +1,86 @@
+"""Serving (numpy) vs training (tf.data) decode and resize."""
+import io
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from PIL import Image
+
+from cnnClassifier.utils.preprocessing import (
+    ImageDecodeError,
+    decode_and_resize,
+    decode_image,
+    draft_ratio,
+    load_image,
+    resize_bilinear,
+)
+
+
+def _random_image(height: int, width: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def _jpeg(path, height: int, width: int):
+    y, x = np.mgrid[0:height, 0:width]
+    img = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=-1)
+    Image.fromarray(img.astype(np.uint8)).save(path, quality=95)
+
+
+@pytest.mark.parametrize("source, target", [
+    ((37, 53), (16, 16)),   # downscale, odd sizes
+    ((16, 16), (37, 23)),   # upscale
+    ((100, 40), (100, 40)),  # same size
+    ((1, 7), (5, 3)),
+])
+def test_resize_matches_tf_image_resize(source, target):
+    img = _random_image(*source)
+    expected = tf.image.resize(img, target).numpy()
+
+    np.testing.assert_allclose(resize_bilinear(img, target), expected, atol=1e-3)
+
+
+def test_resize_writes_into_out():
+    img = _random_image(20, 30)
+    batch = np.zeros((2, 8, 8, 3), dtype=np.float32)
+
+    result = resize_bilinear(img, (8, 8), out=batch[1])
+
+    assert np.shares_memory(result, batch)
+    np.testing.assert_allclose(batch[1], tf.image.resize(img, (8, 8)).numpy(), atol=1e-3)
+    assert not batch[0].any()
+
+
+@pytest.mark.parametrize("size", [(40, 60), (400, 300)])  # full and 1/4 scale decode
+def test_serving_matches_training_pixels(tmp_path, size):
+    path = tmp_path / "image.jpg"
+    _jpeg(path, *size)
+
+    training = decode_and_resize(tf.constant(str(path)), (32, 32)).numpy()
+    serving = load_image(path.read_bytes(), (32, 32), "none")
+
+    # same IDCT, same DCT scale, same resize
+    np.testing.assert_array_equal(serving, training)
+
+
+def test_draft_ratio():
+    assert draft_ratio(224, 224, (224, 224)) == 1
+    assert draft_ratio(448, 448, (224, 224)) == 1
+    assert draft_ratio(896, 900, (224, 224)) == 2
+    assert draft_ratio(4000, 3000, (224, 224)) == 4
+    assert draft_ratio(4000, 4000, (224, 224)) == 8
+
+
+def test_decode_converts_to_rgb():
+    buffer = io.BytesIO()
+    Image.new("LA", (5, 4), (128, 255)).save(buffer, format="PNG")
+
+    assert decode_image(buffer.getvalue(), (4, 4)).shape == (4, 5, 3)
+    assert decode_image(np.zeros((4, 5), dtype=np.uint8), (4, 4)).shape == (4, 5, 3)
+
+
+def test_undecodable_input(tmp_path):
+    with pytest.raises(ImageDecodeError):
+        decode_image(b"not an image", (4, 4))
+    # a missing file is not the client's image being bad
+    with pytest.raises(FileNotFoundError):
+        decode_image(tmp_path / "missing.jpg", (4, 4))
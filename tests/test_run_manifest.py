@@ -0,0 +1,114 @@
+"""Stage skipping of TrainingPipeline._run_stage with a RunManifest."""
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from cnnClassifier.pipeline.training_pipeline import TrainingPipeline
+from cnnClassifier.utils.run_manifest import RunManifest
+
+
+@dataclass(frozen=True)
+class StageArtifact:
+    output_path: Path
+    epochs: int
+
+
+class Stage:
+    """a stage that writes `output_path` and counts its runs"""
+
+    def __init__(self, output_path: Path):
+        self.output_path = output_path
+        self.runs = 0
+        self.fail = False
+
+    def __call__(self, epochs: int = 1) -> StageArtifact:
+        self.runs += 1
+        if self.fail:
+            raise RuntimeError("stage failed")
+        self.output_path.write_text(f"run {self.runs}")
+        return StageArtifact(output_path=self.output_path, epochs=epochs)
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return tmp_path / "run_manifest.json"
+
+
+def _pipeline(manifest_path, force_stages=()) -> TrainingPipeline:
+    pipeline = TrainingPipeline()
+    pipeline.manifest = RunManifest(manifest_path)
+    pipeline.force_stages = set(force_stages)
+    return pipeline
+
+
+def test_unchanged_stage_is_skipped(tmp_path, manifest_path):
+    stage = Stage(tmp_path / "model.h5")
+    first = _pipeline(manifest_path)._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+
+    # a later run, with the manifest read back from disk
+    second = _pipeline(manifest_path)._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+
+    assert stage.runs == 1
+    assert second == first
+
+
+def test_changed_params_rerun(tmp_path, manifest_path):
+    stage = Stage(tmp_path / "model.h5")
+    pipeline = _pipeline(manifest_path)
+    pipeline._run_stage("training", StageArtifact, lambda: stage(1), {"EPOCHS": 1})
+    artifact = pipeline._run_stage("training", StageArtifact, lambda: stage(2), {"EPOCHS": 2})
+
+    assert stage.runs == 2
+    assert artifact.epochs == 2
+
+
+def test_changed_input_artifact_reruns_downstream(tmp_path, manifest_path):
+    upstream = Stage(tmp_path / "data.zip")
+    downstream = Stage(tmp_path / "model.h5")
+    pipeline = _pipeline(manifest_path)
+
+    def _run():
+        data = pipeline._run_stage("ingestion", StageArtifact, upstream, {"URL": "a"})
+        return pipeline._run_stage("training", StageArtifact, downstream, {"EPOCHS": 1}, inputs=[data])
+
+    _run()
+    _run()
+    assert (upstream.runs, downstream.runs) == (1, 1)
+
+    pipeline.force_stages = {"ingestion"}  # new content for the same params
+    _run()
+    assert (upstream.runs, downstream.runs) == (2, 2)
+
+
+def test_modified_output_reruns(tmp_path, manifest_path):
+    stage = Stage(tmp_path / "model.h5")
+    pipeline = _pipeline(manifest_path)
+    pipeline._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+
+    stage.output_path.write_text("edited by hand")
+    pipeline._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+    assert stage.runs == 2
+
+
+def test_forced_stage_reruns(tmp_path, manifest_path):
+    stage = Stage(tmp_path / "model.h5")
+    _pipeline(manifest_path)._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+    _pipeline(manifest_path, force_stages=["training"])._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+    assert stage.runs == 2
+
+
+def test_failed_rerun_forgets_the_old_record(tmp_path, manifest_path):
+    stage = Stage(tmp_path / "model.h5")
+    _pipeline(manifest_path)._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+
+    stage.fail = True
+    with pytest.raises(RuntimeError):
+        _pipeline(manifest_path, force_stages=["training"])._run_stage(
+            "training", StageArtifact, stage, {"EPOCHS": 1}
+        )
+
+    # same fingerprint as the recorded run, but the outputs may be half-written
+    stage.fail = False
+    _pipeline(manifest_path)._run_stage("training", StageArtifact, stage, {"EPOCHS": 1})
+    assert stage.runs == 3
@@ -0,0 +1,61 @@
+"""Search space sampling and successive-halving rungs of the sweep."""
+import pytest
+
+from cnnClassifier.pipeline.sweep import _set_param, rung_epochs, sample_space
+
+
+def test_grid_is_every_combination():
+    trials = sample_space({"LEARNING_RATE": [0.01, 0.001], "BATCH_SIZE": [16, 32, 64]}, "grid", 0, 0)
+
+    assert len(trials) == 6
+    assert {(t["LEARNING_RATE"], t["BATCH_SIZE"]) for t in trials} == {
+        (lr, bs) for lr in (0.01, 0.001) for bs in (16, 32, 64)
+    }
+
+
+def test_grid_needs_lists():
+    with pytest.raises(ValueError, match="LEARNING_RATE"):
+        sample_space({"LEARNING_RATE": {"uniform": [0, 1]}}, "grid", 0, 0)
+
+
+def test_random_draws_are_seeded_and_in_range():
+    space = {
+        "LEARNING_RATE": {"log_uniform": [1e-5, 1e-2]},
+        "HEAD.DROPOUT": {"uniform": [0.1, 0.5]},
+        "BATCH_SIZE": [16, 32],
+    }
+    trials = sample_space(space, "random", 20, seed=7)
+
+    assert trials == sample_space(space, "random", 20, seed=7)
+    assert trials != sample_space(space, "random", 20, seed=8)
+    assert len(trials) == 20
+    for trial in trials:
+        assert 1e-5 <= trial["LEARNING_RATE"] <= 1e-2
+        assert 0.1 <= trial["HEAD.DROPOUT"] <= 0.5
+        assert trial["BATCH_SIZE"] in (16, 32)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="SWEEP.METHOD"):
+        sample_space({"BATCH_SIZE": [16]}, "bayesian", 1, 0)
+
+
+@pytest.mark.parametrize("max_epochs, min_epochs, eta, expected", [
+    (6, 1, 2, [1, 2, 4, 6]),
+    (9, 1, 3, [1, 3, 9]),
+    (8, 2, 2, [2, 4, 8]),
+    (1, 1, 2, [1]),
+    (3, 0, 2, [1, 2, 3]),
+])
+def test_rung_epochs(max_epochs, min_epochs, eta, expected):
+    assert rung_epochs(max_epochs, min_epochs, eta) == expected
+
+
+def test_set_param_dotted_keys():
+    params = {"LEARNING_RATE": 0.01, "FINE_TUNE": {"LEARNING_RATE": 1e-5}}
+    _set_param(params, "FINE_TUNE.LEARNING_RATE", 1e-4)
+    _set_param(params, "LEARNING_RATE", 0.1)
+
+    assert params == {"LEARNING_RATE": 0.1, "FINE_TUNE": {"LEARNING_RATE": 1e-4}}
+    with pytest.raises(KeyError, match="FINE_TUNE.EPOCHS"):
+        _set_param(params, "FINE_TUNE.EPOCHS", 3)